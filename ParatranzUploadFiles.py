@@ -3,10 +3,11 @@ from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
-from hzdev_misc_paratranz import PARA_TRANZ_PATH
+from dataModel import DEFAULT_PROJECT_PATHS
 
 API_Tokens = ''  # 这是你在Paratranz的API Token
 projectID = -1  # 这是你要同步文件的项目的ID
+PARA_TRANZ_PATH = DEFAULT_PROJECT_PATHS.paratranzPath  # 要同步的中间文件目录
 
 threadPool = ThreadPoolExecutor(1)
 
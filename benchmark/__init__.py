@@ -0,0 +1,10 @@
+"""
+性能基准测试套件。
+
+`corpus` 负责生成确定性的合成 Starsector mod 目录树，`runner` 负责在不同规模下计时各个处理流程并输出 JSON 结果文件，
+结果文件可以在不同提交之间进行比较。
+`startup` 以 `-X importtime` 检查启动耗时是否在预算之内，并确认解析后端等模块没有在启动阶段被导入，超出预算时以非零状态退出。
+`emitter` 比较 json5 与 `hzdev_emitter` 序列化写回文件（strings.json、大型势力文件）的耗时，并确认两者的输出相同。
+
+用法：在仓库根目录下执行 `python -m benchmark.runner --help`、`python -m benchmark.startup` 或 `python -m benchmark.emitter`。
+"""
@@ -0,0 +1,283 @@
+import csv
+import json
+import os
+import random
+from typing import Dict, List
+
+# 合成语料所用的词汇，尽量贴近游戏原文的用词风格
+__vocabulary = (
+    'the', 'fleet', 'hegemony', 'sector', 'colony', 'station', 'pirate', 'commission', 'captain', 'admiral',
+    'domain', 'persean', 'league', 'tri-tachyon', 'luddic', 'church', 'path', 'market', 'stability', 'supply',
+    'fuel', 'crew', 'officer', 'hull', 'armor', 'shield', 'flux', 'weapon', 'missile', 'fighter', 'bay',
+    'derelict', 'survey', 'planet', 'hyperspace', 'storm', 'jump', 'point', 'beacon', 'ruins', 'salvage',
+    'a', 'an', 'of', 'and', 'to', 'with', 'from', 'into', 'is', 'was', 'will', 'be', 'your', 'their',
+    'ancient', 'hostile', 'ruthless', 'quiet', 'distant', 'broken', 'massive', 'secret', 'dangerous', 'old',
+)
+__placeholders = ('$playerName', '$personName', '$heOrShe', '$faction', '%s', '$marketName', '%d')
+
+
+def _sentence(rnd: random.Random, minWords: int = 4, maxWords: int = 16, placeholder: float = 0.2) -> str:
+    words = [rnd.choice(__vocabulary) for _ in range(rnd.randint(minWords, maxWords))]
+    if rnd.random() < placeholder:
+        words.insert(rnd.randrange(len(words)), rnd.choice(__placeholders))
+    words[0] = words[0].capitalize()
+    return ' '.join(words) + rnd.choice(('.', '.', '.', '!', '?'))
+
+
+def _paragraph(rnd: random.Random, sentences: int = 3) -> str:
+    return ' '.join(_sentence(rnd) for _ in range(sentences))
+
+
+def _name(rnd: random.Random, words: int = 2) -> str:
+    return ' '.join(rnd.choice(__vocabulary).capitalize() for _ in range(words))
+
+
+def _identifier(prefix: str, index: int) -> str:
+    return f'{prefix}_{index:05d}'
+
+
+def _writeText(rootPath: str, relativePath: str, content: str):
+    filePath = os.path.join(rootPath, *relativePath.split('/'))
+    os.makedirs(os.path.dirname(filePath), exist_ok=True)
+    with open(filePath, 'w', encoding='UTF-8', newline='') as tFile:
+        tFile.write(content)
+
+
+def _writeCSV(rootPath: str, relativePath: str, header: List[str], rows: List[Dict[str, str]]):
+    filePath = os.path.join(rootPath, *relativePath.split('/'))
+    os.makedirs(os.path.dirname(filePath), exist_ok=True)
+    with open(filePath, 'w', encoding='UTF-8', newline='') as tFile:
+        tWriter = csv.DictWriter(tFile, header)
+        tWriter.writeheader()
+        tWriter.writerows(rows)
+
+
+def _rulesCSV(rnd: random.Random, rows: int) -> List[Dict[str, str]]:
+    result = [{'id': '# 以 # 开头的行会被视为注释', 'trigger': '', 'conditions': '', 'script': '', 'text': '',
+               'options': '', 'notes': ''}]
+    for index in range(rows):
+        text = '\n'.join(_paragraph(rnd, rnd.randint(1, 3)) for _ in range(rnd.randint(1, 3)))
+        script = f'AddText "{_sentence(rnd)}"' if rnd.random() < 0.3 else 'FireBest DialogOptionSelected'
+        if rnd.random() < 0.15:  # 带高亮的文本，供 extractHighlightTextToJava 处理
+            highlights = sorted(set(rnd.sample(text.replace('\n', ' ').split(' '), 2)))
+            highlights = [word for word in highlights if word.strip() != '' and '"' not in word]
+            if len(highlights) > 0:
+                script = '\n'.join([script, 'SetTextHighlightColors h',
+                                    'SetTextHighlights ' + ' '.join(f'"{word}"' for word in highlights)])
+        options = '\n'.join(f'{rnd.randint(0, 9)}:opt_{index}_{optID}:{_sentence(rnd, 2, 6, 0)}'
+                            for optID in range(rnd.randint(0, 3)))
+        result.append({'id': _identifier('rule', index), 'trigger': 'OpenInteractionDialog',
+                       'conditions': f'$id == {_identifier("entity", index)}', 'script': script, 'text': text,
+                       'options': options, 'notes': ''})
+    return result
+
+
+def _descriptionsCSV(rnd: random.Random, rows: int) -> List[Dict[str, str]]:
+    result = []
+    for index in range(rows):
+        result.append({'id': _identifier('desc', index), 'type': rnd.choice(('SHIP', 'WEAPON', 'RESOURCE', 'CUSTOM')),
+                       'text1': _paragraph(rnd, rnd.randint(2, 6)), 'text2': _paragraph(rnd, 1),
+                       'text3': _sentence(rnd) if rnd.random() < 0.5 else '', 'text4': '', 'text5': '',
+                       'notes': ''})
+    return result
+
+
+def _faction(rnd: random.Random, index: int) -> str:
+    name = _name(rnd)
+    ranks = {'ranks': {f'rank_{rankID}': {'name': _name(rnd, 1)} for rankID in range(4)},
+             'posts': {f'post_{postID}': {'name': _name(rnd, 2)} for postID in range(4)}}
+    content = [
+        '{',
+        f'\t"id":"{_identifier("faction", index)}",  # 势力ID',
+        f'\t"displayName":"{name}",',
+        f'\t"displayNameWithArticle":"the {name}",',
+        f'\t"displayNameLong":"{name} {_name(rnd, 1)}",',
+        f'\t"displayNameLongWithArticle":"the {name} {_name(rnd, 1)}",',
+        '\t"displayNameIsOrAre":"is",',
+        f'\t"personNamePrefix":"{_name(rnd, 1)}",',
+        f'\t"entityNamePrefix":"{_name(rnd, 1)}",',
+        f'\t"color":[{rnd.randint(0, 255)},{rnd.randint(0, 255)},{rnd.randint(0, 255)},255],',
+        f'\t"baseUIColor":[{rnd.randint(0, 255)},{rnd.randint(0, 255)},{rnd.randint(0, 255)},255],',
+        '\t"tags":[ships, weapons, "faction_tag"],',
+        f'\t"ranks":{json.dumps(ranks)},',
+        '\t"fleetTypeNames":{',
+        *[f'\t\t"{fleetType}":"{_name(rnd)}",' for fleetType in
+          ('trade', 'tradeLiner', 'tradeSmuggler', 'smallTrader', 'patrolSmall', 'patrolMedium', 'patrolLarge')],
+        '\t},',
+        '\t"doctrine":{',
+        *[f'\t\t"{key}":{rnd.randint(1, 5)},' for key in ('warships', 'carriers', 'phaseShips', 'officerQuality')],
+        f'\t\t"shipSize":{rnd.randint(1, 5)}f,',
+        '\t},',
+        '\t"knownShips":{"tags":["base_bp"], "hulls":[' +
+        ', '.join(f'"hull_{rnd.randint(0, 999)}"' for _ in range(rnd.randint(5, 30))) + ']},',
+        '}',
+    ]
+    return '\n'.join(content)
+
+
+def _skin(rnd: random.Random, index: int) -> str:
+    return '\n'.join([
+        '{',
+        f'\t"baseHullId":"hull_{index}",',
+        f'\t"skinHullId":"hull_{index}_skin",',
+        f'\t"hullName":"{_name(rnd)}",',
+        f'\t"hullDesignation":"{_name(rnd, 1)}",',
+        f'\t"descriptionPrefix":"{_sentence(rnd)}",',
+        f'\t"tech":"{_name(rnd, 1)} Tech",',
+        '\t"hints":[CARRIER, COMBAT],',
+        f'\t"fleetPoints":{rnd.randint(5, 40)},',
+        f'\t"ordnancePoints":{rnd.randint(40, 300)},',
+        '\t"removeBuiltInMods":[],',
+        '\t"builtInMods":["reinforcedhull"],',
+        '}',
+    ])
+
+
+def _skill(rnd: random.Random, index: int) -> str:
+    groups = ',\n'.join(
+        '\t\t{' + f'"name":"{_name(rnd)}", "effects":[{{"type":"DESCRIPTION", "script":"skill_{index}_{groupID}"}}]' + '}'
+        for groupID in range(rnd.randint(1, 3)))
+    return '\n'.join([
+        '{',
+        f'\t"id":"skill_{index:05d}",',
+        '\t"scope":"PILOTED_SHIP",',
+        f'\t"scopeStr":"{_sentence(rnd, 2, 5, 0)}",',
+        '\t"effectGroups":[',
+        groups,
+        '\t],',
+        '}',
+    ])
+
+
+def _variant(rnd: random.Random, index: int) -> str:
+    weapons = ',\n'.join(
+        f'\t\t\t\t"WS {slot:03d}":"weapon_{rnd.randint(0, 200)}"' for slot in range(rnd.randint(2, 8)))
+    return '\n'.join([
+        '{',
+        f'\t"displayName":"{_name(rnd)}",',
+        f'\t"hullId":"hull_{index % 97}",',
+        f'\t"variantId":"hull_{index % 97}_variant_{index}",',
+        f'\t"fluxCapacitors":{rnd.randint(0, 30)},',
+        f'\t"fluxVents":{rnd.randint(0, 30)},',
+        '\t"goalVariant":true,',
+        '\t"hullMods":["hardenedshieldemitter", "heavyarmor"],',
+        '\t"permaMods":[],',
+        f'\t"quality":0.{rnd.randint(0, 9)},',
+        '\t"weaponGroups":[',
+        '\t\t{',
+        '\t\t\t"autofire":false,',
+        '\t\t\t"mode":"LINKED",',
+        '\t\t\t"weapons":{',
+        weapons,
+        '\t\t\t}',
+        '\t\t}',
+        '\t],',
+        '}',
+    ])
+
+
+def _chatter(rnd: random.Random, index: int) -> str:
+    lines = {situation: [{'text': _sentence(rnd, 3, 10)} for _ in range(rnd.randint(1, 5))]
+             for situation in ('greeting', 'battle_start', 'retreat', 'death', 'victory', 'need_help')}
+    return json.dumps({'name': f'{_name(rnd, 1)}_{index}', 'personalities': ['aggressive'], 'lines': lines},
+                      indent=4)
+
+
+def _stringsJSON(rnd: random.Random, categories: int, keys: int) -> str:
+    content = ['{']
+    for categoryID in range(categories):
+        content.append(f'\t"category_{categoryID}":{{')
+        for keyID in range(keys):
+            comment = f'  # {_sentence(rnd, 2, 5, 0)}' if rnd.random() < 0.2 else ''
+            content.append(f'\t\t"key_{categoryID}_{keyID}":"{_sentence(rnd)}",{comment}')
+        content.append('\t},')
+    content.append('}')
+    return '\n'.join(content)
+
+
+def _lunaSettings(rnd: random.Random, rows: int) -> List[Dict[str, str]]:
+    result = []
+    for index in range(rows):
+        fieldType = rnd.choice(('Int', 'Double', 'Boolean', 'Radio', 'Header', 'Text'))
+        result.append({'fieldID': f'setting_{index}', 'fieldName': _name(rnd, 3), 'fieldType': fieldType,
+                       'defaultValue': _name(rnd, 1) if fieldType in ('Radio', 'Header', 'Text') else '1',
+                       'secondaryValue': ','.join(_name(rnd, 1) for _ in range(3)) if fieldType == 'Radio' else '',
+                       'fieldDescription': _sentence(rnd), 'minValue': '0', 'maxValue': '10',
+                       'tab': f'Tab {index % 3}'})
+    return result
+
+
+def _mission(rnd: random.Random, index: int) -> Dict[str, str]:
+    descriptor = json.dumps({'title': _name(rnd, 3), 'difficulty': rnd.choice(('Easy', 'Medium', 'Hard')),
+                             'icon': f'icon_{index}.jpg'}, indent=4)
+    return {'descriptor.json': descriptor, 'mission_text.txt': '\n\n'.join(_paragraph(rnd, 4) for _ in range(3))}
+
+
+def generateCorpus(originalPath: str, scale: int = 1, seed: int = 20240101) -> Dict[str, int]:
+    """
+    在指定目录下生成一个确定性的合成 mod 原文目录树。相同的 **scale** 与 **seed** 总是生成完全相同的文件。
+
+    :param originalPath: 原文目录（相当于 ORIGINAL_PATH）。
+    :param scale: 规模系数，各类文件的数量随之线性增长。
+    :param seed: 随机种子。
+    :return: 各类数据的生成数量。
+    """
+    rnd = random.Random(seed)
+    counts = {
+        'rules': 200 * scale, 'descriptions': 100 * scale, 'factions': 2 * scale, 'skins': 10 * scale,
+        'skills': 5 * scale, 'variants': 50 * scale, 'chatter': 3 * scale, 'strings': 50 * scale,
+        'lunaSettings': 10 * scale, 'missions': scale,
+    }
+    _writeCSV(originalPath, 'data/campaign/rules.csv',
+              ['id', 'trigger', 'conditions', 'script', 'text', 'options', 'notes'], _rulesCSV(rnd, counts['rules']))
+    _writeCSV(originalPath, 'data/strings/descriptions.csv',
+              ['id', 'type', 'text1', 'text2', 'text3', 'text4', 'text5', 'notes'],
+              _descriptionsCSV(rnd, counts['descriptions']))
+    for index in range(counts['factions']):
+        _writeText(originalPath, f'data/world/factions/{_identifier("faction", index)}.faction', _faction(rnd, index))
+    for index in range(counts['skins']):
+        _writeText(originalPath, f'data/hulls/skins/{_identifier("skin", index)}.skin', _skin(rnd, index))
+    for index in range(counts['skills']):
+        _writeText(originalPath, f'data/characters/skills/{_identifier("skill", index)}.skill', _skill(rnd, index))
+    for index in range(counts['variants']):
+        _writeText(originalPath, f'data/variants/group_{index % 5}/{_identifier("variant", index)}.variant',
+                   _variant(rnd, index))
+    for index in range(counts['chatter']):
+        _writeText(originalPath, f'data/config/chatter/characters/{_identifier("chatter", index)}.json',
+                   _chatter(rnd, index))
+    _writeText(originalPath, 'data/strings/strings.json', _stringsJSON(rnd, 5, counts['strings'] // 5 or 1))
+    _writeCSV(originalPath, 'data/config/LunaSettings.csv',
+              ['fieldID', 'fieldName', 'fieldType', 'defaultValue', 'secondaryValue', 'fieldDescription', 'minValue',
+               'maxValue', 'tab'], _lunaSettings(rnd, counts['lunaSettings']))
+    for index in range(counts['missions']):
+        for fileName, content in _mission(rnd, index).items():
+            _writeText(originalPath, f'data/missions/{_identifier("mission", index)}/{fileName}', content)
+    return counts
+
+
+def translateParatranzTree(paratranzPath: str, ratio: float = 0.8, seed: int = 20240101) -> int:
+    """
+    为已导出的中间文件填充伪译文，以便测试写回流程。
+
+    :param paratranzPath: 中间文件目录（相当于 PARA_TRANZ_PATH）。
+    :param ratio: 被标记为已翻译的词条比例。
+    :param seed: 随机种子。
+    :return: 被标记为已翻译的词条数量。
+    """
+    rnd = random.Random(seed)
+    translated = 0
+    for dirPath, _, fileNames in sorted(os.walk(paratranzPath)):
+        for fileName in sorted(fileNames):
+            if not fileName.endswith('.json'):
+                continue
+            filePath = os.path.join(dirPath, fileName)
+            with open(filePath, encoding='UTF-8') as tFile:
+                units = json.load(tFile)
+            for unit in units:
+                if unit['stage'] == 0 and rnd.random() < ratio:
+                    unit['translation'] = f'译：{unit["original"]}'
+                    unit['stage'] = 1
+                    translated += 1
+            with open(filePath, 'w', encoding='UTF-8') as tFile:
+                json.dump(units, tFile, ensure_ascii=False, indent=4)
+    return translated
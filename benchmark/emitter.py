@@ -0,0 +1,83 @@
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmark.corpus import _name, _sentence, _stringsJSON
+
+
+def _largeFaction(rnd: random.Random, scale: int) -> dict:
+    """与 `corpus._faction` 结构相同、但各列表与字典都放大了的势力文件。"""
+    name = _name(rnd)
+    return {
+        'id': 'faction_large', 'displayName': name, 'displayNameWithArticle': f'the {name}',
+        'displayNameLong': f'{name} {_name(rnd, 1)}', 'displayNameLongWithArticle': f'the {name} {_name(rnd, 1)}',
+        'displayNameIsOrAre': 'is', 'personNamePrefix': _name(rnd, 1), 'entityNamePrefix': _name(rnd, 1),
+        'color': [rnd.randint(0, 255) for _ in range(4)], 'tags': ['ships', 'weapons', 'faction_tag'],
+        'ranks': {'ranks': {f'rank_{x}': {'name': _name(rnd, 1)} for x in range(50 * scale)},
+                  'posts': {f'post_{x}': {'name': _name(rnd, 2)} for x in range(50 * scale)}},
+        'fleetTypeNames': {f'fleet_{x}': _name(rnd) for x in range(100 * scale)},
+        'doctrine': {'warships': 3, 'carriers': 2, 'phaseShips': 1, 'officerQuality': 4, 'shipSize': 3.0},
+        'knownShips': {'tags': ['base_bp'], 'hulls': [f'hull_{x}' for x in range(2000 * scale)]},
+        'knownWeapons': {'weapons': [f'weapon_{x}' for x in range(2000 * scale)]},
+        'shipRoles': {f'role_{x}': {f'hull_{y}': rnd.randint(1, 20) for y in range(10)} for x in range(100 * scale)},
+        'music': {f'theme_{x}': _sentence(rnd, 2, 4, 0) for x in range(20 * scale)},
+    }
+
+
+def _documents(scale: int, seed: int) -> Dict[str, Any]:
+    from hzdev_misc_paratranz import SubParatranz
+
+    rnd = random.Random(seed)
+    strings = SubParatranz.loadJSON5(SubParatranz.filterJSON5(_stringsJSON(rnd, 20 * scale, 200)))
+    return {'strings.json': strings, 'faction (large)': _largeFaction(rnd, scale)}
+
+
+def _bestOf(func: Callable[[], str], repeat: int) -> float:
+    bestTime = float('inf')
+    for _ in range(repeat):
+        startTime = time.perf_counter()
+        func()
+        bestTime = min(bestTime, time.perf_counter() - startTime)
+    return bestTime
+
+
+def runEmitterBenchmark(scale: int = 1, repeat: int = 3, seed: int = 20240101) -> List[dict]:
+    """
+    比较 `json5.dump` 与 `hzdev_emitter.dumpsJSON5` 序列化写回文件的耗时，并确认两者的输出逐字节相同。
+
+    :param scale: 文档规模。
+    :param repeat: 每项的运行次数，取最快的一次。
+    :param seed: 随机种子。
+    """
+    import json5
+
+    from hzdev_emitter import dumpsJSON5
+
+    results = []
+    for documentName, document in _documents(scale, seed).items():
+        expected = json5.dumps(document, ensure_ascii=False, indent=4, quote_keys=True)
+        json5Time = _bestOf(lambda: json5.dumps(document, ensure_ascii=False, indent=4, quote_keys=True), repeat)
+        emitterTime = _bestOf(lambda: dumpsJSON5(document), repeat)
+        results.append(dict(document=documentName, bytes=len(expected.encode('UTF-8')),
+                            json5MS=round(json5Time * 1000, 2), emitterMS=round(emitterTime * 1000, 2),
+                            speedup=round(json5Time / emitterTime, 1), identical=dumpsJSON5(document) == expected))
+    return results
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark.emitter', description='写回文件序列化耗时比较（json5 与 C 编码器）')
+    parser.add_argument('--scale', type=int, default=1, help='文档规模')
+    parser.add_argument('--repeat', type=int, default=3, help='每项的运行次数，取最快的一次')
+    args = parser.parse_args(argv)
+    results = runEmitterBenchmark(args.scale, args.repeat)
+    for result in results:
+        status = '输出相同' if result['identical'] else '输出不同'
+        print(f'{result["document"]:<18}{result["bytes"] / 1024:>9.1f} KB  json5 {result["json5MS"]:>9.2f} ms  '
+              f'emitter {result["emitterMS"]:>8.2f} ms  {result["speedup"]:>6.1f}x  {status}')
+    if not all(x['identical'] for x in results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
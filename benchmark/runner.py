@@ -0,0 +1,244 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Dict, List
+
+REPOSITORY_PATH = str(Path(__file__).parent.parent)
+
+
+def _buildProject(projectDirectory: str):
+    """为临时项目目录创建处理器，目录配置直接传给处理器。"""
+    from dataModel import ProjectPaths
+    from hzdev_misc_paratranz import SubParatranz
+
+    return SubParatranz(projectPaths=ProjectPaths.fromProjectDirectory(projectDirectory))
+
+
+def _countParatranzUnits(paratranzPath: str, translatedOnly: bool = False) -> int:
+    result = 0
+    for dirPath, _, fileNames in os.walk(paratranzPath):
+        for fileName in fileNames:
+            if fileName.endswith('.json'):
+                with open(os.path.join(dirPath, fileName), encoding='UTF-8') as tFile:
+                    units = json.load(tFile)
+                result += len([x for x in units if x['stage'] in (1, 3, 5)]) if translatedOnly else len(units)
+    return result
+
+
+def _prepareCorpus(projectDirectory: str, scale: int):
+    from benchmark.corpus import generateCorpus
+
+    generateCorpus(os.path.join(projectDirectory, 'original'), scale)
+
+
+def _prepareTranslated(projectDirectory: str, scale: int):
+    from benchmark.corpus import translateParatranzTree
+
+    _prepareCorpus(projectDirectory, scale)
+    _buildProject(projectDirectory).ExtractAll()
+    translateParatranzTree(os.path.join(projectDirectory, 'para_tranz', 'output'))
+
+
+# 每个测试项由 (准备函数, 计时函数) 组成，计时函数返回本次处理的单元数量
+def _caseExtract(projectDirectory: str, scale: int) -> int:
+    _buildProject(projectDirectory).ExtractAll()
+    return _countParatranzUnits(os.path.join(projectDirectory, 'para_tranz', 'output'))
+
+
+def _caseWriteback(projectDirectory: str, scale: int) -> int:
+    _buildProject(projectDirectory).WritebackAll()
+    return _countParatranzUnits(os.path.join(projectDirectory, 'para_tranz', 'output'), True)
+
+
+def _caseExtractPipeline(projectDirectory: str, scale: int) -> int:
+    from hzdev_pipeline import StagedPipeline
+
+    _buildProject(projectDirectory).ExtractAll(StagedPipeline())
+    return _countParatranzUnits(os.path.join(projectDirectory, 'para_tranz', 'output'))
+
+
+def _caseWritebackPipeline(projectDirectory: str, scale: int) -> int:
+    from hzdev_pipeline import StagedPipeline
+
+    _buildProject(projectDirectory).WritebackAll(StagedPipeline())
+    return _countParatranzUnits(os.path.join(projectDirectory, 'para_tranz', 'output'), True)
+
+
+def _readAllFactions(projectDirectory: str) -> List[str]:
+    factionFolder = os.path.join(projectDirectory, 'original', 'data', 'world', 'factions')
+    result = []
+    for fileName in sorted(os.listdir(factionFolder)):
+        with open(os.path.join(factionFolder, fileName), encoding='UTF-8') as tFile:
+            result.append(tFile.read())
+    return result
+
+
+def _caseFilterJSON5(projectDirectory: str, scale: int) -> int:
+    from hzdev_misc_paratranz import SubParatranz
+
+    contents = _readAllFactions(projectDirectory)
+    lines = 0
+    for _ in range(10):
+        for content in contents:
+            lines += len(SubParatranz.filterJSON5(content).splitlines())
+    return lines
+
+
+def _caseQuoteHelpers(projectDirectory: str, scale: int) -> int:
+    import re
+    from hzdev_misc_paratranz import SubParatranz
+
+    contents = [SubParatranz.filterJSON5(x) for x in _readAllFactions(projectDirectory)]
+    quoteIn = getattr(SubParatranz, '_SubParatranz__quoteSpecialDataForIn')
+    quoteOut = getattr(SubParatranz, '_SubParatranz__quoteSpecialDataForOut')
+    pattern = re.compile('^"?tags"?: *\\[')
+    lines = 0
+    for _ in range(10):
+        for content in contents:
+            quoteIn(pattern, content)
+            quoteOut(pattern, content)
+            lines += 2 * len(content.splitlines())
+    return lines
+
+
+def _caseHighlight(projectDirectory: str, scale: int) -> int:
+    from extractHighlightTextToJava import mainFunc
+
+    outputFolder = os.path.join(projectDirectory, 'highlight')
+    os.makedirs(outputFolder, exist_ok=True)
+    sourceFilePath = os.path.join(projectDirectory, 'original', 'data', 'campaign', 'rules.csv')
+    mainFunc(sourceFilePath=sourceFilePath, javaClassName='BenchmarkHighlight', stringsCategory='benchmark',
+             csvOutputFolder=outputFolder, javaOutputFolder=outputFolder, stringsOutputFolder=outputFolder)
+    with open(sourceFilePath, encoding='UTF-8', newline='') as tFile:
+        return len(tFile.read().split('\nrule_')) - 1
+
+
+CASES: Dict[str, tuple] = {
+    'extract': (_prepareCorpus, _caseExtract),
+    'writeback': (_prepareTranslated, _caseWriteback),
+    'extractPipeline': (_prepareCorpus, _caseExtractPipeline),
+    'writebackPipeline': (_prepareTranslated, _caseWritebackPipeline),
+    'filterJSON5': (_prepareCorpus, _caseFilterJSON5),
+    'quoteHelpers': (_prepareCorpus, _caseQuoteHelpers),
+    'highlight': (_prepareCorpus, _caseHighlight),
+}
+
+
+def _peakRSS() -> int | None:
+    """当前进程的峰值常驻内存（字节），不支持的平台返回 None。"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _runCaseInChild(caseName: str, scale: int, resultQueue):
+    """在独立进程中执行一个测试项，使得峰值内存互不干扰。"""
+    prepareFunc, caseFunc = CASES[caseName]
+    try:
+        with tempfile.TemporaryDirectory(prefix='hzdev_bench_') as projectDirectory:
+            with contextlib.redirect_stdout(io.StringIO()):
+                prepareFunc(projectDirectory, scale)
+                startTime = time.perf_counter()
+                units = caseFunc(projectDirectory, scale)
+                wallTime = time.perf_counter() - startTime
+    except Exception:
+        resultQueue.put({'case': caseName, 'scale': scale, 'error': traceback.format_exc()})
+        return
+    resultQueue.put({'case': caseName, 'scale': scale, 'wallTime': wallTime, 'peakRSS': _peakRSS(),
+                     'units': units, 'unitsPerSecond': units / wallTime if wallTime > 0 else None})
+
+
+def runCase(caseName: str, scale: int) -> dict:
+    """执行一个测试项并返回其结果。"""
+    context = multiprocessing.get_context('spawn')
+    resultQueue = context.Queue()
+    process = context.Process(target=_runCaseInChild, args=(caseName, scale, resultQueue))
+    process.start()
+    result = resultQueue.get()
+    process.join()
+    if 'error' in result:
+        raise RuntimeError(f'测试项 {caseName}（scale={scale}）执行失败：\n{result["error"]}')
+    return result
+
+
+def _gitCommit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPOSITORY_PATH, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def runBenchmarks(caseNames: List[str], scales: List[int], repeat: int = 1,
+                  printFunc: Callable[[str], None] = print) -> dict:
+    """
+    在各个规模下执行指定的测试项，重复多次时取耗时最短的一次。
+
+    :return: 可直接写入 JSON 结果文件的字典。
+    """
+    results = []
+    for scale in scales:
+        for caseName in caseNames:
+            best = None
+            for _ in range(repeat):
+                result = runCase(caseName, scale)
+                if best is None or result['wallTime'] < best['wallTime']:
+                    best = result
+            results.append(best)
+            printFunc(f'{caseName:<14} scale={scale:<4} {best["wallTime"]:>9.3f}s '
+                      f'{best["units"]:>9} units {best["unitsPerSecond"] or 0:>12.1f} units/s '
+                      f'peakRSS={(best["peakRSS"] or 0) / 1048576:.1f}MiB')
+    return {'meta': {'commit': _gitCommit(), 'python': platform.python_version(), 'platform': platform.platform(),
+                     'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'repeat': repeat},
+            'results': results}
+
+
+def compareResults(oldFilePath: str, newFilePath: str, printFunc: Callable[[str], None] = print):
+    """比较两个结果文件，输出每个测试项的耗时比值（新/旧，小于1表示变快了）。"""
+    with open(oldFilePath, encoding='UTF-8') as tFile:
+        oldData = {(x['case'], x['scale']): x for x in json.load(tFile)['results']}
+    with open(newFilePath, encoding='UTF-8') as tFile:
+        newData = {(x['case'], x['scale']): x for x in json.load(tFile)['results']}
+    for key in sorted(oldData.keys() & newData.keys()):
+        oldTime, newTime = oldData[key]['wallTime'], newData[key]['wallTime']
+        printFunc(f'{key[0]:<14} scale={key[1]:<4} {oldTime:>9.3f}s -> {newTime:>9.3f}s '
+                  f'x{newTime / oldTime if oldTime > 0 else float("nan"):.2f}')
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark.runner', description='StarsectorTranslationCode 性能基准测试')
+    parser.add_argument('--cases', default=','.join(CASES), help=f'逗号分隔的测试项，可选：{",".join(CASES)}')
+    parser.add_argument('--scales', default='1,5,20', help='逗号分隔的规模系数')
+    parser.add_argument('--repeat', type=int, default=1, help='每个测试项的重复次数，取最快的一次')
+    parser.add_argument('--output', default='bench_output.json', help='结果文件路径')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='比较两个结果文件后退出')
+    args = parser.parse_args(argv)
+    if args.compare:
+        compareResults(*args.compare)
+        return
+    caseNames = [x.strip() for x in args.cases.split(',') if x.strip() != '']
+    for caseName in caseNames:
+        if caseName not in CASES:
+            parser.error(f'未知的测试项：{caseName}')
+    report = runBenchmarks(caseNames, [int(x) for x in args.scales.split(',')], args.repeat)
+    with open(args.output, 'w', encoding='UTF-8') as tFile:
+        json.dump(report, tFile, ensure_ascii=False, indent=4)
+    print(f'测试结果已写入 {args.output}。')
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, REPOSITORY_PATH)
+    main()
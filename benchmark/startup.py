@@ -0,0 +1,102 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, NamedTuple, Set
+
+from benchmark.runner import REPOSITORY_PATH
+
+# 启动阶段不应导入的模块：解析后端、CSV 处理器与只在特定功能中使用的标准库模块
+DEFERRED_MODULES = ('json5', 'hjson', 'pprint', 'hzdev_csv_paratranz', 'hzdev_csv_patch', 'concurrent.futures',
+                    'tracemalloc', 'sqlite3', 'asyncio')
+
+
+class StartupScenario(NamedTuple):
+    name: str
+    arguments: List[str]  # 传给解释器的参数（位于 -X importtime 之后）
+    budgetMS: float  # 导入耗时的上限（毫秒）
+
+
+def _scenarios(projectDirectory: str) -> List[StartupScenario]:
+    constructProject = ('from dataModel import ProjectPaths; from hzdev_misc_paratranz import SubParatranz; '
+                        f'SubParatranz(projectPaths=ProjectPaths.fromProjectDirectory({projectDirectory!r}))')
+    return [
+        StartupScenario('import', ['-c', 'import hzdev_misc_paratranz'], 40.0),
+        StartupScenario('cli-help', [os.path.join(REPOSITORY_PATH, 'hzdev_cli.py'), '--help'], 20.0),
+        StartupScenario('construct', ['-c', constructProject], 40.0),
+    ]
+
+
+def _importTimes(arguments: List[str]) -> Dict[str, int]:
+    """以 -X importtime 运行解释器，返回顶层导入的模块及其累计耗时（微秒）。"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *arguments], cwd=REPOSITORY_PATH,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    result = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, moduleName = line[len('import time:'):].split('|')
+        result[moduleName.rstrip()] = int(cumulative)
+    return result
+
+
+def _topLevel(importTimes: Dict[str, int]) -> Dict[str, int]:
+    return {x.strip(): y for x, y in importTimes.items() if not x.startswith('  ')}
+
+
+def _allModules(importTimes: Dict[str, int]) -> Set[str]:
+    return {x.strip() for x in importTimes}
+
+
+def measureScenario(scenario: StartupScenario, baseline: Set[str], repeat: int) -> dict:
+    """
+    测量一个场景的导入耗时：解释器自身启动时导入的模块（baseline）之外，所有顶层导入的累计耗时之和，取多次运行中最快的一次。
+    """
+    bestMS, modules = None, set()
+    for _ in range(repeat):
+        importTimes = _importTimes(scenario.arguments)
+        totalMS = sum(y for x, y in _topLevel(importTimes).items() if x not in baseline) / 1000
+        if bestMS is None or totalMS < bestMS:
+            bestMS = totalMS
+        modules |= _allModules(importTimes)
+    deferredImported = sorted(x for x in DEFERRED_MODULES if x in modules)
+    return dict(name=scenario.name, importMS=round(bestMS, 2), budgetMS=scenario.budgetMS,
+                deferredImported=deferredImported,
+                passed=bestMS <= scenario.budgetMS and len(deferredImported) == 0)
+
+
+def runStartupCheck(repeat: int = 5, budgetScale: float = 1.0) -> List[dict]:
+    """
+    检查启动耗时是否在预算之内，并确认解析后端等模块没有在启动阶段被导入。
+
+    :param repeat: 每个场景的运行次数，取最快的一次。
+    :param budgetScale: 预算的缩放系数，用于较慢的机器。
+    """
+    baseline = set(_topLevel(_importTimes(['-c', 'pass'])))
+    with tempfile.TemporaryDirectory() as projectDirectory:
+        os.makedirs(os.path.join(projectDirectory, 'original'))
+        results = []
+        for scenario in _scenarios(projectDirectory):
+            scenario = scenario._replace(budgetMS=scenario.budgetMS * budgetScale)
+            results.append(measureScenario(scenario, baseline, repeat))
+    return results
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark.startup', description='启动耗时预算检查（基于 -X importtime）')
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景的运行次数，取最快的一次')
+    parser.add_argument('--budget-scale', type=float, default=1.0, help='预算的缩放系数，用于较慢的机器')
+    args = parser.parse_args(argv)
+    results = runStartupCheck(args.repeat, args.budget_scale)
+    for result in results:
+        status = '通过' if result['passed'] else '未通过'
+        print(f'{result["name"]:<12}{result["importMS"]:>9.2f} ms / {result["budgetMS"]:.0f} ms  {status}')
+        if result['deferredImported']:
+            print(f'    启动阶段导入了应当推迟的模块：{", ".join(result["deferredImported"])}')
+    if not all(x['passed'] for x in results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,9 @@
+import os
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Tuple
+
+
 class ParatranzDataUnit:
     key: str  # 词条的唯一ID
     original: str  # 词条的原文（待翻译文本）
@@ -26,4 +32,148 @@ class ParatranzDataUnit:
     @property
     def isTranslated(self):
         """该词条是否被标记为已翻译、已检查（一校）或已审核？"""
-        return self.stage in (1, 3, 5)
\ No newline at end of file
+        return self.stage in (1, 3, 5)
+
+
+class JobFilter:
+    """
+    描述一次运行所选中的任务范围，用于只处理部分文件。
+
+    路径匹配使用 fnmatch 风格的通配符（`*` 可以跨越目录），路径均为相对于原文目录、以 `/` 分隔的相对路径，
+    开头的 `/` 会被忽略。不含通配符的模式同时匹配该路径本身及其下的所有文件。
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (), handlers: Iterable[str] = (),
+                 csvConfigs: Iterable[str] = ()):
+        """
+        :param include: 要处理的路径模式，为空时处理所有路径。
+        :param exclude: 要排除的路径模式，优先于 include。
+        :param handlers: 要执行的处理器名称（in*/out* 均可，以及特殊处理器 missions / variants）。
+        :param csvConfigs: 要执行的 CSV 配置，可以是文件名（rules.csv）或相对路径（data/campaign/rules.csv）。
+        """
+        self.include = [self.__normalize(x) for x in include]
+        self.exclude = [self.__normalize(x) for x in exclude]
+        self.handlers = set(handlers)
+        self.csvConfigs = {self.__normalize(x) for x in csvConfigs}
+
+    @property
+    def isEmpty(self) -> bool:
+        """该过滤器是否选中了全部任务。"""
+        return not (self.include or self.exclude or self.handlers or self.csvConfigs)
+
+    @staticmethod
+    def __normalize(path: str) -> str:
+        return path.replace('\\', '/').lstrip('/')
+
+    @staticmethod
+    def __matchPattern(path: str, pattern: str) -> bool:
+        return fnmatchcase(path, pattern) or fnmatchcase(path, pattern.rstrip('/') + '/*')
+
+    def matchPath(self, relativePath: str) -> bool:
+        """该相对路径的文件是否被选中。"""
+        relativePath = self.__normalize(relativePath)
+        if any(self.__matchPattern(relativePath, x) for x in self.exclude):
+            return False
+        return len(self.include) == 0 or any(self.__matchPattern(relativePath, x) for x in self.include)
+
+    def mayContain(self, relativeFolder: str) -> bool:
+        """该相对目录下是否可能存在被选中的文件，用于在扫描目录时提前剪枝。"""
+        relativeFolder = self.__normalize(relativeFolder).rstrip('/')
+        if relativeFolder == '':
+            return True
+        if any(self.__matchPattern(relativeFolder, x) for x in self.exclude):
+            return False
+        if len(self.include) == 0:
+            return True
+        for pattern in self.include:
+            literalPrefix = pattern
+            for wildcard in '*?[':
+                literalPrefix = literalPrefix.partition(wildcard)[0]
+            if literalPrefix.startswith(relativeFolder + '/') or literalPrefix.rstrip('/') == relativeFolder or \
+                    (relativeFolder + '/').startswith(literalPrefix):
+                return True
+        return False
+
+    def matchHandler(self, *names: str) -> bool:
+        """给定名称的处理器是否被选中。未指定任何处理器与 CSV 配置时，所有处理器都被选中。"""
+        if not (self.handlers or self.csvConfigs):
+            return True
+        return any(name in self.handlers for name in names)
+
+    def matchCSVConfig(self, relativeFilePath: str) -> bool:
+        """给定相对路径的 CSV 配置是否被选中（同时检查路径过滤）。"""
+        if not self.matchPath(relativeFilePath):
+            return False
+        if not (self.handlers or self.csvConfigs):
+            return True
+        relativeFilePath = self.__normalize(relativeFilePath)
+        return relativeFilePath in self.csvConfigs or relativeFilePath.rpartition('/')[2] in self.csvConfigs
+
+
+class ProjectPaths(NamedTuple):
+    """一个汉化项目（通常对应一个 mod）使用的目录。"""
+    originalPath: str  # 原文目录
+    translationPath: str  # 汉化文件的输出目录
+    paratranzPath: str  # Paratranz 中间文件目录
+
+    @classmethod
+    def fromProjectDirectory(cls, projectDirectory: str | Path):
+        """
+        按照标准布局（original / localization / para_tranz/output）生成目录配置。
+
+        :param projectDirectory: 项目根目录。
+        """
+        projectDirectory = Path(projectDirectory)
+        return cls(str(projectDirectory / 'original'), str(projectDirectory / 'localization'),
+                   str(projectDirectory / 'para_tranz' / 'output'))
+
+    @property
+    def glossaryPath(self) -> str:
+        """本地术语文件的路径，与中间文件目录位于同一个上级目录中。"""
+        return os.path.join(os.path.dirname(self.paratranzPath), 'glossary.json')
+
+    @property
+    def unitStorePath(self) -> str:
+        """SQLite 词条库的默认路径，与中间文件目录位于同一个上级目录中。"""
+        return os.path.join(os.path.dirname(self.paratranzPath), 'units.sqlite3')
+
+    @property
+    def journalPath(self) -> str:
+        """运行日志（`RunJournal`）的默认路径，与中间文件目录位于同一个上级目录中。"""
+        return os.path.join(os.path.dirname(self.paratranzPath), 'run_journal.jsonl')
+
+    @property
+    def validationReportPath(self) -> str:
+        """占位符校验报告的默认路径，与中间文件目录位于同一个上级目录中。"""
+        return os.path.join(os.path.dirname(self.paratranzPath), 'placeholder_report.json')
+
+    @property
+    def versionDiffPath(self) -> str:
+        """版本差异报告的默认路径，与中间文件目录位于同一个上级目录中。"""
+        return os.path.join(os.path.dirname(self.paratranzPath), 'version_diff.json')
+
+    @property
+    def searchIndexPath(self) -> str:
+        """全文检索索引的默认路径，与中间文件目录位于同一个上级目录中。"""
+        return os.path.join(os.path.dirname(self.paratranzPath), 'search_index.sqlite3')
+
+
+# 默认的项目目录：本仓库的上级目录。创建处理器时未指定目录配置则使用这组路径，处理其它项目时应显式传入 `ProjectPaths`
+DEFAULT_PROJECT_PATHS = ProjectPaths.fromProjectDirectory(Path(__file__).parent.parent)
+
+
+class LanguageTarget(NamedTuple):
+    """多语言写回中的一种目标语言，与主项目共用原文目录。"""
+    name: str  # 语言名称，只用于输出信息，比如 'zh-TW'
+    paratranzPath: str  # 该语言的 Paratranz 中间文件目录
+    translationPath: str  # 该语言的汉化文件输出目录
+
+    def projectPaths(self, originalPath: str) -> ProjectPaths:
+        return ProjectPaths(originalPath, self.translationPath, self.paratranzPath)
+
+
+class ProjectJob(NamedTuple):
+    """一次提取或写回中可以独立执行的任务，比如一个原文文件或一个 CSV 配置。"""
+    name: str  # 任务名称，通常是相对路径
+    func: Callable[[], bool]  # 执行任务，返回该任务是否实际处理了文件
+    inputs: Tuple[str, ...] = ()  # 任务会读取的文件（绝对路径），供流水线预读；不存在的文件会被忽略
@@ -0,0 +1,232 @@
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, NamedTuple
+
+from hzdev_output import NEW_FILE_MODE
+
+# 所有条目使用固定的修改时间（1980-01-01 00:00:00，zip 格式能表示的最早时间），使相同的内容总是得到相同的归档
+FIXED_DOS_TIME = 0
+FIXED_DOS_DATE = (1 << 5) | 1
+COMPRESS_LEVEL = 6
+_FLAG_UTF8 = 0x0800
+_METHOD_STORED = 0
+_METHOD_DEFLATED = 8
+# 可以从旧归档原样复制的压缩方式，以及解压所需的 zip 版本：不压缩、deflate、bzip2、lzma
+_VERSION_NEEDED = {_METHOD_STORED: 20, _METHOD_DEFLATED: 20, 12: 46, 14: 63}
+_FLAG_ENCRYPTED = 0x0001
+_FLAG_METHOD_OPTIONS = 0x0006  # 压缩方式的选项（比如 lzma 的结束标记），复制旧条目时保留
+_EXTERNAL_ATTR = (0o100644 << 16)  # 普通文件，权限 rw-r--r--
+_EXTERNAL_ATTR_DIR = (0o40755 << 16) | 0x10  # 目录，权限 rwxr-xr-x，并带有 MS-DOS 的目录属性
+_MAX_ENTRIES = 0xFFFF
+_MAX_SIZE = 0xFFFFFFFF
+
+
+class ArchiveEntry(NamedTuple):
+    """归档中一个条目的压缩数据所在的位置。"""
+    method: int  # 压缩方式：0 为不压缩，8 为 deflate
+    crc: int
+    compressedSize: int
+    size: int
+    offset: int  # 压缩数据在所在文件中的偏移
+    isOld: bool  # 压缩数据位于旧归档中（原样复用），否则位于暂存文件中
+    flags: int = _FLAG_UTF8  # 通用标志位
+
+
+class ZipArchiveWriter:
+    """
+    把写回的汉化文件直接写入 zip 归档，不需要先在磁盘上生成汉化目录。
+
+    配合 `outputWriter.redirect` 使用：写入 rootPath 之下的文件时，内容立即以 deflate 压缩并追加到归档旁的暂存文件中，
+    内存中只保留各条目的位置；`close` 时按路径排序写出归档，所有条目使用固定的修改时间与权限，
+    因此相同的输入总是得到逐字节相同的归档。
+
+    归档已经存在时：
+        - 本次写入的内容与旧条目相同（CRC 与大小一致）时，原样复用旧条目的压缩数据，不再重新压缩；
+        - 本次没有写入的旧条目（比如被任务过滤器排除的文件、手工加入的文件、目录条目）原样保留，
+          以 bzip2、lzma 压缩的条目也原样复制；含有无法原样复制的条目（加密条目或其它压缩方式）时抛出 RuntimeError，
+          而不是在重写时丢掉这些条目；
+        - 没有任何变化时不会重写归档文件。
+    归档先写入同目录下的临时文件，再以 `os.replace` 替换，出错时旧归档保持不变。可以在多个线程之间共享。
+    """
+
+    def __init__(self, archivePath: str, rootPath: str, compressLevel: int = COMPRESS_LEVEL):
+        """
+        :param archivePath: 归档文件路径。
+        :param rootPath: 汉化目录，其中的文件以相对路径作为归档条目的名称（使用'/'分隔）。
+        :param compressLevel: deflate 压缩级别。
+        """
+        import tempfile
+
+        self.archivePath = os.path.abspath(archivePath)
+        self.rootPath = os.path.join(os.path.abspath(rootPath), '')
+        self.compressLevel = compressLevel
+        self.written = 0  # 新增或内容有变化的条目数量
+        self.reused = 0  # 内容未变而复用旧压缩数据的条目数量
+        self.__lock = threading.Lock()
+        self.__entries: Dict[str, ArchiveEntry] = {}
+        self.__oldEntries: Dict[str, ArchiveEntry] = {}
+        self.__oldFile = None
+        if os.path.isfile(self.archivePath):
+            self.__loadOldArchive()
+        os.makedirs(os.path.dirname(self.archivePath), exist_ok=True)
+        self.__spool = tempfile.TemporaryFile(prefix='.archive.', dir=os.path.dirname(self.archivePath))
+        self.__spoolSize = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        if excType is None:
+            self.close()
+        else:
+            self.discard()
+
+    def covers(self, filePath: str) -> bool:
+        """文件是否位于汉化目录之中，即是否应当写入归档。"""
+        return os.path.abspath(filePath).startswith(self.rootPath)
+
+    def add(self, filePath: str, content: bytes) -> bool:
+        """
+        写入一个文件。同一个文件写入多次时以最后一次为准。
+
+        :return: 内容是否与旧归档中的条目不同（或是新条目）。
+        """
+        name = self.__entryName(filePath)
+        crc = zlib.crc32(content)
+        oldEntry = self.__oldEntries.get(name)
+        if oldEntry is not None and oldEntry.crc == crc and oldEntry.size == len(content):
+            with self.__lock:
+                self.__entries[name] = oldEntry
+                self.reused += 1
+            return False
+        compressor = zlib.compressobj(self.compressLevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+        compressed = compressor.compress(content) + compressor.flush()
+        method = _METHOD_DEFLATED
+        if len(compressed) >= len(content):
+            compressed, method = content, _METHOD_STORED
+        if len(content) > _MAX_SIZE:
+            raise RuntimeError(f'{name} 超过了 4 GB，无法写入不使用 zip64 的归档')
+        with self.__lock:
+            self.__spool.seek(self.__spoolSize)
+            self.__spool.write(compressed)
+            self.__entries[name] = ArchiveEntry(method, crc, len(compressed), len(content), self.__spoolSize, False)
+            self.__spoolSize += len(compressed)
+            self.written += 1
+        return True
+
+    def close(self):
+        """按路径排序写出归档，并关闭暂存文件与旧归档。"""
+        try:
+            for name, oldEntry in self.__oldEntries.items():
+                self.__entries.setdefault(name, oldEntry)
+            if len(self.__entries) > _MAX_ENTRIES:
+                raise RuntimeError(f'归档条目超过了 {_MAX_ENTRIES} 个，无法写入不使用 zip64 的归档')
+            if self.written == 0 and self.__oldFile is not None:
+                print(f'归档：{len(self.__entries)} 个条目，内容没有变化，未重写 {self.archivePath}。')
+                return
+            self.__writeArchive()
+            print(f'归档：{len(self.__entries)} 个条目，写入 {self.written} 个，复用 {self.reused} 个，'
+                  f'已保存到 {self.archivePath}。')
+        finally:
+            self.discard()
+
+    def discard(self):
+        """放弃本次写入的内容，旧归档保持不变。"""
+        self.__spool.close()
+        if self.__oldFile is not None:
+            self.__oldFile.close()
+            self.__oldFile = None
+
+    def __entryName(self, filePath: str) -> str:
+        filePath = os.path.abspath(filePath)
+        if not filePath.startswith(self.rootPath):
+            raise RuntimeError(f'{filePath} 不在汉化目录 {self.rootPath} 之中，无法写入归档')
+        return filePath[len(self.rootPath):].replace(os.sep, '/')
+
+    def __loadOldArchive(self):
+        """
+        读取旧归档的目录，记录每个条目压缩数据的位置，以便原样复制到新归档中。
+
+        :raise RuntimeError: 旧归档中有加密的条目或不支持的压缩方式，重写归档会丢失这些条目。
+        """
+        import zipfile
+
+        try:
+            with zipfile.ZipFile(self.archivePath) as oldArchive:
+                infoList = oldArchive.infolist()
+        except (OSError, zipfile.BadZipFile):
+            print(f'归档：无法读取现有的 {self.archivePath}，将重新生成。')
+            return
+        unsupported = [info.filename for info in infoList if not info.is_dir() and (
+                info.compress_type not in _VERSION_NEEDED or info.flag_bits & _FLAG_ENCRYPTED)]
+        if len(unsupported) > 0:
+            raise RuntimeError(f'现有的归档 {self.archivePath} 中有 {len(unsupported)} 个加密或压缩方式不受支持的条目'
+                               f'（比如 {unsupported[0]}），重写归档会丢失这些条目；请移走旧归档或另选归档路径')
+        self.__oldFile = open(self.archivePath, 'rb')
+        for info in infoList:
+            if info.is_dir():
+                self.__oldEntries[info.filename] = ArchiveEntry(_METHOD_STORED, 0, 0, 0, 0, True)
+                continue
+            self.__oldFile.seek(info.header_offset + 26)
+            nameLength, extraLength = struct.unpack('<HH', self.__oldFile.read(4))
+            dataOffset = info.header_offset + 30 + nameLength + extraLength
+            self.__oldEntries[info.filename] = ArchiveEntry(info.compress_type, info.CRC, info.compress_size,
+                                                            info.file_size, dataOffset, True,
+                                                            (info.flag_bits & _FLAG_METHOD_OPTIONS) | _FLAG_UTF8)
+
+    def __writeArchive(self):
+        import tempfile
+
+        dirPath, fileName = os.path.split(self.archivePath)
+        fd, tempPath = tempfile.mkstemp(prefix=f'.{fileName}.', suffix='.tmp', dir=dirPath)
+        try:
+            with os.fdopen(fd, 'wb') as tFile:
+                centralDirectory = []
+                for name in sorted(self.__entries):
+                    entry = self.__entries[name]
+                    encodedName = name.encode('UTF-8')
+                    headerOffset = tFile.tell()
+                    versionNeeded = _VERSION_NEEDED[entry.method]
+                    tFile.write(struct.pack('<IHHHHHIIIHH', 0x04034B50, versionNeeded, entry.flags, entry.method,
+                                            FIXED_DOS_TIME, FIXED_DOS_DATE, entry.crc, entry.compressedSize,
+                                            entry.size, len(encodedName), 0))
+                    tFile.write(encodedName)
+                    self.__copyData(entry, tFile)
+                    externalAttr = _EXTERNAL_ATTR_DIR if name.endswith('/') else _EXTERNAL_ATTR
+                    centralDirectory.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014B50, (3 << 8) | versionNeeded,
+                                                        versionNeeded, entry.flags, entry.method, FIXED_DOS_TIME,
+                                                        FIXED_DOS_DATE, entry.crc, entry.compressedSize, entry.size,
+                                                        len(encodedName), 0, 0, 0, 0, externalAttr,
+                                                        headerOffset) + encodedName)
+                directoryOffset = tFile.tell()
+                for record in centralDirectory:
+                    tFile.write(record)
+                directorySize = tFile.tell() - directoryOffset
+                if directoryOffset > _MAX_SIZE:
+                    raise RuntimeError('归档超过了 4 GB，无法写入不使用 zip64 的归档')
+                tFile.write(struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, len(centralDirectory), len(centralDirectory),
+                                        directorySize, directoryOffset, 0))
+            if self.__oldFile is not None:
+                self.__oldFile.close()  # Windows 下无法替换仍处于打开状态的文件
+                self.__oldFile = None
+            os.chmod(tempPath, NEW_FILE_MODE)
+            os.replace(tempPath, self.archivePath)
+        except BaseException:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            raise
+
+    def __copyData(self, entry: ArchiveEntry, tFile):
+        sourceFile = self.__oldFile if entry.isOld else self.__spool
+        sourceFile.seek(entry.offset)
+        remaining = entry.compressedSize
+        while remaining > 0:
+            chunk = sourceFile.read(min(remaining, 1 << 20))
+            if len(chunk) == 0:
+                raise RuntimeError('归档的压缩数据不完整')
+            tFile.write(chunk)
+            remaining -= len(chunk)
@@ -0,0 +1,143 @@
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os.path import isdir
+from typing import List, NamedTuple, Tuple, Iterable
+
+from dataModel import JobFilter, ProjectPaths
+from hzdev_output import outputWriter
+from hzdev_paratranz_io import ParatranzFileIO
+from hzdev_parse_cache import parseCache
+from hzdev_profiler import profiler
+from hzdev_translation_memory import TranslationMemory
+from hzdev_unit_store import SQLiteUnitStore
+
+
+class ModSummary(NamedTuple):
+    """批量处理中一个 mod 的处理结果。"""
+    projectDirectory: str
+    jobCount: int  # 任务总数
+    handledCount: int  # 实际处理了文件的任务数
+    failures: List[Tuple[str, str]]  # (任务名称, 错误信息)
+    busyTime: float  # 各任务耗时之和（秒）
+    wallTime: float  # 从第一个任务开始到最后一个任务结束的时间（秒）
+
+    @property
+    def succeeded(self) -> bool:
+        return len(self.failures) == 0
+
+
+class _ModState:
+    """批量处理过程中一个 mod 的统计数据。"""
+
+    def __init__(self, projectDirectory: str):
+        self.projectDirectory = projectDirectory
+        self.jobCount = 0
+        self.handledCount = 0
+        self.failures: List[Tuple[str, str]] = []
+        self.busyTime = 0.0
+        self.firstStart = None
+        self.lastEnd = None
+
+    def asSummary(self) -> ModSummary:
+        wallTime = self.lastEnd - self.firstStart if self.firstStart is not None else 0.0
+        return ModSummary(self.projectDirectory, self.jobCount, self.handledCount, self.failures, self.busyTime,
+                          wallTime)
+
+
+def _timedJob(func) -> Tuple[bool, float, float]:
+    startTime = time.perf_counter()
+    handled = func()
+    return bool(handled), startTime, time.perf_counter()
+
+
+def runBatch(projectDirectories: Iterable[str], isWriteback: bool = False, jobFilter: JobFilter = None,
+             maxWorkers: int = None, parseCacheEntries: int = 512, projectClass=None,
+             memory: TranslationMemory = None, useUnitStore: bool = False,
+             csvPatchWriteback: bool = False, shardUnits: int = 0, shardBytes: int = 0) -> List[ModSummary]:
+    """
+    在同一个进程中处理多个 mod。
+
+    所有 mod 的任务提交到同一个线程池中执行，共享解析缓存与已编译的分派表。某个任务失败只会记录在该 mod 的结果中，
+    不会影响其它任务。
+
+    :param projectDirectories: 各个 mod 的项目根目录，每个目录都应符合 original / localization / para_tranz 的标准布局。
+    :param isWriteback: 执行写回，否则执行提取。
+    :param jobFilter: 应用于所有 mod 的任务过滤器。
+    :param maxWorkers: 线程池大小，不指定则由 ThreadPoolExecutor 决定。
+    :param parseCacheEntries: 共享解析缓存的条目上限，为0时不缓存。
+    :param projectClass: 处理器类，不指定则使用 `SubParatranz`。
+    :param memory: 提取时共享的翻译记忆库，所有 mod 现有的中间文件都会在提取开始前加入其中。
+    :param useUnitStore: 各 mod 使用自己的 SQLite 词条库（`ProjectPaths.unitStorePath`）代替 JSON 中间文件。
+    :param csvPatchWriteback: 写回 CSV 时只替换收到译文的单元格（`csvSubParatranz.PatchWriteback`）。
+    :param shardUnits: 使用 JSON 中间文件时，词条数量超过该值的中间文件拆分为分片，为0时不拆分。
+    :param shardBytes: 使用 JSON 中间文件时，大小超过该值（字节）的中间文件拆分为分片，为0时不拆分。
+    :return: 与输入顺序相同的各 mod 处理结果。
+    """
+    if projectClass is None:
+        from hzdev_misc_paratranz import SubParatranz as projectClass
+    states = []
+    jobs = []  # (mod 序号, 任务)
+    stores = []
+    for projectDirectory in projectDirectories:
+        state = _ModState(str(projectDirectory))
+        states.append(state)
+        projectPaths = ProjectPaths.fromProjectDirectory(projectDirectory)
+        if not isdir(projectPaths.originalPath):
+            state.failures.append(('', f'未找到原文目录 {projectPaths.originalPath}'))
+            continue
+        try:
+            if useUnitStore:
+                unitIO = SQLiteUnitStore(projectPaths.unitStorePath, projectPaths.paratranzPath)
+                stores.append(unitIO)
+            else:
+                unitIO = ParatranzFileIO(projectPaths.paratranzPath, shardUnits, shardBytes)
+            project = projectClass(jobFilter, projectPaths, unitIO)
+            project.CSVWorker.PatchWriteback = csvPatchWriteback
+            if memory is not None and not isWriteback:
+                project.UseTranslationMemory(memory)
+            modJobs = project.BuildJobs(isWriteback)
+        except Exception:
+            state.failures.append(('', traceback.format_exc()))
+            continue
+        state.jobCount = len(modJobs)
+        jobs += [(len(states) - 1, job) for job in modJobs]
+    if parseCacheEntries > 0:
+        parseCache.enable(parseCacheEntries)
+    outputWriter.reset()
+    try:
+        with ThreadPoolExecutor(maxWorkers) as pool:
+            futures = {pool.submit(_timedJob, job.func): (modIndex, job) for modIndex, job in jobs}
+            for future in as_completed(futures):
+                modIndex, job = futures[future]
+                state = states[modIndex]
+                try:
+                    handled, startTime, endTime = future.result()
+                except Exception:
+                    state.failures.append((job.name, traceback.format_exc()))
+                    continue
+                state.handledCount += handled
+                state.busyTime += endTime - startTime
+                state.firstStart = startTime if state.firstStart is None else min(state.firstStart, startTime)
+                state.lastEnd = endTime if state.lastEnd is None else max(state.lastEnd, endTime)
+    finally:
+        if parseCacheEntries > 0:
+            print(f'解析缓存命中 {parseCache.hits} 次，未命中 {parseCache.misses} 次。')
+            parseCache.disable()
+            parseCache.clear()
+        for store in stores:
+            store.close()
+    outputWriter.report()
+    profiler.report()
+    return [state.asSummary() for state in states]
+
+
+def printSummaries(summaries: List[ModSummary]):
+    """以表格形式打印各 mod 的处理结果，并列出失败的任务。"""
+    print(f'{"项目":<48}{"任务":>6}{"已处理":>8}{"失败":>6}{"任务耗时(s)":>14}{"墙钟耗时(s)":>14}')
+    for summary in summaries:
+        print(f'{summary.projectDirectory[-47:]:<48}{summary.jobCount:>6}{summary.handledCount:>8}'
+              f'{len(summary.failures):>6}{summary.busyTime:>14.3f}{summary.wallTime:>14.3f}')
+    for summary in summaries:
+        for jobName, errorText in summary.failures:
+            print(f'\n[{summary.projectDirectory}] {jobName or "初始化"} 失败：\n{errorText.rstrip()}')
@@ -0,0 +1,530 @@
+"""
+StarsectorTranslationCode 的命令行入口，适合在构建流水线中以非交互的方式运行。
+
+示例：
+    python hzdev_cli.py extract --include "data/world/factions/*"
+    python hzdev_cli.py writeback --handler outFactions --csv rules.csv
+    python hzdev_cli.py watch --exclude "data/variants"
+    python hzdev_cli.py batch mods/ModA mods/ModB --workers 8
+    python hzdev_cli.py extract --project mods/ModA --store
+    python hzdev_cli.py writeback --project mods/ModA --pipeline --prefetch 16
+    python hzdev_cli.py extract --project mods/ModA --resume
+    python hzdev_cli.py writeback --project mods/ModA --archive release/ModA-zh.zip
+    python hzdev_cli.py writeback --project mods/ModA --language zh-TW mods/ModA/para_tranz/zh-TW mods/ModA-zh-TW
+    python hzdev_cli.py validate --project mods/ModA --report report.json
+    python hzdev_cli.py diff --project mods/ModA --new-original updates/ModA-1.2 --apply
+    python hzdev_cli.py store export --project mods/ModA
+    python hzdev_cli.py search "Tri-Tachyon" --project mods/ModA
+    python hzdev_cli.py serve --project mods/ModA --port 8765
+    python hzdev_cli.py highlight --source rules.csv --class-name MyHighlight
+"""
+import argparse
+import sys
+from typing import List
+
+
+def _addFilterArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help='只处理匹配该模式的相对路径（相对于原文目录，可多次指定）')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help='排除匹配该模式的相对路径（可多次指定，优先于 --include）')
+    parser.add_argument('--handler', action='append', default=[], metavar='NAME',
+                        help='只执行指定的处理器，比如 inFactions / outFactions / missions / variants（可多次指定）')
+    parser.add_argument('--csv', action='append', default=[], metavar='NAME',
+                        help='只执行指定的 CSV 配置，比如 rules.csv 或 data/campaign/rules.csv（可多次指定）')
+    parser.add_argument('--profile', nargs='?', const='profile_report.json', metavar='PATH',
+                        help='启用性能统计，并把报告写入指定路径')
+
+
+def _addProjectArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--project', metavar='DIR',
+                        help='项目根目录（包含 original / localization / para_tranz），不指定则使用默认目录')
+    parser.add_argument('--store', nargs='?', const='', metavar='PATH',
+                        help='使用 SQLite 词条库代替 JSON 中间文件，不指定路径时使用 para_tranz/units.sqlite3')
+    _addShardArguments(parser)
+
+
+def _addShardArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--shard-units', type=int, default=0, metavar='N',
+                        help='词条数量超过 N 的中间文件拆分为多个分片（xxx.shard00.json 等）')
+    parser.add_argument('--shard-bytes', type=int, default=0, metavar='N',
+                        help='大小超过 N 字节的中间文件拆分为多个分片')
+
+
+def _buildProjectPaths(args: argparse.Namespace):
+    from dataModel import ProjectPaths, DEFAULT_PROJECT_PATHS
+
+    if args.project:
+        return ProjectPaths.fromProjectDirectory(args.project)
+    return DEFAULT_PROJECT_PATHS
+
+
+def _buildUnitStore(args: argparse.Namespace, projectPaths):
+    from hzdev_unit_store import SQLiteUnitStore
+
+    return SQLiteUnitStore(args.store or projectPaths.unitStorePath, projectPaths.paratranzPath)
+
+
+def _buildUnitIO(args: argparse.Namespace, projectPaths):
+    if args.store is not None:
+        return _buildUnitStore(args, projectPaths)
+    from hzdev_paratranz_io import ParatranzFileIO
+
+    return ParatranzFileIO(projectPaths.paratranzPath, args.shard_units, args.shard_bytes)
+
+
+def _buildProject(args: argparse.Namespace):
+    from hzdev_misc_paratranz import SubParatranz
+
+    projectPaths = _buildProjectPaths(args)
+    return SubParatranz(_buildJobFilter(args), projectPaths, _buildUnitIO(args, projectPaths))
+
+
+def _addPipelineArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--pipeline', action='store_true',
+                        help='以流水线执行任务，读取、处理与写入文件互相重叠，适合网络存储等较慢的磁盘')
+    parser.add_argument('--prefetch', type=int, default=8, metavar='N', help='流水线最多预读（或等待写入）的任务数量')
+    parser.add_argument('--pipeline-workers', type=int, metavar='N', help='流水线的处理线程数，不指定则使用 CPU 核心数')
+
+
+def _buildPipeline(args: argparse.Namespace):
+    if not args.pipeline:
+        return None
+    from hzdev_pipeline import StagedPipeline
+
+    return StagedPipeline(args.prefetch, args.pipeline_workers)
+
+
+def _addJournalArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--journal', nargs='?', const='', metavar='PATH',
+                        help='记录运行日志，失败的任务不会中断运行；不指定路径时使用 para_tranz/run_journal.jsonl')
+    parser.add_argument('--resume', action='store_true',
+                        help='按运行日志从上次中断的位置继续，跳过已完成且输入未变的任务（隐含 --journal）')
+
+
+def _buildJournal(args: argparse.Namespace, project, mode: str):
+    if args.journal is None and not args.resume:
+        return None
+    from hzdev_journal import RunJournal
+
+    return RunJournal(args.journal or project.Paths.journalPath, mode, args.resume)
+
+
+def _exitOnJournalFailures(journal):
+    if journal is not None and len(journal.failures) > 0:
+        raise SystemExit(1)
+
+
+def _addValidateArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--validate-workers', type=int, metavar='N',
+                        help='占位符校验的进程数，不指定则使用 CPU 核心数，1 表示不使用进程池')
+
+
+def _runValidation(args: argparse.Namespace, project, reportPath: str):
+    from hzdev_validator import PlaceholderValidator
+
+    report = PlaceholderValidator(args.validate_workers).validateStore(project.UnitIO, _buildJobFilter(args))
+    report.writeJSON(reportPath or project.Paths.validationReportPath)
+    report.printSummary()
+    return report
+
+
+def _validateBeforeWriteback(args: argparse.Namespace, project, languages: list):
+    """校验本次要写回的每一种语言，发现问题时在写入任何文件之前退出（除非指定了 --allow-invalid）。"""
+    issueCount = len(_runValidation(args, project, args.validate).issues)
+    for (name, _, _), language in zip(args.language, languages):
+        print(f'校验语言 {name}：')
+        issueCount += len(_runValidation(args, language, '').issues)
+    if issueCount > 0 and not args.allow_invalid:
+        raise SystemExit(f'校验发现 {issueCount} 个问题，未写回任何文件；修正译文后重试，或指定 --allow-invalid 仍然写回')
+
+
+def _addCSVPatchArgument(parser: argparse.ArgumentParser):
+    parser.add_argument('--csv-patch', action='store_true',
+                        help='写回 CSV 时只替换收到译文的单元格，其余内容（引号、换行符等）保持原样')
+
+
+def _addMemoryArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--memory', action='store_true',
+                        help='使用翻译记忆库，为原文相同的词条预填译文（状态为“有疑问”，需要确认）')
+    parser.add_argument('--memory-source', action='append', default=[], metavar='PATH',
+                        help='额外加入翻译记忆库的中间文件或目录，比如原版游戏的导出数据（可多次指定，隐含 --memory）')
+    parser.add_argument('--memory-report', metavar='PATH', help='把存在多种译法的原文写入报告文件（隐含 --memory）')
+    parser.add_argument('--memory-fuzzy', nargs='?', type=float, const=0.8, metavar='THRESHOLD',
+                        help='没有完全相同的原文时，查找相似度不低于阈值（默认0.8）的已翻译原文，'
+                             '预填其译文并在上下文中注明（隐含 --memory）')
+    parser.add_argument('--memory-fuzzy-context-only', action='store_true',
+                        help='模糊匹配的译文只写入上下文，不预填')
+
+
+def _buildTranslationMemory(args: argparse.Namespace):
+    if not (args.memory or args.memory_source or args.memory_report or args.memory_fuzzy is not None):
+        return None
+    if args.memory_fuzzy is not None:
+        from hzdev_fuzzy_memory import FuzzyTranslationMemory
+
+        memory = FuzzyTranslationMemory(args.memory_fuzzy, not args.memory_fuzzy_context_only)
+    else:
+        from hzdev_translation_memory import TranslationMemory
+
+        memory = TranslationMemory()
+    for sourcePath in args.memory_source:
+        if not memory.addSource(sourcePath):
+            print(f'翻译记忆库：未找到 {sourcePath}。')
+    return memory
+
+
+def _writeMemoryReport(args: argparse.Namespace, memory):
+    if memory is not None and args.memory_report:
+        memory.writeReport(args.memory_report)
+    elif memory is not None and args.memory_fuzzy is not None:
+        print(f'翻译记忆库：已预填 {memory.filledCount} 条词条，模糊匹配了 {memory.fuzzyCount} 条词条。')
+
+
+def _addSearchIndexArgument(parser: argparse.ArgumentParser):
+    parser.add_argument('--search-index', action='store_true',
+                        help='提取后增量更新全文检索索引（para_tranz/search_index.sqlite3），供 search 命令查询')
+
+
+def _buildSearchIndex(projectPaths):
+    from hzdev_search_index import SearchIndex
+
+    return SearchIndex(projectPaths.searchIndexPath, projectPaths.paratranzPath)
+
+
+def _buildJobFilter(args: argparse.Namespace):
+    from dataModel import JobFilter
+
+    return JobFilter(args.include, args.exclude, args.handler, args.csv)
+
+
+def _enableProfiler(args: argparse.Namespace):
+    if args.profile:
+        from hzdev_profiler import profiler
+
+        profiler.enable(args.profile)
+
+
+def _commandExtract(args: argparse.Namespace):
+    _enableProfiler(args)
+    project = _buildProject(args)
+    memory = _buildTranslationMemory(args)
+    if memory is not None:
+        project.UseTranslationMemory(memory)
+    searchIndex = _buildSearchIndex(project.Paths) if args.search_index else None
+    if searchIndex is not None:
+        searchIndex.install(project.Stages)
+    journal = _buildJournal(args, project, 'extract')
+    project.ExtractAll(_buildPipeline(args), journal)
+    _writeMemoryReport(args, memory)
+    if searchIndex is not None:
+        print(f'全文检索索引：更新了 {searchIndex.updatePending(project.UnitIO)} 个中间文件。')
+        searchIndex.close()
+    _exitOnJournalFailures(journal)
+
+
+def _buildLanguageProjects(args: argparse.Namespace, project) -> list:
+    from dataModel import LanguageTarget
+
+    languages = []
+    for name, paratranzPath, translationPath in args.language:
+        language = project.ForLanguage(LanguageTarget(name, paratranzPath, translationPath))
+        language.CSVWorker.PatchWriteback = args.csv_patch
+        languages.append(language)
+    return languages
+
+
+def _commandWriteback(args: argparse.Namespace):
+    _enableProfiler(args)
+    project = _buildProject(args)
+    project.CSVWorker.PatchWriteback = args.csv_patch
+    languages = _buildLanguageProjects(args, project)
+    if args.validate is not None:
+        _validateBeforeWriteback(args, project, languages)
+    journal = _buildJournal(args, project, 'writeback')
+    if args.archive is None:
+        project.WritebackAll(_buildPipeline(args), journal, languages)
+    else:
+        from hzdev_archive import ZipArchiveWriter
+        from hzdev_output import outputWriter
+
+        with ZipArchiveWriter(args.archive, project.Paths.translationPath, args.archive_level) as archive, \
+                outputWriter.redirect(archive):
+            project.WritebackAll(_buildPipeline(args), journal, languages)
+            if journal is not None and len(journal.failures) > 0:
+                raise SystemExit(1)  # 有任务失败时不生成归档，旧归档保持不变
+    _exitOnJournalFailures(journal)
+
+
+def _commandValidate(args: argparse.Namespace):
+    project = _buildProject(args)
+    report = _runValidation(args, project, args.report)
+    if len(report.issues) > 0:
+        raise SystemExit(1)
+
+
+def _commandDiff(args: argparse.Namespace):
+    import os
+    import tempfile
+    from hzdev_diff import diffTrees, extractTree
+
+    if args.apply and args.old_original:
+        raise SystemExit('--apply 只能用于现有的中间文件，不能与 --old-original 同时使用')
+    project = _buildProject(args)
+    jobFilter = _buildJobFilter(args)
+    reportPath = args.report or project.Paths.versionDiffPath
+    os.makedirs(os.path.dirname(os.path.abspath(reportPath)), exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='hzdev_diff_') as workPath:
+        newIO = extractTree(type(project), args.new_original or project.Paths.originalPath,
+                            os.path.join(workPath, 'new'), project.Paths.glossaryPath, jobFilter)
+        if args.old_original:
+            oldIO = extractTree(type(project), args.old_original, os.path.join(workPath, 'old'),
+                                project.Paths.glossaryPath, jobFilter)
+        else:
+            oldIO = project.UnitIO
+        with open(reportPath, 'w', encoding='UTF-8') as reportFile:
+            summary = diffTrees(oldIO, newIO, project.UnitIO if args.apply else None, reportFile, jobFilter)
+    summary.printSummary()
+    print(f'差异报告已写入 {reportPath}。')
+
+
+def _commandWatch(args: argparse.Namespace):
+    from hzdev_watch import watchOriginals
+
+    _enableProfiler(args)
+    project = _buildProject(args)
+    memory = _buildTranslationMemory(args)
+    if memory is not None:
+        project.UseTranslationMemory(memory)
+    watchOriginals(project, project.Paths.originalPath, args.debounce, args.poll, args.poll_interval)
+
+
+def _commandBatch(args: argparse.Namespace):
+    from hzdev_batch import runBatch, printSummaries
+
+    _enableProfiler(args)
+    projectDirectories = list(args.projects)
+    if args.list:
+        with open(args.list, encoding='UTF-8') as tFile:
+            projectDirectories += [x.strip() for x in tFile if x.strip() != '' and not x.strip().startswith('#')]
+    if len(projectDirectories) == 0:
+        raise SystemExit('未指定任何项目目录。')
+    memory = None if args.writeback else _buildTranslationMemory(args)
+    summaries = runBatch(projectDirectories, args.writeback, _buildJobFilter(args), args.workers, args.cache_entries,
+                         memory=memory, useUnitStore=args.store, csvPatchWriteback=args.csv_patch,
+                         shardUnits=args.shard_units, shardBytes=args.shard_bytes)
+    printSummaries(summaries)
+    _writeMemoryReport(args, memory)
+    if not all(x.succeeded for x in summaries):
+        raise SystemExit(1)
+
+
+def _commandStore(args: argparse.Namespace):
+    projectPaths = _buildProjectPaths(args)
+    store = _buildUnitStore(args, projectPaths)
+    try:
+        if args.action == 'import':
+            fileCount = store.importJSON(args.path)
+            print(f'已从 {args.path or projectPaths.paratranzPath} 导入了 {fileCount} 个中间文件。')
+        elif args.action == 'export':
+            fileCount = store.exportJSON(args.path, maxUnits=args.shard_units, maxBytes=args.shard_bytes)
+            print(f'已向 {args.path or projectPaths.paratranzPath} 导出了 {fileCount} 个中间文件。')
+        else:
+            stageCounts = store.countByStage()
+            print(f'共 {len(store.listFiles())} 个中间文件，{sum(stageCounts.values())} 条词条。')
+            for stage, count in sorted(stageCounts.items()):
+                print(f'状态 {stage}：{count} 条')
+    finally:
+        store.close()
+
+
+def _commandSearch(args: argparse.Namespace):
+    import os
+    import time
+
+    projectPaths = _buildProjectPaths(args)
+    isNewIndex = not os.path.isfile(projectPaths.searchIndexPath)
+    searchIndex = _buildSearchIndex(projectPaths)
+    try:
+        if not args.no_update or isNewIndex:  # 增量更新：中间文件没有变化时几乎没有开销
+            unitIO = _buildUnitIO(args, projectPaths)
+            updatedCount = searchIndex.update(unitIO)
+            unitIO.close()
+            if updatedCount > 0 or isNewIndex:
+                print(f'全文检索索引：更新了 {updatedCount} 个中间文件。')
+        if args.query is None:
+            fileCount, unitCount, termCount = searchIndex.stats()
+            print(f'全文检索索引：{fileCount} 个中间文件，{unitCount} 条词条，{termCount} 个索引词。')
+            return
+        startTime = time.perf_counter()
+        hits = searchIndex.search(args.query, args.field, args.stage, args.limit, not args.words)
+        elapsedMS = (time.perf_counter() - startTime) * 1000
+    finally:
+        searchIndex.close()
+    for hit in hits:
+        print(f'{hit.file}  {hit.key}  [状态 {hit.stage}]')
+        print(f'    原文：{_searchPreview(hit.original)}')
+        if hit.translation:
+            print(f'    译文：{_searchPreview(hit.translation)}')
+    print(f'共找到 {len(hits)} 条词条{"（已达到数量上限）" if 0 < args.limit <= len(hits) else ""}，'
+          f'查询耗时 {elapsedMS:.1f} ms。')
+
+
+def _searchPreview(text: str | None, maxLength: int = 80) -> str:
+    text = ' '.join((text or '').split())
+    return text if len(text) <= maxLength else text[:maxLength - 1] + '…'
+
+
+def _commandServe(args: argparse.Namespace):
+    from hzdev_server import ProjectServer, serveProject
+
+    _enableProfiler(args)
+    project = _buildProject(args)
+    project.CSVWorker.PatchWriteback = args.csv_patch
+    serveProject(ProjectServer(project, args.workers, args.cache_entries), args.host, args.port, args.verbose)
+
+
+def _commandHighlight(args: argparse.Namespace):
+    from extractHighlightTextToJava import mainFunc
+
+    kwargs = dict(sourceFilePath=args.source, javaClassName=args.class_name, addRulesHint=args.rules_hint,
+                  addStringsHint=args.strings_hint)
+    for keyName, value in (('stringsCategory', args.strings_category), ('csvOutputFolder', args.csv_output),
+                           ('javaOutputFolder', args.java_output), ('stringsOutputFolder', args.strings_output),
+                           ('package', args.package)):
+        if value is not None:
+            kwargs[keyName] = value
+    mainFunc(**kwargs)
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='hzdev_cli', description='远行星号 Paratranz 汉化项目助手')
+    subParsers = parser.add_subparsers(dest='command', required=True)
+
+    extractParser = subParsers.add_parser('extract', help='从原始文件导出 Paratranz 词条')
+    _addFilterArguments(extractParser)
+    _addProjectArguments(extractParser)
+    _addMemoryArguments(extractParser)
+    _addPipelineArguments(extractParser)
+    _addJournalArguments(extractParser)
+    _addSearchIndexArgument(extractParser)
+    extractParser.set_defaults(func=_commandExtract)
+
+    writebackParser = subParsers.add_parser('writeback', help='将 Paratranz 词条写回汉化文件')
+    _addFilterArguments(writebackParser)
+    _addProjectArguments(writebackParser)
+    _addCSVPatchArgument(writebackParser)
+    _addPipelineArguments(writebackParser)
+    _addJournalArguments(writebackParser)
+    writebackParser.add_argument('--validate', nargs='?', const='', metavar='REPORT',
+                                 help='写回前校验译文的占位符与标记，并把报告写入指定路径（默认 para_tranz/placeholder_report.json）；'
+                                      '--language 指定的语言一并校验，报告位于各自中间文件目录的上级目录。发现问题时不写回任何文件')
+    writebackParser.add_argument('--allow-invalid', action='store_true',
+                                 help='与 --validate 一同使用：即使校验发现问题也继续写回')
+    _addValidateArguments(writebackParser)
+    writebackParser.add_argument('--language', nargs=3, action='append', default=[],
+                                 metavar=('NAME', 'PARATRANZ_DIR', 'LOCALIZATION_DIR'),
+                                 help='同时写回另一种目标语言：该语言的中间文件目录与汉化目录（可多次指定）。'
+                                      '原文文件只解析一次，各语言依次在副本上写回')
+    writebackParser.add_argument('--archive', metavar='ZIP',
+                                 help='把汉化文件直接写入 zip 归档而不是汉化目录，内容未变的已有条目原样复用（只包含主语言）')
+    writebackParser.add_argument('--archive-level', type=int, default=6, choices=range(10), metavar='0-9',
+                                 help='归档的 deflate 压缩级别（默认6）')
+    writebackParser.set_defaults(func=_commandWriteback)
+
+    validateParser = subParsers.add_parser('validate', help='校验译文的占位符与标记，发现问题时以非零状态退出')
+    _addFilterArguments(validateParser)
+    _addProjectArguments(validateParser)
+    validateParser.add_argument('--report', metavar='PATH', help='JSON 报告的路径，默认 para_tranz/placeholder_report.json')
+    _addValidateArguments(validateParser)
+    validateParser.set_defaults(func=_commandValidate)
+
+    diffParser = subParsers.add_parser('diff', help='比较新旧版本原文提取出的词条，可以沿用未变词条的译文')
+    _addFilterArguments(diffParser)
+    _addProjectArguments(diffParser)
+    diffParser.add_argument('--new-original', metavar='DIR', help='新版本的原文目录，不指定则使用项目的原文目录')
+    diffParser.add_argument('--old-original', metavar='DIR',
+                            help='旧版本的原文目录，指定后比较两个原文目录，否则与项目现有的中间文件比较')
+    diffParser.add_argument('--apply', action='store_true',
+                            help='把新版本的词条写入项目的中间文件：原文未变的沿用译文，原文变化的沿用译文并标记为有疑问')
+    diffParser.add_argument('--report', metavar='PATH', help='JSON 差异报告的路径，默认 para_tranz/version_diff.json')
+    diffParser.set_defaults(func=_commandDiff)
+
+    watchParser = subParsers.add_parser('watch', help='监视原文目录，文件变化后立即重新导出对应的词条')
+    _addFilterArguments(watchParser)
+    _addProjectArguments(watchParser)
+    _addMemoryArguments(watchParser)
+    watchParser.add_argument('--debounce', type=float, default=0.3, help='合并连续事件的静默时间（秒）')
+    watchParser.add_argument('--poll', action='store_true', help='不使用 inotify，强制使用轮询')
+    watchParser.add_argument('--poll-interval', type=float, default=1.0, help='轮询间隔（秒）')
+    watchParser.set_defaults(func=_commandWatch)
+
+    batchParser = subParsers.add_parser('batch', help='在同一个进程中批量处理多个 mod 项目')
+    batchParser.add_argument('projects', nargs='*', metavar='PROJECT',
+                             help='mod 项目根目录（包含 original / localization / para_tranz）')
+    batchParser.add_argument('--list', metavar='FILE', help='从文件中读取项目根目录，每行一个，以 # 开头的行会被忽略')
+    batchParser.add_argument('--writeback', action='store_true', help='执行写回，否则执行提取')
+    batchParser.add_argument('--workers', type=int, help='共享线程池的大小')
+    batchParser.add_argument('--cache-entries', type=int, default=512, help='共享解析缓存的条目上限，0 表示不缓存')
+    batchParser.add_argument('--store', action='store_true',
+                             help='各项目使用 SQLite 词条库（para_tranz/units.sqlite3）代替 JSON 中间文件')
+    _addShardArguments(batchParser)
+    _addFilterArguments(batchParser)
+    _addMemoryArguments(batchParser)
+    _addCSVPatchArgument(batchParser)
+    batchParser.set_defaults(func=_commandBatch)
+
+    storeParser = subParsers.add_parser('store', help='管理 SQLite 词条库')
+    storeParser.add_argument('action', choices=('import', 'export', 'stats'),
+                             help='import - 导入 JSON 中间文件；export - 导出可上传的 JSON 中间文件；stats - 统计词条')
+    storeParser.add_argument('--json-dir', dest='path', metavar='DIR',
+                             help='导入或导出的 JSON 中间文件目录，不指定则使用项目的中间文件目录')
+    _addProjectArguments(storeParser)
+    storeParser.set_defaults(func=_commandStore)
+
+    searchParser = subParsers.add_parser('search', help='在全部中间词条的原文与译文中查找文本（全文检索索引）')
+    searchParser.add_argument('query', nargs='?',
+                              help='要查找的文本，不区分大小写；不指定时只更新索引并输出统计')
+    _addProjectArguments(searchParser)
+    searchParser.add_argument('--field', choices=('all', 'original', 'translation'), default='all',
+                              help='在原文、译文或两者中查找（默认两者）')
+    searchParser.add_argument('--stage', type=int, action='append', default=[], metavar='N',
+                              help='只列出该状态的词条（可多次指定）')
+    searchParser.add_argument('--limit', type=int, default=50, metavar='N', help='最多列出的词条数量，0 表示不限制')
+    searchParser.add_argument('--words', action='store_true', help='只要求各个词都出现，不要求按顺序连续出现')
+    searchParser.add_argument('--no-update', action='store_true',
+                              help='查询前不按中间文件的当前内容增量更新索引，直接使用已有的索引（索引不存在时仍会建立）')
+    searchParser.set_defaults(func=_commandSearch)
+
+    serveParser = subParsers.add_parser('serve', help='以服务模式常驻运行，通过本机 HTTP 接口提交提取与写回请求')
+    _addFilterArguments(serveParser)
+    _addProjectArguments(serveParser)
+    _addCSVPatchArgument(serveParser)
+    serveParser.add_argument('--host', default='127.0.0.1', help='监听地址（默认只接受本机的连接）')
+    serveParser.add_argument('--port', type=int, default=8765, help='监听端口（默认8765，0 表示由系统分配）')
+    serveParser.add_argument('--workers', type=int, help='所有请求共享的线程池大小')
+    serveParser.add_argument('--cache-entries', type=int, default=512, help='解析缓存的条目上限，0 表示不缓存')
+    serveParser.add_argument('--verbose', action='store_true', help='输出每个 HTTP 请求的日志')
+    serveParser.set_defaults(func=_commandServe)
+
+    highlightParser = subParsers.add_parser('highlight', help='为 rules.csv 的长高亮文本生成反向高亮的 Java 代码')
+    highlightParser.add_argument('--source', required=True, help='源 rules.csv 文件路径')
+    highlightParser.add_argument('--class-name', required=True, help='生成的 Java 类名')
+    highlightParser.add_argument('--strings-category', help='strings.json 中第一层的名称，不指定则随机生成')
+    highlightParser.add_argument('--csv-output', help='修改后的 rules.csv 的输出目录')
+    highlightParser.add_argument('--java-output', help='Java 源代码的输出目录')
+    highlightParser.add_argument('--strings-output', help='strings.json 的输出目录')
+    highlightParser.add_argument('--package', help='Java 类的包名')
+    highlightParser.add_argument('--rules-hint', action='store_true', help='在 rules.csv 的 script 列添加注释')
+    highlightParser.add_argument('--strings-hint', action='store_true', help='在 strings.json 中添加注释')
+    highlightParser.set_defaults(func=_commandHighlight)
+    return parser
+
+
+def main(argv: List[str] = None):
+    args = buildParser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
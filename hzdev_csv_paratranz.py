@@ -1,45 +1,55 @@
-import json
+import io
 import os
 import pprint
 from csv import DictWriter, DictReader
-from pathlib import Path
+from functools import partial
 from typing import NamedTuple, List, Dict
 
-from dataModel import ParatranzDataUnit
+from dataModel import ParatranzDataUnit, JobFilter, ProjectPaths, ProjectJob, DEFAULT_PROJECT_PATHS
+from hzdev_csv_patch import patchCSVFile
+from hzdev_output import outputWriter
+from hzdev_paratranz_io import ParatranzFileIO
+from hzdev_parse_cache import parseCache
+from hzdev_pipeline import openSource
+from hzdev_profiler import profiler
+from hzdev_stages import ExtractionStages
 
 # 本脚本被设计为仅处理特定路径的文件，因此不会有探测行为。
 # 汉化组的翻译检测将被直接舍弃，因为用不到。
 
-PROJECT_DIRECTORY = Path(__file__).parent.parent
-ORIGINAL_PATH = str(PROJECT_DIRECTORY / 'original')
-TRANSLATION_PATH = str(PROJECT_DIRECTORY / 'localization')
-PARA_TRANZ_PATH = str(PROJECT_DIRECTORY / 'para_tranz' / 'output')
-
 
 class SingleFileConfig(NamedTuple):
     relativeFilePath: str  # 文件的相对路径
     columnIDName: str | tuple  # 索引列的列名
     columnTextNames: List[str]  # 要导出的文本列的列名
+    projectPaths: ProjectPaths = None  # 项目目录配置，为 None 时使用默认目录（`DEFAULT_PROJECT_PATHS`）
 
     @property
     def fileName(self) -> str:
         """文件名。"""
         return self.relativeFilePath.rpartition('/')[-1]
 
+    @property
+    def paths(self) -> ProjectPaths:
+        """实际使用的项目目录配置。"""
+        if self.projectPaths is not None:
+            return self.projectPaths
+        return DEFAULT_PROJECT_PATHS
+
     @property
     def absoluteOriginalPath(self) -> str:
         """源文件的绝对路径。"""
-        return os.path.join(ORIGINAL_PATH, self.relativeFilePath.replace('/', os.sep))
+        return os.path.join(self.paths.originalPath, self.relativeFilePath.replace('/', os.sep))
 
     @property
     def absoluteLocalizationPath(self) -> str:
         """目标文件的绝对路径。"""
-        return os.path.join(TRANSLATION_PATH, self.relativeFilePath.replace('/', os.sep))
+        return os.path.join(self.paths.translationPath, self.relativeFilePath.replace('/', os.sep))
 
     @property
     def absoluteParatranzFilePath(self) -> str:
         """中间文件的绝对路径。"""
-        return os.path.join(PARA_TRANZ_PATH, self.relativeFilePath.replace('/', os.sep)[:-4] + '.json')
+        return os.path.join(self.paths.paratranzPath, self.relativeFilePath.replace('/', os.sep)[:-4] + '.json')
 
     def makeFolders(self, *, folderLocalization: bool = False, folderParatranz: bool = False):
         """
@@ -49,7 +59,7 @@ class SingleFileConfig(NamedTuple):
         :param folderParatranz: 创建中间文件的目录。
         """
         if folderLocalization:
-            os.makedirs(self.absoluteLocalizationPath.rpartition(os.sep)[0], exist_ok=True)
+            outputWriter.makeDirs(self.absoluteLocalizationPath.rpartition(os.sep)[0])
         if folderParatranz:
             os.makedirs(self.absoluteParatranzFilePath.rpartition(os.sep)[0], exist_ok=True)
 
@@ -59,7 +69,18 @@ class csvSubParatranz:
     __const_preFileConfig: List[SingleFileConfig]
     __const_errorsFile = 'surrogateescape'  # 指定默认错误处理方式
 
-    def __init__(self):
+    def __init__(self, projectPaths: ProjectPaths = None, stages: ExtractionStages = None, unitIO=None):
+        """
+        :param projectPaths: 项目目录配置，不指定则使用默认目录（`DEFAULT_PROJECT_PATHS`）。
+        :param stages: 提取阶段处理器注册表，不指定则不执行任何附加处理。
+        :param unitIO: 中间文件的读写方式，不指定则使用 JSON 文件。
+        """
+        self.__stages = stages if stages is not None else ExtractionStages()
+        # 写回时直接修补原文件的字节：未改动的行与单元格保持原样（包括引号与换行符），只重新编码收到译文的单元格
+        self.PatchWriteback = False
+        if unitIO is None:
+            unitIO = ParatranzFileIO((projectPaths or DEFAULT_PROJECT_PATHS).paratranzPath)
+        self.__unitIO = unitIO
         self.__const_preFileConfig = [
             # 原版
             SingleFileConfig('data/campaign/abilities.csv', 'id', ['name', 'desc']),
@@ -121,23 +142,85 @@ class csvSubParatranz:
             # 首次出现于SirHartley的Kaleidoscope mod中，推测应该是他自己的配置文件
             SingleFileConfig('data/config/planet_texture_data.csv', 'id', ['type_name']),
         ]
+        if projectPaths is not None:
+            self.__const_preFileConfig = [x._replace(projectPaths=projectPaths) for x in self.__const_preFileConfig]
+        self.__configByPath = {x.relativeFilePath: x for x in self.__const_preFileConfig}
 
     @classmethod
-    def OriginalToParatranz(cls):
-        """处理翻译文件，写入中间文件，并显示日志消息。"""
-        cls().__startWork(True)
+    def OriginalToParatranz(cls, jobFilter: JobFilter = None):
+        """
+        处理翻译文件，写入中间文件，并显示日志消息。
+
+        :param jobFilter: 任务过滤器，只处理被选中的 CSV 配置。
+        """
+        cls().__startWork(True, jobFilter)
 
     @classmethod
-    def ParatranzToLocalization(cls):
-        """处理中间文件，回写数据，并显示消息。"""
-        cls().__startWork(False)
+    def ParatranzToLocalization(cls, jobFilter: JobFilter = None):
+        """
+        处理中间文件，回写数据，并显示消息。
+
+        :param jobFilter: 任务过滤器，只处理被选中的 CSV 配置。
+        """
+        cls().__startWork(False, jobFilter)
+
+    def __startWork(self, isExtract: bool = False, jobFilter: JobFilter = None):
+        for job in self.BuildJobs(isExtract, jobFilter):
+            job.func()
 
-    def __startWork(self, isExtract: bool = False):
+    def BuildJobs(self, isExtract: bool, jobFilter: JobFilter = None) -> List[ProjectJob]:
+        """
+        为每个被选中、且原文文件存在的 CSV 配置生成一个可以独立执行的任务。
+
+        :param isExtract: 是否为提取任务，否则为写回任务。
+        :param jobFilter: 任务过滤器，只处理被选中的 CSV 配置。
+        """
+        jobs = []
         for configUnit in self.__const_preFileConfig:
-            if isExtract:
+            if jobFilter is not None and not jobFilter.matchCSVConfig(configUnit.relativeFilePath):
+                continue
+            if os.path.isfile(configUnit.absoluteOriginalPath):
+                inputs = (configUnit.absoluteOriginalPath,) if isExtract else \
+                    (configUnit.absoluteOriginalPath, configUnit.absoluteParatranzFilePath)
+                jobs.append(ProjectJob(configUnit.relativeFilePath, partial(self.__runConfig, configUnit, isExtract),
+                                       inputs))
+        return jobs
+
+    def ExtractFile(self, relativeFilePath: str) -> bool:
+        """
+        只提取单个 CSV 文件，用于监视模式等增量场景。
+
+        :param relativeFilePath: 相对于原文目录的路径，以'/'分隔。
+        :return: 该文件是否有对应的 CSV 配置。
+        """
+        configUnit = self.__configByPath.get(relativeFilePath.lstrip('/'))
+        if configUnit is None:
+            return False
+        self.__runConfig(configUnit, True)
+        return True
+
+    def ParatranzFilePath(self, relativeFilePath: str) -> str | None:
+        """
+        CSV 文件对应的中间文件的绝对路径，没有对应的 CSV 配置时返回 None。
+
+        :param relativeFilePath: 相对于原文目录的路径，以'/'分隔。
+        """
+        configUnit = self.__configByPath.get(relativeFilePath.lstrip('/'))
+        return configUnit.absoluteParatranzFilePath if configUnit is not None else None
+
+    def __runConfig(self, configUnit: SingleFileConfig, isExtract: bool) -> bool:
+        if not os.path.isfile(configUnit.absoluteOriginalPath):
+            return False
+        if isExtract:
+            with profiler.job(configUnit.fileName, 'csv', configUnit.absoluteOriginalPath,
+                              [configUnit.absoluteOriginalPath], [configUnit.absoluteParatranzFilePath]):
                 self.__commonFromCSV(configUnit)
-            else:
+        else:
+            with profiler.job(configUnit.fileName, 'csv', configUnit.absoluteOriginalPath,
+                              [configUnit.absoluteOriginalPath, configUnit.absoluteParatranzFilePath],
+                              [configUnit.absoluteLocalizationPath]):
                 self.__commonToCSV(configUnit)
+        return True
 
     def __commonFromCSV(self, config: SingleFileConfig):
         """
@@ -189,13 +272,14 @@ class csvSubParatranz:
                         textColumnName]:
                         # 沿袭汉化组对于 script 列的处理规则
                         tVar.stage = 1
-                    result.append(tVar.asDict())
+                    result.append(tVar)
         # 写入中间文件
         if len(result) > 0:
             print(f'从 {config.relativeFilePath} 文件中加载了 {len(result)} 条原文数据。')
+            self.__stages.apply(config.absoluteParatranzFilePath, result)
+            profiler.addUnits(len(result))
             config.makeFolders(folderParatranz=True)
-            with open(config.absoluteParatranzFilePath, 'w', encoding='utf-8', errors='ignore') as tFile:
-                json.dump(result, tFile, ensure_ascii=False, indent=4)
+            self.__unitIO.write(config.absoluteParatranzFilePath, result, errors='ignore')
 
     def __commonToCSV(self, config: SingleFileConfig):
         """
@@ -203,7 +287,10 @@ class csvSubParatranz:
 
         :param config: 配置选项组。
         """
-        if not os.path.isfile(config.absoluteOriginalPath) or not os.path.isfile(config.absoluteParatranzFilePath):
+        if not os.path.isfile(config.absoluteOriginalPath) or not self.__unitIO.exists(config.absoluteParatranzFilePath):
+            return
+        if self.PatchWriteback:
+            self.__patchToCSV(config)
             return
         tOriginal = self.__loadCSVFile(config.absoluteOriginalPath)
         tParatranz = self.__loadParatranzJSON(config.absoluteParatranzFilePath)
@@ -240,24 +327,64 @@ class csvSubParatranz:
                         '\\n', '\n').replace('^n', '\\n')
         # 写回目标文件
         config.makeFolders(folderLocalization=True)
-        with open(config.absoluteLocalizationPath, 'w', encoding='utf-8', newline='',
-                  errors=self.__const_errorsFile) as tFile:
-            tWriter = DictWriter(tFile, list(tOriginal[0].keys()))
-            tWriter.writeheader()
-            tWriter.writerows(tOriginal)
+        with profiler.phase('write', 'csv'):
+            with outputWriter.open(config.absoluteLocalizationPath, encoding='utf-8', newline='',
+                                   errors=self.__const_errorsFile) as tFile:
+                tWriter = DictWriter(tFile, list(tOriginal[0].keys()))
+                tWriter.writeheader()
+                tWriter.writerows(tOriginal)
         print(f'译文数据已整合至 {config.absoluteLocalizationPath} 中。')
 
+    def __patchToCSV(self, config: SingleFileConfig):
+        """
+        `__commonToCSV` 的修补模式：复制原文件的字节，只替换收到译文的单元格。
+
+        :param config: 配置选项组。
+        """
+        tParatranz = self.__loadParatranzJSON(config.absoluteParatranzFilePath)
+        print(f'已加载 {config.relativeFilePath} 的 {len(tParatranz)} 条译文数据。')
+        translations: Dict[str, Dict[str, str]] = {}
+        for paratranzUnit in tParatranz:
+            if paratranzUnit.isTranslated and paratranzUnit.translation != '':
+                rowID, _, textColumnName = paratranzUnit.key.rpartition('$')
+                translations.setdefault(rowID, {})[textColumnName] = paratranzUnit.translation.replace(
+                    '\\n', '\n').replace('^n', '\\n')
+
+        def rowKeyFunc(rowGetter) -> str | None:
+            # 与提取时的ID预处理相同
+            if isinstance(config.columnIDName, str):
+                tVar = rowGetter(config.columnIDName)
+                return None if tVar is None or tVar.strip() == '' else f'{config.fileName}#{tVar}'
+            tVar = [rowGetter(subIDName) for subIDName in config.columnIDName]
+            if any([unit is None or unit.strip() == '' for unit in tVar]):
+                return None
+            return f'{config.fileName}#{tuple(tVar)}'
+
+        config.makeFolders(folderLocalization=True)
+        with profiler.phase('write', 'csv-patch'):
+            patchCount = patchCSVFile(config.absoluteOriginalPath, config.absoluteLocalizationPath, translations,
+                                      rowKeyFunc, self.__decodeCell)
+        print(f'译文数据已整合至 {config.absoluteLocalizationPath} 中，替换了 {patchCount} 个单元格。')
+
+    def __decodeCell(self, cellBytes: bytes) -> str:
+        """与 `__loadCSVFile` 相同的解码方式，保证算出的行ID与提取时一致。"""
+        return self.replace_weird_chars(cellBytes.decode('utf-8', self.__const_errorsFile)).replace('\\n', '^n')
+
     def __loadCSVFile(self, filePath: str) -> List[Dict[str, str | None]]:
-        with open(filePath, 'r', encoding='utf-8', errors=self.__const_errorsFile) as tFile:
-            csv_lines = [self.replace_weird_chars(l).replace('\\n', '^n') for l in tFile]
-            return list(DictReader(csv_lines))
+        with profiler.phase('read'):
+            with openSource(filePath, 'utf-8', self.__const_errorsFile) as tFile:
+                fileContent = tFile.read()
+        with profiler.phase('parse', 'csv'):
+            # 多语言写回时同一个原文文件只解析一次，其余语言得到各行的副本（单元格都是字符串，复制每行的字典即可）
+            return parseCache.load('csv', fileContent, self.__parseCSV, lambda rows: [dict(x) for x in rows])
 
-    @staticmethod
-    def __loadParatranzJSON(filePath: str) -> List[ParatranzDataUnit]:
-        result = []
-        with open(filePath, 'rb') as tFile:
-            for lineDict in json.load(tFile):
-                result.append(ParatranzDataUnit(**lineDict))
+    @classmethod
+    def __parseCSV(cls, fileContent: str) -> List[Dict[str, str | None]]:
+        return list(DictReader(cls.replace_weird_chars(l).replace('\\n', '^n') for l in io.StringIO(fileContent)))
+
+    def __loadParatranzJSON(self, filePath: str) -> List[ParatranzDataUnit]:
+        result = self.__unitIO.read(filePath, True)  # 写回时只需要已翻译的词条
+        profiler.addUnits(len(result))
         return result
 
     @staticmethod
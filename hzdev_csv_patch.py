@@ -0,0 +1,127 @@
+import mmap
+import os
+import re
+from typing import Callable, Dict, List, Tuple
+
+from hzdev_output import outputWriter
+
+# 单元格的字节范围 [起始, 结束)，包含引号
+CellSpan = Tuple[int, int]
+# 根据列名取得本行单元格文本的函数，列不存在时返回 None
+RowGetter = Callable[[str], str | None]
+
+
+class CSVByteIndex:
+    """
+    记录 CSV 文件中每一行、每个单元格的字节偏移。
+
+    解析规则与标准库 csv 模块的默认方言相同：逗号分隔，双引号括起的单元格可以包含逗号与换行，引号内的 `""` 表示一个引号，
+    不以引号开头的单元格中的引号按原样保留。空行会被忽略。
+    """
+    __cellPattern = re.compile(rb'("(?:[^"]|"")*"[^,\r\n]*|[^,\r\n]*)(,|\r\n|\n|\r|\Z)')
+    __quotedPattern = re.compile(rb'"((?:[^"]|"")*)"(.*)', re.DOTALL)
+
+    def __init__(self, buffer: bytes | mmap.mmap, decodeFunc: Callable[[bytes], str]):
+        """
+        :param buffer: 文件内容，可以是内存映射。
+        :param decodeFunc: 把单元格的字节（已去掉引号）解码为文本的函数。
+        """
+        self.buffer = buffer
+        self.decodeFunc = decodeFunc
+        self.rows: List[List[CellSpan]] = self.__scan()
+
+    def __scan(self) -> List[List[CellSpan]]:
+        rows = []
+        position, bufferSize = 0, len(self.buffer)
+        while position < bufferSize:
+            cells = []
+            while True:
+                matchResult = self.__cellPattern.match(self.buffer, position)
+                cells.append(matchResult.span(1))
+                position = matchResult.end()
+                if matchResult.group(2) != b',':
+                    break
+            if len(cells) > 1 or cells[0][0] != cells[0][1]:  # 空行
+                rows.append(cells)
+        return rows
+
+    def isQuoted(self, span: CellSpan) -> bool:
+        return span[1] > span[0] and self.buffer[span[0]:span[0] + 1] == b'"'
+
+    def cellText(self, span: CellSpan) -> str:
+        """单元格的文本，引号内的换行统一为 '\\n'（与以文本模式读取文件时相同）。"""
+        rawBytes = self.buffer[span[0]:span[1]]
+        if self.isQuoted(span):
+            matchResult = self.__quotedPattern.match(rawBytes)
+            if matchResult is not None:
+                rawBytes = matchResult.group(1).replace(b'""', b'"') + matchResult.group(2)
+        return self.decodeFunc(rawBytes).replace('\r\n', '\n').replace('\r', '\n')
+
+    @staticmethod
+    def encodeCell(text: str, forceQuote: bool = False) -> bytes:
+        """
+        按照 csv 模块 QUOTE_MINIMAL 的规则编码单元格。
+
+        :param text: 单元格文本。
+        :param forceQuote: 原单元格带有引号时保持引号，使得改动只限于单元格内容。
+        """
+        if forceQuote or any(char in text for char in ',"\r\n'):
+            text = '"' + text.replace('"', '""') + '"'
+        return text.encode('UTF-8', 'surrogateescape')
+
+
+def patchCSVFile(sourcePath: str, targetPath: str, translations: Dict[str, Dict[str, str]],
+                 rowKeyFunc: Callable[[RowGetter], str | None], decodeFunc: Callable[[bytes], str]) -> int:
+    """
+    以源文件为基础生成目标文件：未改动的字节原样复制，只重新编码收到译文的单元格。
+
+    :param sourcePath: 源 CSV 文件路径。
+    :param targetPath: 目标 CSV 文件路径。
+    :param translations: 行键 -> {列名: 译文}。
+    :param rowKeyFunc: 根据本行的单元格计算行键的函数，返回 None 表示该行不参与匹配。第一列以 `#` 开头的注释行不会交给此函数。
+    :param decodeFunc: 把单元格的字节解码为文本的函数，应当与提取时读取文件的方式一致，以便算出相同的行键。
+    :return: 替换的单元格数量。
+    """
+    if len(translations) == 0 or os.path.getsize(sourcePath) == 0:
+        outputWriter.copyFile(sourcePath, targetPath)
+        return 0
+    with open(sourcePath, 'rb') as sourceFile, \
+            mmap.mmap(sourceFile.fileno(), 0, access=mmap.ACCESS_READ) as sourceBuffer:
+        index = CSVByteIndex(sourceBuffer, decodeFunc)
+        if len(index.rows) == 0:
+            outputWriter.copyFile(sourcePath, targetPath)
+            return 0
+        header = [index.cellText(x) for x in index.rows[0]]
+        columnIndex = {columnName: columnID for columnID, columnName in enumerate(header)}  # 重复的列名以最后一列为准
+        firstColumnID = columnIndex[header[0]]
+        rowByKey: Dict[str, List[CellSpan]] = {}  # 重复的行键以最后一行为准
+
+        for row in index.rows[1:]:
+            def rowGetter(columnName: str, cells: List[CellSpan] = row) -> str | None:
+                columnID = columnIndex.get(columnName)
+                return index.cellText(cells[columnID]) if columnID is not None and columnID < len(cells) else None
+
+            firstCell = rowGetter(header[0]) if firstColumnID < len(row) else None
+            if firstCell is None or firstCell.strip().startswith('#'):
+                continue
+            rowKey = rowKeyFunc(rowGetter)
+            if rowKey is not None and rowKey in translations:
+                rowByKey[rowKey] = row
+
+        patches: List[Tuple[int, int, bytes]] = []
+        for rowKey, row in rowByKey.items():
+            for columnName, translation in translations[rowKey].items():
+                columnID = columnIndex.get(columnName)
+                if columnID is None or columnID >= len(row):
+                    continue
+                span = row[columnID]
+                patches.append((span[0], span[1], CSVByteIndex.encodeCell(translation, index.isQuoted(span))))
+        patches.sort()
+        with outputWriter.open(targetPath, 'wb') as targetFile:
+            position = 0
+            for start, end, cellBytes in patches:
+                targetFile.write(sourceBuffer[position:start])
+                targetFile.write(cellBytes)
+                position = end
+            targetFile.write(sourceBuffer[position:])
+    return len(patches)
@@ -0,0 +1,163 @@
+import json
+import os
+from typing import List, NamedTuple, Tuple, TextIO
+
+from dataModel import JobFilter, ParatranzDataUnit
+
+# 原文有变化的词条保留旧译文并标记为“有疑问”，需要译者对照新原文确认；与翻译记忆的预填状态相同，不会被写回
+REVIEW_STAGE = 2
+
+
+class FileDiff(NamedTuple):
+    """一个中间文件在新旧版本之间的差异。"""
+    filePath: str  # 中间文件的相对路径（以'/'开头）
+    added: List[str]  # 新增的键
+    removed: List[str]  # 删除的键
+    modified: List[Tuple[str, str, str]]  # (键, 旧原文, 新原文)
+    unchanged: int  # 原文未变的词条数量
+    carried: int  # 沿用了旧译文的词条数量（包括原文有变化、标记为待确认的词条）
+
+    @property
+    def changed(self) -> bool:
+        return len(self.added) > 0 or len(self.removed) > 0 or len(self.modified) > 0
+
+    def asDict(self) -> dict:
+        return {'file': self.filePath, 'added': self.added, 'removed': self.removed,
+                'modified': [dict(key=x[0], old=x[1], new=x[2]) for x in self.modified]}
+
+
+class DiffSummary(NamedTuple):
+    """整个目录的差异统计。"""
+    files: int
+    addedFiles: List[str]
+    removedFiles: List[str]
+    added: int
+    removed: int
+    modified: int
+    unchanged: int
+    carried: int
+
+    def asDict(self) -> dict:
+        return self._asdict()
+
+    def printSummary(self):
+        print(f'版本差异：{self.files} 个中间文件，新增 {len(self.addedFiles)} 个、删除 {len(self.removedFiles)} 个；'
+              f'词条新增 {self.added} 条、删除 {self.removed} 条、原文变化 {self.modified} 条、未变 {self.unchanged} 条，'
+              f'沿用旧译文 {self.carried} 条。')
+        for filePath in self.removedFiles:
+            print(f'  新版本中已不存在：{filePath}')
+
+
+def mergeUnits(filePath: str, oldUnits: List[ParatranzDataUnit], newUnits: List[ParatranzDataUnit]) -> FileDiff:
+    """
+    以按键排序后的归并连接比较一个中间文件的新旧词条，并就地更新新词条：
+    原文未变的词条沿用旧的译文与状态（仍待确认的词条同时沿用旧的上下文）；
+    原文有变化且已有译文的词条沿用旧译文，状态改为 `REVIEW_STAGE`，并在上下文中附上旧原文。新词条列表本身的顺序保持不变。
+
+    :param filePath: 中间文件的相对路径，只用于结果。
+    :param oldUnits: 旧版本的词条（通常是现有的中间文件，带有译文）。
+    :param newUnits: 新版本提取出的词条。
+    """
+    oldSorted = sorted(oldUnits, key=lambda x: x.key)
+    newSorted = sorted(newUnits, key=lambda x: x.key)
+    added, removed, modified = [], [], []
+    unchanged = carried = 0
+    oldIndex = newIndex = 0
+    while oldIndex < len(oldSorted) or newIndex < len(newSorted):
+        if newIndex >= len(newSorted) or (oldIndex < len(oldSorted) and
+                                          oldSorted[oldIndex].key < newSorted[newIndex].key):
+            removed.append(oldSorted[oldIndex].key)
+            oldIndex += 1
+            continue
+        if oldIndex >= len(oldSorted) or newSorted[newIndex].key < oldSorted[oldIndex].key:
+            added.append(newSorted[newIndex].key)
+            newIndex += 1
+            continue
+        oldUnit, newUnit = oldSorted[oldIndex], newSorted[newIndex]
+        oldIndex += 1
+        newIndex += 1
+        hasTranslation = oldUnit.stage != 0 and bool(oldUnit.translation)
+        if oldUnit.original == newUnit.original:
+            unchanged += 1
+            if hasTranslation:
+                newUnit.translation, newUnit.stage = oldUnit.translation, oldUnit.stage
+                if oldUnit.stage == REVIEW_STAGE and oldUnit.context:
+                    newUnit.context = oldUnit.context  # 保留待确认的说明（旧原文、翻译记忆的候选译文）
+                carried += 1
+            continue
+        modified.append((newUnit.key, oldUnit.original, newUnit.original))
+        if hasTranslation:
+            newUnit.translation, newUnit.stage = oldUnit.translation, REVIEW_STAGE
+            reviewText = f'[原文已更新，旧原文]\n{oldUnit.original}'
+            newUnit.context = f'{newUnit.context}\n\n{reviewText}' if newUnit.context else reviewText
+            carried += 1
+    return FileDiff(filePath, added, removed, modified, unchanged, carried)
+
+
+def diffTrees(oldIO, newIO, outputIO=None, reportFile: TextIO = None, jobFilter: JobFilter = None) -> DiffSummary:
+    """
+    逐个中间文件比较新旧两个版本。每次只在内存中保留一个文件的新旧词条，因此内存占用只取决于最大的单个文件。
+
+    :param oldIO: 旧版本中间文件的读写方式（`ParatranzFileIO` 或 `SQLiteUnitStore`）。
+    :param newIO: 新版本中间文件的读写方式。
+    :param outputIO: 指定后把合并了旧译文的新词条写入这里（可以与 oldIO 相同，即就地升级）。
+        新版本中已不存在的文件不会被删除，只在结果中列出。
+    :param reportFile: 指定后以 JSON 格式逐个文件写入有差异的词条。
+    :param jobFilter: 任务过滤器，只比较可能属于被选中文件的中间文件。
+    """
+    oldFiles, newFiles = set(oldIO.listFiles(jobFilter)), set(newIO.listFiles(jobFilter))
+    addedFiles, removedFiles = sorted(newFiles - oldFiles), sorted(oldFiles - newFiles)
+    added = removed = modified = unchanged = carried = 0
+    if reportFile is not None:
+        reportFile.write('{\n"files": [')
+    isFirst = True
+    for relativePath in sorted(oldFiles | newFiles):
+        realPath = relativePath.replace('/', os.sep)
+        oldUnits = oldIO.read(oldIO.paratranzPath + realPath) if relativePath in oldFiles else []
+        newUnits = newIO.read(newIO.paratranzPath + realPath) if relativePath in newFiles else []
+        fileDiff = mergeUnits(relativePath, oldUnits, newUnits)
+        added += len(fileDiff.added)
+        removed += len(fileDiff.removed)
+        modified += len(fileDiff.modified)
+        unchanged += fileDiff.unchanged
+        carried += fileDiff.carried
+        if outputIO is not None and relativePath in newFiles:
+            outputPath = outputIO.paratranzPath + realPath
+            os.makedirs(os.path.dirname(outputPath), exist_ok=True)
+            outputIO.write(outputPath, newUnits)
+        if reportFile is not None and fileDiff.changed:
+            reportFile.write(('\n' if isFirst else ',\n') + json.dumps(fileDiff.asDict(), ensure_ascii=False))
+            isFirst = False
+    summary = DiffSummary(len(oldFiles | newFiles), addedFiles, removedFiles, added, removed, modified, unchanged,
+                          carried)
+    if reportFile is not None:
+        reportFile.write('\n],\n"summary": ' + json.dumps(summary.asDict(), ensure_ascii=False, indent=4) + '\n}\n')
+    return summary
+
+
+def extractTree(projectClass, originalPath: str, workPath: str, glossaryPath: str = None, jobFilter: JobFilter = None):
+    """
+    把一个原文目录提取到临时的中间文件目录中，返回该目录的 `ParatranzFileIO`。
+
+    :param projectClass: 处理器类，比如 `SubParatranz`。
+    :param originalPath: 原文目录。
+    :param workPath: 临时工作目录，中间文件写入其中的 para_tranz/output。
+    :param glossaryPath: 项目的术语表，指定后复制到临时目录中，使提取出的上下文与正常提取时相同。
+    :param jobFilter: 任务过滤器。
+    """
+    import contextlib
+    import io
+    import shutil
+
+    from dataModel import ProjectPaths
+    from hzdev_paratranz_io import ParatranzFileIO
+
+    projectPaths = ProjectPaths(originalPath, os.path.join(workPath, 'localization'),
+                                os.path.join(workPath, 'para_tranz', 'output'))
+    if glossaryPath is not None and os.path.isfile(glossaryPath):
+        os.makedirs(os.path.dirname(projectPaths.glossaryPath), exist_ok=True)
+        shutil.copyfile(glossaryPath, projectPaths.glossaryPath)
+    unitIO = ParatranzFileIO(projectPaths.paratranzPath)
+    with contextlib.redirect_stdout(io.StringIO()):
+        projectClass(jobFilter, projectPaths, unitIO).ExtractAll()
+    return unitIO
@@ -0,0 +1,88 @@
+import json
+import re
+from json.encoder import JSONEncoder, encode_basestring
+from typing import Any, Callable, Dict, List, TextIO, Tuple
+
+# json5.dumps(quote_keys=True, indent=4, ensure_ascii=False) 与 json 的输出只有以下差别：
+#   - json5 在非空容器的最后一个元素之后加逗号；
+#   - json5 把 \v 与 \0 写成短转义（json 写成 \u000b 与 \u0000），并且总是转义 U+2028 与 U+2029。
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+_ESCAPE_PATTERN = re.compile(r'(?<!\\)((?:\\\\)*)\\u00(0b|00)')
+_SHORT_ESCAPES = {'0b': '\\v', '00': '\\0'}
+_encoders: Dict[Tuple[int, int], Callable[[Any], str]] = {}
+
+
+def _leafEncoder(indent: int, level: int) -> Callable[[Any], str]:
+    """第 level 层元素使用的 C 编码器：元素分隔符中带有换行与缩进，因此只含标量的容器可以整个交给它编码。"""
+    encoder = _encoders.get((indent, level))
+    if encoder is None:
+        itemSeparator = ',\n' + ' ' * (indent * level)
+        encoder = _encoders[(indent, level)] = JSONEncoder(ensure_ascii=False, check_circular=False,
+                                                           separators=(itemSeparator, ': ')).encode
+    return encoder
+
+
+def _emit(obj: Any, parts: List[str], indent: int, level: int, lastComma: str):
+    objType = type(obj)
+    if objType in _SCALAR_TYPES:
+        parts.append(_leafEncoder(indent, 0)(obj))
+        return
+    isDict = isinstance(obj, dict)
+    if not isDict and not isinstance(obj, (list, tuple)):
+        parts.append(_leafEncoder(indent, 0)(obj))  # 与 json 相同，不支持的类型由编码器抛出 TypeError
+        return
+    if len(obj) == 0:
+        parts.append('{}' if isDict else '[]')
+        return
+    opening, closing = ('{', '}') if isDict else ('[', ']')
+    innerIndent = '\n' + ' ' * (indent * (level + 1))
+    values = obj.values() if isDict else obj
+    parts.append(opening + innerIndent)
+    if all(type(x) in _SCALAR_TYPES for x in values):
+        parts.append(_leafEncoder(indent, level + 1)(obj)[1:-1])
+    elif isDict:
+        isFirst = True
+        for key, value in obj.items():
+            if not isFirst:
+                parts.append(',' + innerIndent)
+            isFirst = False
+            parts.append(encode_basestring(key if isinstance(key, str) else json.dumps(key)) + ': ')
+            _emit(value, parts, indent, level + 1, lastComma)
+    else:
+        for itemID, value in enumerate(obj):
+            if itemID > 0:
+                parts.append(',' + innerIndent)
+            _emit(value, parts, indent, level + 1, lastComma)
+    parts.append(lastComma + '\n' + ' ' * (indent * level) + closing)
+
+
+def dumpsJSON5(obj: Any, trailingCommas: bool = True, quoteKeys: bool = True, indent: int = 4) -> str:
+    """
+    序列化写回的汉化文件，输出与 `json5.dumps(obj, ensure_ascii=False, indent=4, quote_keys=True)` 逐字节相同。
+
+    只含标量的容器（字符串字典、舰船列表等，占了文件的绝大部分）整个交给 json 的 C 编码器，
+    只有容器的嵌套结构在 Python 中处理，比 json5 快一个数量级，也快于带缩进的 `json.dumps`（缩进时不使用 C 编码器）。
+
+    :param trailingCommas: 是否在容器的最后一个元素之后加逗号（json5 的格式）；为 False 时与 `json.dumps` 的输出相同。
+    :param quoteKeys: 是否总是给键加引号。为 False 时标识符形式的键不加引号，只有 json5 能够生成，因此交给 json5 处理。
+    :param indent: 缩进的空格数。
+    """
+    if not quoteKeys:
+        import json5
+
+        return json5.dumps(obj, ensure_ascii=False, indent=indent, trailing_commas=trailingCommas)
+    parts = []
+    _emit(obj, parts, indent, 0, ',' if trailingCommas else '')
+    content = ''.join(parts)
+    if not trailingCommas:
+        return content
+    if '\\u000b' in content or '\\u0000' in content:
+        content = _ESCAPE_PATTERN.sub(lambda x: x.group(1) + _SHORT_ESCAPES[x.group(2)], content)
+    if '\u2028' in content or '\u2029' in content:
+        content = content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+    return content
+
+
+def dumpJSON5(obj: Any, tFile: TextIO, trailingCommas: bool = True, quoteKeys: bool = True, indent: int = 4):
+    """与 `dumpsJSON5` 相同，写入文件对象。"""
+    tFile.write(dumpsJSON5(obj, trailingCommas, quoteKeys, indent))
@@ -0,0 +1,134 @@
+import threading
+from difflib import SequenceMatcher
+from typing import Dict, List, NamedTuple
+
+from dataModel import ParatranzDataUnit
+from hzdev_translation_memory import PREFILL_STAGE, TranslationMemory
+
+SHINGLE_SIZE = 4  # 以 UTF-8 编码后连续的4个字节作为一个片段
+SIGNATURE_SIZE = 32  # 签名的分桶数量（取哈希值的最高5位）
+BAND_ROWS = 4  # 每个 LSH 条带包含的签名值数量，共 SIGNATURE_SIZE // BAND_ROWS 个条带
+_EMPTY = 1 << 32
+
+
+class FuzzyMatch(NamedTuple):
+    """与新原文最相似的已翻译原文。"""
+    similarity: float  # 两段原文的相似度（0~1）
+    original: str
+    translation: str
+
+
+def minHashSignature(text: str) -> List[int]:
+    """
+    计算文本的 MinHash 签名。
+
+    使用单次置换的 MinHash（one permutation hashing）：每个片段只计算一次哈希，按哈希值的最高几位分入各个桶并保留桶内最小值，
+    空桶从右侧最近的非空桶借值（旋转致密化）。计算量只与文本长度有关，而与签名长度无关。
+    """
+    data = text.encode('UTF-8')
+    signature = [_EMPTY] * SIGNATURE_SIZE
+    for x in range(max(1, len(data) - SHINGLE_SIZE + 1)):
+        value = (int.from_bytes(data[x:x + SHINGLE_SIZE], 'little') * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        binID, value = value >> 59, (value >> 27) & 0xFFFFFFFF  # 乘法哈希的高位分布更均匀
+        if value < signature[binID]:
+            signature[binID] = value
+    for binID in range(SIGNATURE_SIZE):
+        if signature[binID] != _EMPTY:
+            continue
+        for offset in range(1, SIGNATURE_SIZE):
+            borrowed = signature[(binID + offset) % SIGNATURE_SIZE]
+            if borrowed < _EMPTY:
+                signature[binID] = borrowed + offset * _EMPTY  # 借来的值加上偏移，避免与原桶的值相同
+                break
+    return signature
+
+
+class FuzzyTranslationMemory(TranslationMemory):
+    """
+    带有模糊匹配的翻译记忆库。
+
+    原文完全相同时与 `TranslationMemory` 一样直接预填译文；找不到完全相同的原文时，以字符片段的 MinHash 签名
+    与 LSH 分段分桶查找相似的已翻译原文，只有落在同一个桶中的少数候选会计算实际的相似度，因此查询耗时与记忆库的规模基本无关。
+    找到的最相似译文及相似度写入词条的上下文，相似度达到阈值时还会以“有疑问”的状态预填译文。
+    """
+
+    def __init__(self, threshold: float = 0.8, prefill: bool = True, minLength: int = 20, maxCandidates: int = 8,
+                 prefillStage: int = PREFILL_STAGE):
+        """
+        :param threshold: 采用模糊匹配结果的最低相似度。
+        :param prefill: 是否以模糊匹配的译文预填词条，否则只写入上下文。
+        :param minLength: 参与模糊匹配的原文的最短长度，过短的文本相似度没有意义。
+        :param maxCandidates: 每次查询最多计算相似度的候选数量（按命中的条带数量排序）。
+        :param prefillStage: 预填译文后词条的状态。
+        """
+        super().__init__(prefillStage)
+        self.threshold = threshold
+        self.prefill = prefill
+        self.minLength = minLength
+        self.maxCandidates = maxCandidates
+        self.fuzzyCount = 0  # 以模糊匹配补充了上下文（或预填了译文）的词条数量
+        self.__countLock = threading.Lock()  # 提取任务在线程池中并发执行，计数需要加锁
+        self.__originals: List[str] = []
+        self.__ids: Dict[str, int] = {}
+        self.__buckets: Dict[int, List[int]] = {}
+
+    def add(self, original: str, translation: str):
+        super().add(original, translation)
+        if original in self.__ids or len(original) < self.minLength:
+            return
+        entryID = len(self.__originals)
+        self.__ids[original] = entryID
+        self.__originals.append(original)
+        for bandKey in self.__bandKeys(minHashSignature(original)):
+            self.__buckets.setdefault(bandKey, []).append(entryID)
+
+    def findSimilar(self, original: str) -> FuzzyMatch | None:
+        """查找与原文最相似（但不完全相同）的已翻译原文，没有达到阈值的结果时返回 None。"""
+        if len(original) < self.minLength:
+            return None
+        hits: Dict[int, int] = {}
+        for bandKey in self.__bandKeys(minHashSignature(original)):
+            for entryID in self.__buckets.get(bandKey, ()):
+                hits[entryID] = hits.get(entryID, 0) + 1
+        candidates = sorted(hits, key=lambda x: (-hits[x], x))[:self.maxCandidates]
+        best, bestScore = None, self.threshold
+        for entryID in candidates:
+            candidate = self.__originals[entryID]
+            if candidate == original:
+                continue
+            matcher = SequenceMatcher(None, original, candidate, autojunk=False)
+            if matcher.real_quick_ratio() < bestScore or matcher.quick_ratio() < bestScore:
+                continue
+            score = matcher.ratio()
+            if score >= bestScore:
+                best, bestScore = candidate, score
+        if best is None:
+            return None
+        return FuzzyMatch(bestScore, best, self.lookup(best))
+
+    def writeReport(self, reportPath: str):
+        super().writeReport(reportPath)
+        print(f'翻译记忆库：模糊匹配了 {self.fuzzyCount} 条词条（相似度不低于 {self.threshold:.0%}）。')
+
+    def __call__(self, filePath: str, units: List[ParatranzDataUnit]):
+        super().__call__(filePath, units)
+        fuzzyCount = 0
+        for unit in units:
+            if unit.stage != 0 or unit.translation or not isinstance(unit.original, str):
+                continue
+            match = self.findSimilar(unit.original)
+            if match is None:
+                continue
+            fuzzyCount += 1
+            fuzzyText = f'[模糊匹配 相似度 {match.similarity:.0%}]\n原文：{match.original}\n译文：{match.translation}'
+            unit.context = f'{unit.context}\n\n{fuzzyText}' if unit.context else fuzzyText
+            if self.prefill:
+                unit.translation = match.translation
+                unit.stage = self.prefillStage
+        with self.__countLock:
+            self.fuzzyCount += fuzzyCount
+
+    @staticmethod
+    def __bandKeys(signature: List[int]) -> List[int]:
+        return [hash((bandID, *signature[bandID * BAND_ROWS:(bandID + 1) * BAND_ROWS]))
+                for bandID in range(SIGNATURE_SIZE // BAND_ROWS)]
@@ -0,0 +1,180 @@
+import json
+from collections import deque
+from os.path import isfile
+from typing import List, Dict, Tuple, NamedTuple
+
+from dataModel import ParatranzDataUnit
+from hzdev_stages import ExtractionStages
+
+
+class GlossaryTerm(NamedTuple):
+    """术语表中的一个术语。"""
+    term: str  # 术语原文
+    translation: str  # 术语的认可译名
+    note: str = ''  # 术语的备注
+    variants: Tuple[str, ...] = ()  # 术语的变体形式（比如复数形式），同样指向该术语
+
+
+class AhoCorasickMatcher:
+    """
+    基于 Aho-Corasick 自动机的多模式字符串匹配器。
+
+    自动机只在构造时建立一次，之后对任意文本的匹配耗时只与文本长度和命中数量相关，而与模式数量无关。
+    匹配不区分大小写；如果模式的首尾是英文单词字符，则要求命中位置的两侧不能紧挨着其它单词字符。
+    """
+
+    def __init__(self, patterns: List[str]):
+        """
+        :param patterns: 模式字符串列表，匹配结果中的序号即为模式在该列表中的序号。
+        """
+        self.__patterns = [pattern.lower() for pattern in patterns]
+        self.__goto: List[Dict[str, int]] = [{}]  # 状态转移表
+        self.__fail: List[int] = [0]  # 失配指针
+        self.__output: List[List[int]] = [[]]  # 每个状态命中的模式序号
+        for patternID, pattern in enumerate(self.__patterns):
+            if len(pattern) == 0:
+                continue
+            state = 0
+            for char in pattern:
+                nextState = self.__goto[state].get(char)
+                if nextState is None:
+                    nextState = len(self.__goto)
+                    self.__goto[state][char] = nextState
+                    self.__goto.append({})
+                    self.__fail.append(0)
+                    self.__output.append([])
+                state = nextState
+            self.__output[state].append(patternID)
+        # 广度优先建立失配指针，并把失配状态的输出合并进来
+        queue = deque(self.__goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nextState in self.__goto[state].items():
+                queue.append(nextState)
+                failState = self.__fail[state]
+                while failState and char not in self.__goto[failState]:
+                    failState = self.__fail[failState]
+                self.__fail[nextState] = self.__goto[failState].get(char, 0)
+                if self.__fail[nextState] == nextState:
+                    self.__fail[nextState] = 0
+                self.__output[nextState] = self.__output[nextState] + self.__output[self.__fail[nextState]]
+
+    def findAll(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        查找文本中所有命中的模式。
+
+        :param text: 待匹配的文本。
+        :return: (起始位置, 结束位置, 模式序号) 的列表，按结束位置排序。
+        """
+        lowerText = text.lower()
+        if len(lowerText) != len(text):  # 个别字符小写化后长度会变化，此时逐字处理以保证位置对齐
+            lowerText = ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+        result = []
+        goto, fail, output = self.__goto, self.__fail, self.__output
+        state = 0
+        for index, char in enumerate(lowerText):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for patternID in output[state]:
+                    start = index + 1 - len(self.__patterns[patternID])
+                    if self.__isBoundary(text, start, index + 1):
+                        result.append((start, index + 1, patternID))
+        return result
+
+    @classmethod
+    def __isBoundary(cls, text: str, start: int, end: int) -> bool:
+        """命中位置两侧是否满足单词边界的要求。"""
+        if cls.__isWordChar(text[start]) and start > 0 and cls.__isWordChar(text[start - 1]):
+            return False
+        if cls.__isWordChar(text[end - 1]) and end < len(text) and cls.__isWordChar(text[end]):
+            return False
+        return True
+
+    @staticmethod
+    def __isWordChar(char: str) -> bool:
+        # 中日韩文字之间没有空格分词，因此不参与单词边界判定
+        return (char.isalnum() or char == '_') and ord(char) < 0x2E80
+
+
+class GlossaryAnnotator:
+    """
+    术语标注处理器。
+
+    读取本地术语文件（格式与 Paratranz 术语接口导出的数据相同），在提取时找出每个词条原文中出现的术语，
+    并把术语及其认可译名追加到词条的上下文中。
+    """
+
+    def __init__(self, terms: List[GlossaryTerm]):
+        self.__terms = terms
+        self.__patternTerms: List[int] = []  # 模式序号 -> 术语序号
+        patterns = []
+        for termID, term in enumerate(terms):
+            for pattern in (term.term, *term.variants):
+                patterns.append(pattern)
+                self.__patternTerms.append(termID)
+        self.__matcher = AhoCorasickMatcher(patterns)
+
+    @classmethod
+    def fromFile(cls, filePath: str):
+        """
+        从本地术语文件中加载术语表。
+
+        :param filePath: 术语文件路径，可以是术语列表，也可以是带有 `results` 键的接口原始返回数据。
+        """
+        with open(filePath, encoding='UTF-8') as tFile:
+            tContent = json.load(tFile)
+        if isinstance(tContent, dict):
+            tContent = tContent.get('results', [])
+        terms = []
+        for termDict in tContent:
+            if not isinstance(termDict, dict) or not termDict.get('term'):
+                continue
+            variants = tuple(variant for variant in termDict.get('variants') or []
+                             if isinstance(variant, str) and variant.strip() != '')
+            terms.append(GlossaryTerm(termDict['term'], termDict.get('translation') or '',
+                                      termDict.get('note') or '', variants))
+        return cls(terms)
+
+    @classmethod
+    def install(cls, filePath: str, stages: ExtractionStages, previous: 'GlossaryAnnotator' = None):
+        """
+        若术语文件存在，则加载术语表并注册为提取阶段的处理器。
+
+        :param filePath: 术语文件路径。
+        :param stages: 要注册到的提取阶段注册表。
+        :param previous: 之前注册的术语表，会以一次替换换成新的术语表（术语文件已不存在时直接移除）。
+        :return: 已注册的处理器，术语文件不存在时返回 None。
+        """
+        if not isfile(filePath):
+            stages.replace(previous, None)
+            return None
+        annotator = cls.fromFile(filePath)
+        stages.replace(previous, annotator)
+        print(f'已从 {filePath} 加载了 {len(annotator.__terms)} 条术语。')
+        return annotator
+
+    def findTerms(self, text: str) -> List[GlossaryTerm]:
+        """按首次出现的顺序返回文本中出现的术语，同一术语只返回一次。"""
+        result = []
+        usedTerm = set()
+        for _, _, patternID in sorted(self.__matcher.findAll(text)):
+            termID = self.__patternTerms[patternID]
+            if termID not in usedTerm:
+                usedTerm.add(termID)
+                result.append(self.__terms[termID])
+        return result
+
+    def __call__(self, filePath: str, units: List[ParatranzDataUnit]):
+        for unit in units:
+            if not isinstance(unit.original, str) or unit.original == '':
+                continue
+            terms = self.findTerms(unit.original)
+            if len(terms) == 0:
+                continue
+            termText = '\n'.join(f'{term.term}：{term.translation}' for term in terms)
+            if unit.context:
+                unit.context = f'{unit.context}\n\n[术语表]\n{termText}'
+            else:
+                unit.context = f'[术语表]\n{termText}'
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+import traceback
+from functools import partial
+from hashlib import md5
+from typing import Dict, Iterable, List, Tuple
+
+from dataModel import ProjectJob
+from hzdev_output import outputWriter
+
+
+class RunJournal:
+    """
+    一次完整提取（或写回）的运行日志，每行一条 JSON 记录，可以在中断或失败后从上次的位置继续。
+
+    经过 `wrap` 包装的任务：
+        - 失败时记录错误并继续执行其它任务，全部结束后由 `report` 汇总；
+        - 成功时才写入输出文件（执行期间的输出先经 `outputWriter.capture` 暂存），并记录输入文件的大小与修改时间，
+          以及每个输出文件的摘要；
+        - 继续运行（resume）时，如果上次已经完成、输入文件没有变化、输出文件也没有被改动，则直接跳过。
+    没有声明输入文件的任务（装配、战役）无法判断是否过期，总是重新执行。
+    """
+
+    def __init__(self, journalPath: str, mode: str, resume: bool = False):
+        """
+        :param journalPath: 日志文件路径。
+        :param mode: 'extract' 或 'writeback'，继续运行时只采用相同模式的日志。
+        :param resume: 继续上次的运行，否则清空日志重新开始。
+        """
+        self.journalPath = journalPath
+        self.mode = mode
+        self.failures: List[Tuple[str, str]] = []  # (任务名称, 错误信息)
+        self.completed = 0
+        self.skipped = 0
+        self.__lock = threading.Lock()
+        self.__done: Dict[str, dict] = self.__load() if resume else {}
+        os.makedirs(os.path.dirname(os.path.abspath(journalPath)), exist_ok=True)
+        if resume and len(self.__done) > 0:
+            self.__file = open(journalPath, 'a', encoding='UTF-8')
+        else:
+            self.__done = {}
+            self.__file = open(journalPath, 'w', encoding='UTF-8')
+            self.__append({'type': 'start', 'mode': mode, 'time': time.time()})
+
+    def wrap(self, jobs: Iterable[ProjectJob]) -> List[ProjectJob]:
+        """包装任务，使其执行结果记录到日志中，可以交给任何执行方式（依次执行、流水线等）。"""
+        return [ProjectJob(job.name, partial(self.__runJob, job), job.inputs) for job in jobs]
+
+    def finish(self):
+        """记录本次运行结束并关闭日志。"""
+        self.__append({'type': 'finish', 'failed': len(self.failures), 'time': time.time()})
+        self.__file.close()
+
+    def report(self):
+        print(f'运行日志：完成 {self.completed} 个任务，跳过已完成的 {self.skipped} 个，失败 {len(self.failures)} 个。')
+        for jobName, errorText in self.failures:
+            print(f'\n{jobName} 失败：\n{errorText.rstrip()}')
+        if len(self.failures) > 0:
+            print(f'\n修复后可以使用 --resume 继续，已完成的任务不会重新执行。日志：{self.journalPath}')
+
+    def __runJob(self, job: ProjectJob) -> bool:
+        inputs = self.__fingerprint(job.inputs)
+        record = self.__done.get(job.name)
+        if record is not None and len(job.inputs) > 0 and record['inputs'] == inputs and \
+                self.__outputsIntact(record['outputs']):
+            with self.__lock:
+                self.skipped += 1
+            return record['handled']
+        try:
+            with outputWriter.capture() as outputs:
+                handled = bool(job.func())
+        except Exception:
+            errorText = traceback.format_exc()
+            print(f'任务 {job.name} 失败，已记录错误并继续执行其它任务。')
+            with self.__lock:
+                self.failures.append((job.name, errorText))
+            self.__append({'type': 'failed', 'job': job.name, 'error': errorText})
+            return False
+        for filePath, content in outputs:
+            outputWriter.writeBytes(filePath, content)
+        with self.__lock:
+            self.completed += 1
+        self.__append({'type': 'done', 'job': job.name, 'handled': handled, 'inputs': inputs,
+                       'outputs': {filePath: md5(content).hexdigest() for filePath, content in outputs}})
+        return handled
+
+    def __append(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.__lock:
+            self.__file.write(line + '\n')
+            self.__file.flush()
+
+    def __load(self) -> Dict[str, dict]:
+        """读取上次运行中已完成的任务；模式不同或日志不存在时返回空字典。最后一行可能因中断而不完整，会被忽略。"""
+        result = {}
+        try:
+            with open(self.journalPath, encoding='UTF-8') as tFile:
+                lines = tFile.read().splitlines()
+        except OSError:
+            return result
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('type') == 'start':
+                if record.get('mode') != self.mode:
+                    return {}
+            elif record.get('type') == 'done':
+                result[record['job']] = record
+            elif record.get('type') == 'failed':
+                result.pop(record['job'], None)
+        return result
+
+    @staticmethod
+    def __fingerprint(filePaths: Iterable[str]) -> Dict[str, list | None]:
+        result = {}
+        for filePath in filePaths:
+            try:
+                fileStat = os.stat(filePath)
+            except OSError:
+                result[filePath] = None
+                continue
+            result[filePath] = [fileStat.st_size, fileStat.st_mtime_ns]
+        return result
+
+    @staticmethod
+    def __outputsIntact(outputs: Dict[str, str]) -> bool:
+        for filePath, digest in outputs.items():
+            try:
+                with open(filePath, 'rb') as tFile:
+                    if md5(tFile.read()).hexdigest() != digest:
+                        return False
+            except OSError:
+                return False
+        return True
@@ -0,0 +1,143 @@
+import json
+import re
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+# 宽松的 JSON / JSON5 词法：空白与注释（#、//、/* */）、字符串（双引号或单引号）、结构符号，以及其它不带引号的值
+# （数字、1f、true/TRUE、ships 这样的裸词）。逗号只作为分隔符，缺少或多出都可以接受
+_TOKEN_PATTERN = re.compile(r'(?P<space>[\s\ufeff]+|#[^\n]*|//[^\n]*|/\*.*?\*/)'
+                            r'|(?P<string>"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')'
+                            r'|(?P<punct>[{}\[\]:,])'
+                            r'|(?P<bare>[^\s{}\[\]:,"\'#/]+(?:/(?![/*])[^\s{}\[\]:,"\'#/]*)*)', re.S)
+
+KeyPathTuple = Tuple[str | int, ...]  # 值在文档中的完整路径：字典的键或列表的下标
+
+
+class StringSpan(NamedTuple):
+    """字符串值在原文中的位置，start 与 end 包含两侧的引号。"""
+    start: int
+    end: int
+
+
+def _decodeKey(literal: str) -> str:
+    if '\\' not in literal:
+        return literal[1:-1]
+    if literal[0] == "'":
+        literal = '"' + literal[1:-1].replace("\\'", "'").replace('"', '\\"') + '"'
+    return json.loads(literal, strict=False)
+
+
+def scanStringSpans(fileContent: str, keyFilter: Callable[[str], str] = None) -> Dict[KeyPathTuple, StringSpan] | None:
+    """
+    扫描一遍原文，记录每个字符串值的路径与位置，不构建文档本身。同一个字典中重复的键以最后一次出现为准（与 json5 相同）。
+
+    :param fileContent: 原文文件的文本（不需要经过 `filterJSON5`）。
+    :param keyFilter: 对每个键做与解析前的预处理相同的变换，使路径与解析结果中的键一致。
+    :return: 路径到位置的映射；文本无法识别时返回 None，此时应当改用完整的解析流程。
+    """
+    result: Dict[KeyPathTuple, StringSpan] = {}
+    stack: List[list] = []  # [是否为字典, 路径, 下一个列表下标或当前的键, 字典中是否正在等待冒号]
+    position, length = 0, len(fileContent)
+    isFinished = False
+    while position < length:
+        matchResult = _TOKEN_PATTERN.match(fileContent, position)
+        if matchResult is None:
+            return None
+        kind, token = matchResult.lastgroup, matchResult.group()
+        start, position = position, matchResult.end()
+        if kind == 'space' or (token == ',' and (isFinished or len(stack) > 0)):
+            continue
+        if isFinished:
+            return None  # 顶层的值之后还有其它内容
+        frame = stack[-1] if len(stack) > 0 else None
+        if frame is not None and frame[0]:  # 字典：键 -> 冒号 -> 值
+            if frame[2] is None:
+                if token == '}':
+                    stack.pop()
+                    isFinished = len(stack) == 0
+                    continue
+                if kind == 'string':
+                    key = _decodeKey(token)
+                elif kind == 'bare':
+                    key = token
+                else:
+                    return None
+                frame[2], frame[3] = (keyFilter(key) if keyFilter is not None else key), True
+                continue
+            if frame[3]:
+                if token != ':':
+                    return None
+                frame[3] = False
+                continue
+            path = frame[1] + (frame[2],)
+            frame[2] = None
+        elif frame is not None:  # 列表
+            if token == ']':
+                stack.pop()
+                isFinished = len(stack) == 0
+                continue
+            path = frame[1] + (frame[2],)
+            frame[2] += 1
+        else:
+            path = ()
+        if token == '{':
+            stack.append([True, path, None, False])
+        elif token == '[':
+            stack.append([False, path, 0, False])
+        elif kind == 'string':
+            result[path] = StringSpan(start, position)
+            isFinished = len(stack) == 0
+        elif kind == 'bare':
+            result.pop(path, None)
+            isFinished = len(stack) == 0
+        else:
+            return None
+    return result if isFinished else None
+
+
+class StringSplicer:
+    """
+    把译文直接拼接进原文中对应字符串的位置，注释、缩进、不带引号的值与其它所有内容都保持原样。
+
+    生成结果的耗时只与替换的数量以及原文的长度有关，不需要重新序列化整个文档。
+    """
+
+    def __init__(self, fileContent: str, spans: Dict[KeyPathTuple, StringSpan]):
+        self.fileContent = fileContent
+        self.__spans = spans
+        self.__replacements: Dict[int, Tuple[StringSpan, str]] = {}
+
+    @classmethod
+    def parse(cls, fileContent: str, keyFilter: Callable[[str], str] = None) -> 'StringSplicer | None':
+        """扫描原文并建立拼接器，文本无法识别时返回 None。参数与 `scanStringSpans` 相同。"""
+        spans = scanStringSpans(fileContent, keyFilter)
+        return cls(fileContent, spans) if spans is not None else None
+
+    def __contains__(self, path: KeyPathTuple) -> bool:
+        return tuple(path) in self.__spans
+
+    def __len__(self):
+        return len(self.__replacements)
+
+    def replace(self, path: KeyPathTuple, value: str) -> bool:
+        """
+        把路径上的字符串替换为 value（以双引号的 JSON 字符串写入）。同一个路径替换多次时以最后一次为准。
+
+        :return: 路径上是否有字符串值，没有时不做任何事。
+        """
+        span = self.__spans.get(tuple(path))
+        if span is None:
+            return False
+        self.__replacements[span.start] = (span, json.dumps(value, ensure_ascii=False))
+        return True
+
+    def result(self) -> str:
+        """按位置顺序拼接出替换后的文本。"""
+        parts = []
+        position = 0
+        for start in sorted(self.__replacements):
+            span, literal = self.__replacements[start]
+            parts.append(self.fileContent[position:span.start])
+            parts.append(literal)
+            position = span.end
+        parts.append(self.fileContent[position:])
+        return ''.join(parts)
@@ -0,0 +1,136 @@
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from hzdev_lazy import LazyModule
+
+pprint = LazyModule('pprint')
+
+WILDCARD = '*'
+
+
+class KeyPath(NamedTuple):
+    """
+    一条待提取文本的键路径声明。
+
+    path: 以'.'分隔的键路径，'*' 匹配字典中的任意一个键，比如 `companies.*.name`。
+    key: 词条键的模板，{0}、{1} … 依次代表各个 '*' 匹配到的键。不指定时把路径中的 '*' 替换为匹配到的键，再以'#'连接，
+        比如 `companies#<ID>#name`。
+    context: 词条上下文的模板，可以使用 {0}、{1} …，以及 {raw}（包含该文本的字典的 pprint 文本）和
+        {rawEntry}（{字典的键: 字典} 的 pprint 文本）。
+    """
+    path: str
+    key: str = None
+    context: str = None
+
+
+class KeyPathMatch(NamedTuple):
+    """提取到的一条文本。"""
+    key: str
+    value: str
+    context: str | None
+    path: Tuple[str, ...]  # 文本在文档中的完整键路径，写回时按此赋值
+
+
+class _CompiledKeyPath(NamedTuple):
+    keyTemplate: str
+    contextTemplate: str | None
+    needRaw: bool
+    needRawEntry: bool
+
+
+class _Node:
+    __slots__ = ('literals', 'wildcard', 'leaves')
+
+    def __init__(self):
+        self.literals: Dict[str, _Node] = {}  # 按声明的顺序排列
+        self.wildcard: _Node | None = None
+        self.leaves: List[_CompiledKeyPath] = []
+
+
+class KeyPathSpec:
+    """
+    编译好的一组键路径。
+
+    所有路径合并为一棵前缀树，一次遍历解析后的文档即可提取全部声明的文本。同一层中，明确的键按声明顺序处理，'*' 按文档中的顺序处理；
+    只有字典会被继续深入，只有字符串会被提取。写回时先由 `locate` 得到词条键到完整键路径的映射，再逐条赋值。
+    """
+
+    def __init__(self, keyPaths: Iterable[KeyPath], loader: str = 'json5'):
+        """
+        :param keyPaths: 键路径声明。
+        :param loader: 原文文件的解析方式：'json5'（先经过 `filterJSON5` 处理）或 'json'（严格的 JSON）。
+        """
+        self.keyPaths = tuple(keyPaths)
+        self.loader = loader
+        self.__root = _Node()
+        for keyPath in self.keyPaths:
+            self.__add(keyPath)
+
+    def __add(self, keyPath: KeyPath):
+        segments = keyPath.path.split('.')
+        node = self.__root
+        keyParts = []
+        wildcardCount = 0
+        for segment in segments:
+            if segment == WILDCARD:
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+                node = node.wildcard
+                keyParts.append(f'{{{wildcardCount}}}')
+                wildcardCount += 1
+            else:
+                node = node.literals.setdefault(segment, _Node())
+                keyParts.append(segment.replace('{', '{{').replace('}', '}}'))
+        keyTemplate = keyPath.key if keyPath.key is not None else '#'.join(keyParts)
+        contextTemplate = keyPath.context
+        node.leaves.append(_CompiledKeyPath(keyTemplate, contextTemplate,
+                                            contextTemplate is not None and '{raw}' in contextTemplate,
+                                            contextTemplate is not None and '{rawEntry}' in contextTemplate))
+
+    def __walk(self, document: Any) -> Iterator[Tuple[_CompiledKeyPath, str, Tuple[str, ...], Tuple[str, ...], dict]]:
+        """遍历文档，产出 (键路径, 文本, 完整键路径, '*' 匹配到的键, 包含该文本的字典)。"""
+        stack = [(document, self.__root, (), (), None)]
+        while len(stack) > 0:
+            value, node, path, captures, parent = stack.pop()
+            if isinstance(value, str):
+                for leaf in node.leaves:
+                    yield leaf, value, path, captures, parent
+            if not isinstance(value, dict):
+                continue
+            children = []
+            for literal, child in node.literals.items():
+                if literal in value:
+                    children.append((value[literal], child, path + (literal,), captures, value))
+            if node.wildcard is not None:
+                for dictKey, dictValue in value.items():
+                    children.append((dictValue, node.wildcard, path + (dictKey,), captures + (dictKey,), value))
+            stack += reversed(children)
+
+    def extract(self, document: Any) -> List[KeyPathMatch]:
+        """提取文档中所有声明的文本。"""
+        result = []
+        rawCache: Dict[int, str] = {}
+        for leaf, value, path, captures, parent in self.__walk(document):
+            context = None
+            if leaf.contextTemplate is not None:
+                fields = {}
+                if leaf.needRaw:
+                    if id(parent) not in rawCache:
+                        rawCache[id(parent)] = pprint.pformat(parent, sort_dicts=False)
+                    fields['raw'] = rawCache[id(parent)]
+                if leaf.needRawEntry:
+                    fields['rawEntry'] = pprint.pformat({path[-2]: parent} if len(path) > 1 else parent,
+                                                        sort_dicts=False)
+                context = leaf.contextTemplate.format(*captures, **fields)
+            result.append(KeyPathMatch(leaf.keyTemplate.format(*captures), value, context, path))
+        return result
+
+    def locate(self, document: Any) -> Dict[str, Tuple[str, ...]]:
+        """词条键到完整键路径的映射，用于写回。"""
+        return {leaf.keyTemplate.format(*captures): path for leaf, _, path, captures, _ in self.__walk(document)}
+
+    @staticmethod
+    def setValue(document: Any, path: Tuple[str, ...], value: str):
+        """按完整键路径赋值。"""
+        for segment in path[:-1]:
+            document = document[segment]
+        document[path[-1]] = value
@@ -0,0 +1,34 @@
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """
+    第一次访问属性时才真正导入的模块代理，用于推迟导入较重的解析后端，缩短启动时间。
+
+    用法与普通模块相同：`json5 = LazyModule('json5')`，之后调用 `json5.loads(...)` 时才会导入 json5。
+    """
+
+    def __init__(self, moduleName: str):
+        self.__moduleName = moduleName
+        self.__module: ModuleType | None = None
+        self.__lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """模块是否已经导入。"""
+        return self.__module is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.__load(), name)
+
+    def __load(self) -> ModuleType:
+        if self.__module is None:
+            with self.__lock:  # 并发执行任务时只导入一次
+                if self.__module is None:
+                    self.__module = importlib.import_module(self.__moduleName)
+        return self.__module
+
+    def __repr__(self):
+        return f'<LazyModule {self.__moduleName!r}{" (loaded)" if self.loaded else ""}>'
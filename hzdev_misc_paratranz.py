@@ -1,25 +1,37 @@
 import csv
 import json
-import pprint
 import re
+import threading
 from enum import Enum
+from functools import partial
 from hashlib import md5
-from os import sep, scandir, DirEntry, walk
+from os import sep, scandir, DirEntry, walk, stat
 from os.path import isfile, isdir
-from pathlib import Path
-from typing import List, Dict, Tuple, NamedTuple
-
-import json5
-import hjson
-
-from hzdev_csv_paratranz import csvSubParatranz
-from dataModel import ParatranzDataUnit
-
-PROJECT_DIRECTORY = Path(__file__).parent.parent
-ORIGINAL_PATH = str(PROJECT_DIRECTORY / 'original')
-TRANSLATION_PATH = str(PROJECT_DIRECTORY / 'localization')
-PARA_TRANZ_PATH = str(PROJECT_DIRECTORY / 'para_tranz' / 'output')
-
+from typing import List, Dict, Tuple, NamedTuple, Iterable, TYPE_CHECKING
+
+from hzdev_emitter import dumpJSON5, dumpsJSON5
+from hzdev_glossary import GlossaryAnnotator
+from hzdev_json_spans import StringSplicer
+from hzdev_keypath import KeyPath, KeyPathSpec
+from hzdev_lazy import LazyModule
+from hzdev_output import outputWriter
+from hzdev_paratranz_io import ParatranzFileIO
+from hzdev_parse_cache import parseCache
+from hzdev_pipeline import StagedPipeline, openSource, sharedSources
+from hzdev_profiler import profiler
+from hzdev_stages import ExtractionStages
+from hzdev_translation_memory import TranslationMemory
+from hzdev_variants import DISPLAY_NAME_BYTES, findDisplayName, spliceDisplayName
+from dataModel import ParatranzDataUnit, JobFilter, LanguageTarget, ProjectPaths, ProjectJob, DEFAULT_PROJECT_PATHS
+
+if TYPE_CHECKING:
+    from hzdev_csv_paratranz import csvSubParatranz
+    from hzdev_journal import RunJournal
+
+# 解析后端与 pprint 只在第一次使用时导入，以缩短命令行与监视模式的启动时间
+json5 = LazyModule('json5')
+hjson = LazyModule('hjson')
+pprint = LazyModule('pprint')
 
 class RegisterEnum(Enum):
     """
@@ -36,10 +48,71 @@ class RegisterEnum(Enum):
     all: str = 'Everything'
 
 
+class DispatchTable:
+    """
+    按注册分类整理好的处理器配置，并为路径、目录与扩展名建立了索引，分派时不必逐个遍历处理器。
+
+    同一个处理器类在同一组处理器过滤条件下只编译一次，多个项目实例（比如批量处理多个 mod 时）共享同一份分派表。
+    """
+    __cache: Dict[tuple, 'DispatchTable'] = {}
+
+    def __init__(self, config: List[dict], jobFilter: JobFilter):
+        self.missionProgram = {}
+        self.pathIndex: Dict[str, List[dict]] = {}
+        self.folderIndex: Dict[str, List[dict]] = {}  # 目录末尾的'/'已去除
+        self.extIndex: Dict[str, List[dict]] = {}
+        self.folderExtPrograms: List[dict] = []
+        self.allPrograms: List[dict] = []
+        for program in config:
+            if isinstance(program, dict) and program.get('Register') == RegisterEnum.mission and len(
+                    self.missionProgram) == 0:
+                if jobFilter.matchHandler('missions', program.get('FromMission'), program.get('ToMission')):
+                    self.missionProgram = program
+            elif isinstance(program, dict) and not jobFilter.matchHandler(program.get('FromOriginal'),
+                                                                          program.get('ToLocalization')):
+                continue  # 未被选中的处理器不参与分派
+            elif isinstance(program, dict) and 'FromOriginal' in program and 'ToLocalization' in program:
+                tVar = program.get('Register')
+                if tVar == RegisterEnum.path and isinstance(program.get('Path'), list):
+                    for filePath in program.get('Path'):
+                        self.__addIndex(self.pathIndex, filePath, program)
+                elif tVar == RegisterEnum.folder and isinstance(program.get('Folder'), list):
+                    for folderPath in program.get('Folder'):
+                        self.__addIndex(self.folderIndex, folderPath[:-1] if folderPath.endswith('/') else folderPath,
+                                        program)
+                elif tVar == RegisterEnum.ext and isinstance(program.get('Ext'), list):
+                    for fileExt in program.get('Ext'):
+                        self.__addIndex(self.extIndex, fileExt, program)
+                elif tVar == RegisterEnum.folder_ext and isinstance(program.get('Folder_Ext'), list):
+                    self.folderExtPrograms.append(program)
+                elif tVar == RegisterEnum.all:
+                    self.allPrograms.append(program)
+
+    @staticmethod
+    def __addIndex(index: Dict[str, List[dict]], key: str, program: dict):
+        programs = index.setdefault(key, [])
+        if program not in programs:
+            programs.append(program)
+
+    @classmethod
+    def compile(cls, projectClass: type, config: List[dict], jobFilter: JobFilter):
+        """获取（必要时编译）指定处理器类在该过滤条件下的分派表。"""
+        cacheKey = (projectClass, frozenset(jobFilter.handlers), frozenset(jobFilter.csvConfigs))
+        table = cls.__cache.get(cacheKey)
+        if table is None:
+            table = cls.__cache[cacheKey] = cls(config, jobFilter)
+        return table
+
+
 class ParatranzProject:
+    __configCache: Dict[type, List[dict]] = {}  # 处理器类 -> 已导入的配置，同一个类只导入一次
 
-    def __init__(self):
+    def __init__(self, jobFilter: JobFilter = None, projectPaths: ProjectPaths = None, unitIO=None):
         """
+        :param jobFilter: 任务过滤器，只处理被选中的文件、处理器与 CSV 配置。不指定则处理全部内容。
+        :param projectPaths: 项目目录配置，不指定则使用默认目录（`DEFAULT_PROJECT_PATHS`）。
+        :param unitIO: 中间文件的读写方式，不指定则使用 JSON 文件（`ParatranzFileIO`），也可以使用 `SQLiteUnitStore`。
+
         配置文件注册方法：
             关键字 "Register": str
                 "mission" - 该程序集专一处理mission部分的文件。
@@ -69,40 +142,102 @@ class ParatranzProject:
                 仅当关键字为 "mission" 时有效，将descriptor.json和mission_text.txt内容合并并写入Paratranz格式的翻译文件。
             关键字 "ToMission": str -> func(descriptor.json原文文件路径，mission_text.txt原文文件路径，paratranz输出文件路径,descriptor.json译文文件路径，mission_text.txt译文文件路径)
                 仅当关键字为 "mission" 时有效，将翻译好的文件写回原文件。
+            关键字 "KeyPaths": List[KeyPath] | KeyPathSpec
+                声明式的键路径（见 `hzdev_keypath`），指定后由 `ExtractKeyPaths` / `WritebackKeyPaths` 处理文件，
+                此时 "FromOriginal" 与 "ToLocalization" 只作为处理器的名称，不必是已有的函数。
+            关键字 "Loader": str
+                与 "KeyPaths" 一同使用，原文文件的解析方式，默认为 'json5'。
         """
-        self.__originalFilePaths = self.__scanSpecialPath(ORIGINAL_PATH)  # 相对路径存储
-        self.__paratranzOutputPaths = self.__scanSpecialPath(PARA_TRANZ_PATH)
-        self.__localizationOutputPaths = self.__scanSpecialPath(TRANSLATION_PATH)
-        self.__config: List[dict] = []
-        self.ImportConfig()  # 注册配置文件
-        self.__missionProgram = {}
-        self.__pathProgram: List[dict] = []
-        self.__extProgram: List[dict] = []
-        self.__folderProgram: List[dict] = []
-        self.__folder_ext_Program: List[dict] = []
-        self.__allProgram: List[dict] = []
-        self.__filterConfig()
+        self.__jobFilter = jobFilter if jobFilter is not None else JobFilter()
+        self.__paths = projectPaths if projectPaths is not None else DEFAULT_PROJECT_PATHS
+        self.__unitIO = unitIO if unitIO is not None else ParatranzFileIO(self.__paths.paratranzPath)
+        self.__stages = ExtractionStages()
+        self.__glossary = None
+        self.__glossaryLoaded = False
+        self.__glossaryStamp = None
+        self.__glossaryLock = threading.Lock()
+        self.__csvWorker = None  # 以下三项在第一次使用时才建立，只处理个别文件时不必扫描整个目录
+        self.__originalFilePathsCache: List[str] | None = None
+        self.__paratranzOutputPathsCache: set | None = None
+        self.__config: List[dict] = self.__configCache.get(type(self))
+        if self.__config is None:
+            self.__config = []
+            self.ImportConfig()  # 注册配置文件
+            self.__configCache[type(self)] = self.__config
+        self.__dispatch = DispatchTable.compile(type(self), self.__config, self.__jobFilter)
+        self.__missionProgram = self.__dispatch.missionProgram
 
     def ImportConfig(self):
         raise NotImplementedError
 
-    def __filterConfig(self):
-        for program in self.__config:
-            if isinstance(program, dict) and program.get('Register') == RegisterEnum.mission and len(
-                    self.__missionProgram) == 0:
-                self.__missionProgram = program
-            elif isinstance(program, dict) and 'FromOriginal' in program and 'ToLocalization' in program:
-                tVar = program.get('Register')
-                if tVar == RegisterEnum.path and isinstance(program.get('Path'), list):
-                    self.__pathProgram.append(program)
-                elif tVar == RegisterEnum.folder and isinstance(program.get('Folder'), list):
-                    self.__folderProgram.append(program)
-                elif tVar == RegisterEnum.ext and isinstance(program.get('Ext'), list):
-                    self.__extProgram.append(program)
-                elif tVar == RegisterEnum.folder_ext and isinstance(program.get('Folder_Ext'), list):
-                    self.__folder_ext_Program.append(program)
-                elif tVar == RegisterEnum.all:
-                    self.__allProgram.append(program)
+    def ExtractKeyPaths(self, keyPathSpec: KeyPathSpec, *args):
+        """以声明式的键路径提取文件，参数与 "FromOriginal" 处理器相同。"""
+        raise NotImplementedError
+
+    def WritebackKeyPaths(self, keyPathSpec: KeyPathSpec, *args):
+        """以声明式的键路径写回文件，参数与 "ToLocalization" 处理器相同。"""
+        raise NotImplementedError
+
+    @property
+    def Paths(self) -> ProjectPaths:
+        """本项目使用的目录配置。"""
+        return self.__paths
+
+    @property
+    def CSVWorker(self) -> 'csvSubParatranz':
+        """本项目的 CSV 处理器，可以通过它调整 CSV 的处理方式（比如 `PatchWriteback`）。"""
+        if self.__csvWorker is None:
+            from hzdev_csv_paratranz import csvSubParatranz
+
+            self.__csvWorker = csvSubParatranz(self.__paths, self.__stages, self.__unitIO)
+        return self.__csvWorker
+
+    @property
+    def __originalFilePaths(self) -> List[str]:
+        """原文目录中所有被选中的文件（以'/'开头的相对路径）。"""
+        if self.__originalFilePathsCache is None:
+            self.__originalFilePathsCache = self.__scanSpecialPath(self.__paths.originalPath, self.__jobFilter, True)
+        return self.__originalFilePathsCache
+
+    @property
+    def __paratranzOutputPaths(self) -> set:
+        """已有的中间文件（以'/'开头的相对路径）。"""
+        if self.__paratranzOutputPathsCache is None:
+            self.__paratranzOutputPathsCache = set(self.__unitIO.listFiles(self.__jobFilter))
+        return self.__paratranzOutputPathsCache
+
+    def InvalidateCaches(self, originals: bool = True, outputs: bool = True):
+        """
+        丢弃目录扫描的结果，下次构建任务时重新扫描。长时间运行（比如服务模式）期间原文或中间文件有增删时调用。
+
+        :param originals: 丢弃原文文件列表。
+        :param outputs: 丢弃已有的中间文件列表，提取产生了新的中间文件之后需要丢弃。
+        """
+        if originals:
+            self.__originalFilePathsCache = None
+        if outputs:
+            self.__paratranzOutputPathsCache = None
+
+    @property
+    def UnitIO(self):
+        """本项目中间文件的读写方式。"""
+        return self.__unitIO
+
+    @property
+    def Stages(self) -> ExtractionStages:
+        """本项目的提取阶段处理器注册表。"""
+        return self.__stages
+
+    def UseTranslationMemory(self, memory: TranslationMemory, includeOwnFiles: bool = True):
+        """
+        提取时使用翻译记忆库为原文完全相同的词条预填译文。多个项目可以共享同一个记忆库。
+
+        :param memory: 翻译记忆库。
+        :param includeOwnFiles: 是否把本项目现有的中间文件加入记忆库。必须在提取覆盖这些文件之前加入，因此会立即加载。
+        """
+        if includeOwnFiles:
+            memory.addSource(self.__paths.paratranzPath)
+        memory.install(self.__stages)
 
     def Start(self):
         print('Paratranz 项目助手',
@@ -112,35 +247,229 @@ class ParatranzProject:
               sep='\n')
         userSelect = input('请输入您的选择：').strip()
         if userSelect == '1':
-            for originalFile in self.__originalFilePaths:
-                if self.__dealWithPath(originalFile) or self.__dealWithFolder(originalFile) or \
-                        self.__dealWithExt(originalFile) or self.__dealWithFolderAndExt(originalFile) or \
-                        self.__dealWithAll(originalFile):
-                    print(f'已从 {originalFile} 提取可翻译文本。')
-                    continue
-                print(f'已略过：{originalFile}')
-            self.__dealWithMission()
-            self.__dealWithVariants()
-            csvSubParatranz.OriginalToParatranz()
-            print('翻译文件解析完毕。')
+            self.ExtractAll()
         elif userSelect == '2':
-            for paratranzFile in self.__originalFilePaths:
-                if not self.__changeExt(paratranzFile, 'json') in self.__paratranzOutputPaths:
-                    continue
-                if self.__dealWithPath(paratranzFile, True) or self.__dealWithFolder(paratranzFile, True) or \
-                        self.__dealWithExt(paratranzFile, True) or self.__dealWithFolderAndExt(paratranzFile, True) or \
-                        self.__dealWithAll(paratranzFile, True):
-                    print(f'已从 {paratranzFile} 整合了译文，并写回了对应文件。')
-                    continue
-            self.__dealWithMission(True)
-            self.__dealWithVariants(True)
-            csvSubParatranz.ParatranzToLocalization()
-            print('译文文件解析完毕。')
+            self.WritebackAll()
+
+    def ExtractAll(self, pipeline: StagedPipeline = None, journal: 'RunJournal' = None):
+        """
+        从原始文件中导出全部 Paratranz 词条。
+
+        :param pipeline: 以流水线并发执行任务（读取、处理与写入互相重叠），不指定则依次执行。
+        :param journal: 运行日志，指定后失败的任务不会中断运行，并且可以从上次中断的位置继续。
+        """
+        outputWriter.reset()
+        self.__runJobs(self.BuildJobs(), pipeline, journal)
+        print('翻译文件解析完毕。')
+        outputWriter.report()
+        profiler.report()
+
+    def WritebackAll(self, pipeline: StagedPipeline = None, journal: 'RunJournal' = None,
+                     languages: List['SubParatranz'] = ()):
+        """
+        将全部 Paratranz 词条写回汉化文件。
+
+        :param pipeline: 以流水线并发执行任务（读取、处理与写入互相重叠），不指定则依次执行。
+        :param journal: 运行日志，指定后失败的任务不会中断运行，并且可以从上次中断的位置继续。
+        :param languages: 同时写回的其它目标语言（原文目录相同、中间文件与汉化目录不同的项目，见 `ForLanguage`）。
+            每个原文文件（或 CSV 配置）的各语言写回合并为一个任务：原文只读取、解析一次，各语言在解析结果的副本上写回。
+        """
+        jobs = self.BuildJobs(True)
+        useParseCache = len(languages) > 0 and not parseCache.enabled
+        if len(languages) > 0:
+            jobs = self.__mergeLanguageJobs([jobs] + [x.BuildJobs(True) for x in languages])
+        if useParseCache:
+            parseCache.enable()
+        outputWriter.reset()
+        try:
+            self.__runJobs(jobs, pipeline, journal)
+        finally:
+            if useParseCache:
+                parseCache.disable()
+                parseCache.clear()
+        print('译文文件解析完毕。' if len(languages) == 0 else f'{len(languages) + 1} 种语言的译文文件解析完毕。')
+        outputWriter.report()
+        profiler.report()
+
+    def ForLanguage(self, target: LanguageTarget, unitIO=None) -> 'SubParatranz':
+        """
+        建立另一种目标语言的项目：原文目录、任务过滤器与本项目相同，中间文件与汉化目录使用 target 中的路径。
+
+        :param target: 目标语言。
+        :param unitIO: 该语言中间文件的读写方式，不指定则使用 JSON 中间文件。
+        """
+        return type(self)(self.__jobFilter, target.projectPaths(self.__paths.originalPath), unitIO)
+
+    @staticmethod
+    def __mergeLanguageJobs(jobLists: List[List[ProjectJob]]) -> List[ProjectJob]:
+        """把各语言中同名的任务（同一个原文文件、战役、装配或 CSV 配置）合并为一个依次写回各语言的任务。"""
+        grouped: Dict[str, List[ProjectJob]] = {}
+        for jobs in jobLists:
+            for job in jobs:
+                grouped.setdefault(job.name, []).append(job)
+
+        def runGroup(group: List[ProjectJob], inputs: Tuple[str, ...]) -> bool:
+            handled = False
+            with sharedSources(inputs):
+                for job in group:
+                    handled = bool(job.func()) or handled
+            return handled
+
+        result = []
+        for jobName, group in grouped.items():
+            inputs = tuple(dict.fromkeys(filePath for job in group for filePath in job.inputs))
+            result.append(ProjectJob(jobName, partial(runGroup, group, inputs), inputs))
+        return result
+
+    @staticmethod
+    def __runJobs(jobs: List[ProjectJob], pipeline: StagedPipeline = None, journal: 'RunJournal' = None):
+        if journal is not None:
+            jobs = journal.wrap(jobs)
+        try:
+            if pipeline is not None:
+                pipeline.run(jobs)
+                return
+            for job in jobs:
+                job.func()
+        finally:
+            if journal is not None:
+                journal.finish()
+                journal.report()
+
+    def BuildJobs(self, isWriteback: bool = False, loadGlossary: bool = True) -> List[ProjectJob]:
+        """
+        把一次完整的提取（或写回）拆分成互相独立的任务：每个原文文件、战役、装配与每个 CSV 配置各是一个任务。
+        任务之间没有先后依赖，可以按任意顺序或并发执行。提取时会先加载本项目的术语表。
+
+        :param isWriteback: 是否构建写回任务。
+        :param loadGlossary: 提取时是否检查并加载术语表；自行管理术语表（见 `ReloadGlossary`）的调用方可以关闭。
+        """
+        if not isWriteback and loadGlossary:
+            self.__installGlossary()
+        jobs = []
+        for relativePath in self.__originalFilePaths:
+            if isWriteback and self.__changeExt(relativePath, 'json') not in self.__paratranzOutputPaths:
+                continue
+            jobs.append(ProjectJob(relativePath, partial(self.__runFileJob, relativePath, isWriteback),
+                                   self.__fileJobInputs(relativePath, isWriteback)))
+        if len(self.__missionProgram) > 0 and self.__jobFilter.mayContain('data/missions'):
+            jobs.append(ProjectJob('missions', partial(self.__runPassJob, 'missions', self.__dealWithMission,
+                                                       isWriteback)))
+        if self.__isVariantsSelected():
+            jobs.append(ProjectJob('variants', partial(self.__runPassJob, 'variants', self.__dealWithVariants,
+                                                       isWriteback)))
+        jobs += self.CSVWorker.BuildJobs(not isWriteback, self.__jobFilter)
+        return jobs
+
+    def __fileJobInputs(self, relativePath: str, isWriteback: bool) -> Tuple[str, ...]:
+        """文件任务会读取的文件：原文文件，写回时还有对应的中间文件。路径与 `__runProgram` 传给处理器的完全相同。"""
+        realFilePath = relativePath.replace('/', sep)
+        if not isWriteback:
+            return self.__paths.originalPath + realFilePath,
+        return (self.__paths.originalPath + realFilePath,
+                self.__changeExt(self.__paths.paratranzPath + realFilePath, 'json'))
+
+    def ReloadGlossary(self):
+        """重新加载术语表，并以一次替换换下之前注册的术语表，正在执行的提取任务不受影响。"""
+        self.__installGlossary(True)
+
+    def __installGlossary(self, forceReload: bool = False):
+        """加载术语表并注册为提取阶段处理器；术语文件自上次加载以来没有变化（包括一直不存在）时不重复加载。"""
+        with self.__glossaryLock:
+            glossaryStamp = self.__fileStamp(self.__paths.glossaryPath)
+            if not forceReload and self.__glossaryLoaded and glossaryStamp == self.__glossaryStamp:
+                return
+            self.__glossary = GlossaryAnnotator.install(self.__paths.glossaryPath, self.__stages, self.__glossary)
+            self.__glossaryLoaded, self.__glossaryStamp = True, glossaryStamp
+
+    @staticmethod
+    def __fileStamp(filePath: str) -> Tuple[int, int] | None:
+        try:
+            fileStat = stat(filePath)
+        except OSError:
+            return None
+        return fileStat.st_mtime_ns, fileStat.st_size
+
+    def __runFileJob(self, relativePath: str, isWriteback: bool) -> bool:
+        if self.__dispatchFile(relativePath, isWriteback):
+            if isWriteback:
+                print(f'已从 {relativePath} 整合了译文，并写回了对应文件。')
+            else:
+                print(f'已从 {relativePath} 提取可翻译文本。')
+            return True
+        if not isWriteback:
+            print(f'已略过：{relativePath}')
+        return False
+
+    def __runPassJob(self, passName: str, passFunc, isWriteback: bool) -> bool:
+        with profiler.job(passName, 'pass', sep.join([self.__paths.originalPath, 'data', passName])):
+            passFunc(isWriteback)
+        return True
+
+    def __dispatchFile(self, relativePath: str, funcID: bool = False) -> bool:
+        return self.__dealWithPath(relativePath, funcID) or self.__dealWithFolder(relativePath, funcID) or \
+            self.__dealWithExt(relativePath, funcID) or self.__dealWithFolderAndExt(relativePath, funcID) or \
+            self.__dealWithAll(relativePath, funcID)
+
+    def ExtractFiles(self, relativePaths: Iterable[str]):
+        """
+        只重新提取指定的原文文件，用于监视模式等增量场景。处理器与 CSV 配置在多次调用之间保持不变，
+        术语表在第一次调用时加载，此后只在术语文件变化时重新加载。
+        已被删除或移走的原文文件，其对应的中间文件（包括分片）会一并删除。
+
+        :param relativePaths: 相对于原文目录、以'/'分隔的路径。
+        """
+        self.__installGlossary()
+        variantsChanged = False
+        missionFolders = set()
+        for relativePath in relativePaths:
+            relativePath = '/' + relativePath.replace(sep, '/').lstrip('/')
+            if not self.__jobFilter.matchPath(relativePath):
+                continue
+            isMissing = not isfile(self.__paths.originalPath + relativePath.replace('/', sep))
+            if relativePath.startswith('/data/variants/') and relativePath.endswith('.variant'):
+                variantsChanged = True
+            elif relativePath.startswith('/data/missions/') and relativePath.count('/') == 4:
+                missionFolders.add(relativePath.split('/')[3])
+            elif isMissing:
+                self.__removeIntermediate(relativePath)
+            elif self.__dispatchFile(relativePath):
+                print(f'已从 {relativePath} 提取可翻译文本。')
+            elif not self.CSVWorker.ExtractFile(relativePath):
+                print(f'已略过：{relativePath}')
+        for missionFolder in sorted(missionFolders):
+            missionPath = sep.join([self.__paths.originalPath, 'data', 'missions', missionFolder])
+            if isfile(sep.join([missionPath, 'descriptor.json'])) and isfile(sep.join([missionPath, 'mission_text.txt'])):
+                self.__dealWithMission(onlyFolder=missionFolder)
+                print(f'已从战役 {missionFolder} 提取可翻译文本。')
+            elif self.__unitIO.remove(sep.join([self.__paths.paratranzPath, 'data', 'missions', missionFolder + '.json'])):
+                print(f'战役 {missionFolder} 的原文文件已不完整，已删除其中间文件。')
+        if variantsChanged and self.__isVariantsSelected():
+            self.__dealWithVariants()
+
+    def __removeIntermediate(self, relativePath: str):
+        """原文文件已被删除或移走时，删除其对应的中间文件；同目录下仍有同名（扩展名不同）的原文文件时保留。"""
+        paratranzFilePath = self.CSVWorker.ParatranzFilePath(relativePath)
+        if paratranzFilePath is None:
+            realFilePath = self.__paths.originalPath + relativePath.replace('/', sep)
+            folderPath, _, fileName = realFilePath.rpartition(sep)
+            baseName = fileName.rpartition('.')[0] or fileName
+            if isdir(folderPath) and any(x.is_file() and (x.name.rpartition('.')[0] or x.name) == baseName
+                                         for x in scandir(folderPath)):
+                return
+            paratranzFilePath = self.__changeExt(self.__paths.paratranzPath + relativePath.replace('/', sep), 'json')
+        if self.__unitIO.remove(paratranzFilePath):
+            self.__paratranzOutputPathsCache = None
+            print(f'原文文件 {relativePath} 已不存在，已删除对应的中间文件。')
+
+    def __isVariantsSelected(self) -> bool:
+        """装配数据汇总在同一个中间文件中，因此只要选中了装配目录就处理全部装配文件，以免中间文件被部分覆盖。"""
+        return self.__jobFilter.matchHandler('variants') and self.__jobFilter.mayContain('data/variants')
 
     def __dealWithVariants(self, funcID: bool = False):
         """装配名称归一化处理器，此函数不是外包函数，而会自主处理所有装配代码。"""
-        originalPath = sep.join([ORIGINAL_PATH, 'data', 'variants'])
-        targetParatranzFile = sep.join([PARA_TRANZ_PATH, 'data', 'variants', 'index.json'])
+        originalPath = sep.join([self.__paths.originalPath, 'data', 'variants'])
+        targetParatranzFile = sep.join([self.__paths.paratranzPath, 'data', 'variants', 'index.json'])
         if not funcID:  # 翻译
             result = []
             for folderPath, _ , fileNames in walk(originalPath):
@@ -149,40 +478,82 @@ class ParatranzProject:
                         # 构造真实路径
                         realFilePath = sep.join([folderPath, fileName])
                         paratranzWordKey = realFilePath.rpartition(originalPath)[-1]
-                        with open(realFilePath, 'r', encoding='utf-8') as f:
-                            jsonData = json5.loads(SubParatranz.filterJSON5(f.read()))
-                            if 'displayName' in jsonData:
-                                result.append(ParatranzDataUnit(paratranzWordKey, jsonData['displayName'],
-                                                                f'[本行原始数据]\n{pprint.pformat(jsonData, sort_dicts=False)}'))
+                        unit = self.__extractVariant(realFilePath, paratranzWordKey)
+                        if unit is not None:
+                            result.append(unit)
+            self.__stages.apply(targetParatranzFile, result)
+            profiler.addUnits(len(result))
             self.__makeDirs(targetParatranzFile)
-            with open(targetParatranzFile, 'w', encoding='UTF-8') as tFile:
-                json.dump([x.asDict() for x in result], tFile, ensure_ascii=False, indent=4)
+            self.__unitIO.write(targetParatranzFile, result)
         else:  # 写回
-            outputBaseFolder = sep.join([TRANSLATION_PATH, 'data', 'variants'])
-            if not isfile(targetParatranzFile):
+            outputBaseFolder = sep.join([self.__paths.translationPath, 'data', 'variants'])
+            if not self.__unitIO.exists(targetParatranzFile):
                 print('未发现装配数据文件。')
                 return
-            with open(targetParatranzFile, encoding='UTF-8') as tFile:
-                result = [ParatranzDataUnit(**dataDict) for dataDict in json.load(tFile)]
-            for line in result:
-                if line.isTranslated:
-                    with open(sep.join([originalPath, line.key]), encoding='UTF-8') as f1:
-                        jsonData = json5.loads(SubParatranz.filterJSON5(f1.read()))
-                        jsonData['displayName'] = line.translation
-                        # 写回目标路径
-                        targetTranslationPath = sep.join([outputBaseFolder, line.key])
-                        self.__makeDirs(targetTranslationPath)
-                        with open(targetTranslationPath, 'w', encoding='UTF-8') as f2:
-                            json.dump(jsonData, f2, ensure_ascii=False, indent=4)
+            result = {x.key: x for x in self.__unitIO.read(targetParatranzFile, True)}  # 每个装配文件只写回一次
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor() as pool:
+                for _ in pool.map(partial(self.__writebackVariant, originalPath, outputBaseFolder), result.values()):
+                    pass
         print(f'已处理了 {len(result)} 条装配数据。')
 
-    def __dealWithMission(self, funcID: bool = False):
-        """战役系统处理器"""
-        if isdir(sep.join([ORIGINAL_PATH, 'data', 'missions'])):
-            for firstFolder in scandir(sep.join([ORIGINAL_PATH, 'data', 'missions'])):
+    @staticmethod
+    def __extractVariant(realFilePath: str, paratranzWordKey: str) -> ParatranzDataUnit | None:
+        """
+        提取一个装配文件的名称。先以字节搜索跳过没有 displayName 的文件，再直接定位 displayName 的值，
+        只有无法直接定位时才完整解析文件。
+        """
+        with profiler.phase('read'):
+            with open(realFilePath, 'rb') as f:
+                rawContent = f.read()
+        if DISPLAY_NAME_BYTES not in rawContent:
+            return None
+        fileContent = rawContent.decode('UTF-8').replace('\r\n', '\n')
+        span = findDisplayName(fileContent)
+        if span is not None:
+            displayName = span.value
+        else:
+            jsonData = SubParatranz.loadJSON5(SubParatranz.filterJSON5(fileContent))
+            if 'displayName' not in jsonData:
+                return None
+            displayName = jsonData['displayName']
+        return ParatranzDataUnit(paratranzWordKey, displayName, f'[本行原始数据]\n{fileContent.strip()}')
+
+    def __writebackVariant(self, originalPath: str, outputBaseFolder: str, unit: ParatranzDataUnit):
+        """把译文替换到装配文件原文的 displayName 处，其余内容保持原样；无法直接定位时完整解析后重新输出。"""
+        with open(sep.join([originalPath, unit.key]), 'rb') as f:
+            fileContent = f.read().decode('UTF-8')
+        targetTranslationPath = sep.join([outputBaseFolder, unit.key])
+        self.__makeDirs(targetTranslationPath)
+        span = findDisplayName(fileContent)
+        if span is not None:
+            outputWriter.writeText(targetTranslationPath, spliceDisplayName(fileContent, span, unit.translation),
+                                   newline='')
+            return
+        jsonData = SubParatranz.loadJSON5(SubParatranz.filterJSON5(fileContent))
+        jsonData['displayName'] = unit.translation
+        outputWriter.writeText(targetTranslationPath, dumpsJSON5(jsonData, trailingCommas=False))
+
+    def __dealWithMission(self, funcID: bool = False, onlyFolder: str = None):
+        """
+        战役系统处理器
+
+        :param onlyFolder: 只处理指定名称的战役目录。
+        """
+        if len(self.__missionProgram) == 0 or not self.__jobFilter.mayContain('data/missions'):
+            return
+        originalPath, translationPath = self.__paths.originalPath, self.__paths.translationPath
+        if isdir(sep.join([originalPath, 'data', 'missions'])):
+            for firstFolder in scandir(sep.join([originalPath, 'data', 'missions'])):
                 assert isinstance(firstFolder, DirEntry)
-                if firstFolder.is_dir():
-                    paratranzFileName = sep.join([PARA_TRANZ_PATH, 'data', 'missions', firstFolder.name + '.json'])
+                if onlyFolder is not None and firstFolder.name != onlyFolder:
+                    continue
+                if firstFolder.is_dir() and (
+                        self.__jobFilter.matchPath(f'data/missions/{firstFolder.name}/descriptor.json') or
+                        self.__jobFilter.matchPath(f'data/missions/{firstFolder.name}/mission_text.txt')):
+                    paratranzFileName = sep.join([self.__paths.paratranzPath, 'data', 'missions',
+                                                  firstFolder.name + '.json'])
                     descriptorJSON = ''
                     missionTextTXT = ''
                     for secondFile in scandir(firstFolder.path):
@@ -198,138 +569,89 @@ class ParatranzProject:
                             self.__executeFunc(self.__missionProgram.get('FromMission'), descriptorJSON, missionTextTXT,
                                                paratranzFileName)
                         else:
-                            self.__makeDirs(descriptorJSON.replace(ORIGINAL_PATH, TRANSLATION_PATH))
-                            if isfile(paratranzFileName):
+                            self.__makeDirs(descriptorJSON.replace(originalPath, translationPath))
+                            if self.__unitIO.exists(paratranzFileName):
                                 self.__executeFunc(self.__missionProgram.get('ToMission'), descriptorJSON,
                                                    missionTextTXT, paratranzFileName,
-                                                   descriptorJSON.replace(ORIGINAL_PATH, TRANSLATION_PATH),
-                                                   missionTextTXT.replace(ORIGINAL_PATH, TRANSLATION_PATH))
+                                                   descriptorJSON.replace(originalPath, translationPath),
+                                                   missionTextTXT.replace(originalPath, translationPath))
+
+    def __runProgram(self, program: dict, realFilePath: str, funcID: bool):
+        """以原文文件的相对路径（已转换为本地分隔符）执行处理器的提取或写回函数。"""
+        paratranzFilePath = self.__changeExt(self.__paths.paratranzPath + realFilePath, 'json')
+        keyPathSpec = program.get('KeyPaths')
+        if not funcID:  # 翻译
+            self.__makeDirs(self.__paths.paratranzPath + realFilePath)
+            callbackFunc = partial(self.ExtractKeyPaths, keyPathSpec) if keyPathSpec is not None else None
+            return self.__executeFunc(program.get('FromOriginal'), self.__paths.originalPath + realFilePath,
+                                      paratranzFilePath, callbackFunc=callbackFunc)
+        # 写回
+        self.__makeDirs(self.__paths.translationPath + realFilePath)
+        callbackFunc = partial(self.WritebackKeyPaths, keyPathSpec) if keyPathSpec is not None else None
+        return self.__executeFunc(program.get('ToLocalization'), self.__paths.originalPath + realFilePath,
+                                  paratranzFilePath, self.__paths.translationPath + realFilePath,
+                                  callbackFunc=callbackFunc)
 
     def __dealWithPath(self, filePath: str, funcID: bool = False):
-        if len(self.__pathProgram) == 0:
-            return False
         # 路径处理器
         realFilePath = filePath.replace('/', sep)
-        if not funcID:  # 翻译
-            for program in self.__pathProgram:
-                if filePath in program.get('Path'):
-                    self.__makeDirs(PARA_TRANZ_PATH + realFilePath)
-                    if self.__executeFunc(program.get('FromOriginal'), ORIGINAL_PATH + realFilePath,
-                                          self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json')):
-                        return True # 广播拦截
-        else:  # 写回
-            for program in self.__pathProgram:
-                if filePath in program.get('Path'):
-                    self.__makeDirs(TRANSLATION_PATH + realFilePath)
-                    if self.__executeFunc(program.get('ToLocalization'), ORIGINAL_PATH + realFilePath,
-                                          self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json'),
-                                          TRANSLATION_PATH + realFilePath):
-                        return True  # 广播拦截
+        for program in self.__dispatch.pathIndex.get(filePath, ()):
+            if self.__runProgram(program, realFilePath, funcID):
+                return True  # 广播拦截
         return False
 
     def __dealWithFolder(self, filePath: str, funcID: bool = False):
-        if len(self.__folderProgram) == 0:
-            return False
         # 目录处理器
         realFilePath = filePath.replace('/', sep)
         folderPath = filePath.rpartition('/')[0]
-        if not funcID:  # 翻译
-            for program in self.__folderProgram:
-                if folderPath in program.get('Folder') or f'{folderPath}/' in program.get('Folder'):
-                    self.__makeDirs(PARA_TRANZ_PATH + realFilePath)
-                    if self.__executeFunc(program.get('FromOriginal'), ORIGINAL_PATH + realFilePath,
-                                          self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json')):
-                        return True  # 广播拦截
-        else:  # 写回
-            for program in self.__folderProgram:
-                if folderPath in program.get('Folder') or f'{folderPath}/' in program.get('Folder'):
-                    self.__makeDirs(TRANSLATION_PATH + realFilePath)
-                    if self.__executeFunc(program.get('ToLocalization'), ORIGINAL_PATH + realFilePath,
-                                          self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json'),
-                                          TRANSLATION_PATH + realFilePath):
-                        return True  # 广播拦截
+        for program in self.__dispatch.folderIndex.get(folderPath, ()):
+            if self.__runProgram(program, realFilePath, funcID):
+                return True  # 广播拦截
         return False
 
     def __dealWithExt(self, filePath: str, funcID: bool = False):
-        if len(self.__extProgram) == 0:
-            return False
         # 扩展名处理器
         realFilePath = filePath.replace('/', sep)
         fileExt = filePath.rpartition('/')[2].rpartition('.')[2]
-        if not funcID:  # 翻译
-            for program in self.__extProgram:
-                if fileExt.lower() in program.get('Ext'):
-                    self.__makeDirs(PARA_TRANZ_PATH + realFilePath)
-                    if self.__executeFunc(program.get('FromOriginal'), ORIGINAL_PATH + realFilePath,
-                                          self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json')):
-                        return True  # 广播拦截
-        else:  # 写回
-            for program in self.__extProgram:
-                if fileExt.lower() in program.get('Ext'):
-                    self.__makeDirs(TRANSLATION_PATH + realFilePath)
-                    if self.__executeFunc(program.get('ToLocalization'), ORIGINAL_PATH + realFilePath,
-                                          self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json'),
-                                          TRANSLATION_PATH + realFilePath):
-                        return True  # 广播拦截
+        for program in self.__dispatch.extIndex.get(fileExt.lower(), ()):
+            if self.__runProgram(program, realFilePath, funcID):
+                return True  # 广播拦截
         return False
 
     def __dealWithFolderAndExt(self, filePath: str, funcID: bool = False):
-        if len(self.__folder_ext_Program) == 0:
+        if len(self.__dispatch.folderExtPrograms) == 0:
             return False
         # 目录 + 扩展名 联合处理器
         realFilePath = filePath.replace('/', sep)
         fileExt = filePath.rpartition('/')[2].rpartition('.')[2]
         folderPath = filePath.rpartition('/')[0] + '/'
-        if not funcID:  # 翻译
-            for program in self.__folder_ext_Program:
-                for tFolderPath, tExt in program.get('Folder_Ext'):
-                    if tExt.lower() == fileExt.lower():
-                        # 250104：为翻译装配文件的名称，因此允许额外扩展其子目录数据，但是需要特殊标志才会进行扩展
-                        if folderPath == tFolderPath or (
-                                program.get('ExtendSubFolder') and folderPath.startswith(tFolderPath)):
-                            self.__makeDirs(PARA_TRANZ_PATH + realFilePath)
-                            self.__executeFunc(program.get('FromOriginal'), ORIGINAL_PATH + realFilePath,
-                                               self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json'))
-                            return True
-        else:  # 写回
-            for program in self.__folder_ext_Program:
-                for tFolderPath, tExt in program.get('Folder_Ext'):
-                    if tExt.lower() == fileExt.lower():
-                        if folderPath == tFolderPath or (
-                                program.get('ExtendSubFolder') and folderPath.startswith(tFolderPath)):
-                            self.__makeDirs(TRANSLATION_PATH + realFilePath)
-                            self.__executeFunc(program.get('ToLocalization'), ORIGINAL_PATH + realFilePath,
-                                               self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json'),
-                                               TRANSLATION_PATH + realFilePath)
-                            return True
+        for program in self.__dispatch.folderExtPrograms:
+            for tFolderPath, tExt in program.get('Folder_Ext'):
+                if tExt.lower() == fileExt.lower():
+                    # 250104：为翻译装配文件的名称，因此允许额外扩展其子目录数据，但是需要特殊标志才会进行扩展
+                    if folderPath == tFolderPath or (
+                            program.get('ExtendSubFolder') and folderPath.startswith(tFolderPath)):
+                        self.__runProgram(program, realFilePath, funcID)
+                        return True
         return False
 
     def __dealWithAll(self, filePath: str, funcID: bool = False):
-        if len(self.__allProgram) == 0:
-            return False
         # 默认处理器，一般用不到
         realFilePath = filePath.replace('/', sep)
-        if not funcID:  # 翻译
-            for program in self.__allProgram:
-                self.__makeDirs(PARA_TRANZ_PATH + realFilePath)
-                if self.__executeFunc(program.get('FromOriginal'), ORIGINAL_PATH + realFilePath,
-                                      self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json')):
-                    return True  # 广播拦截
-        else:  # 写回
-            for program in self.__allProgram:
-                self.__makeDirs(TRANSLATION_PATH + realFilePath)
-                if self.__executeFunc(program.get('ToLocalization'), ORIGINAL_PATH + realFilePath,
-                                      self.__changeExt(PARA_TRANZ_PATH + realFilePath, 'json'),
-                                      TRANSLATION_PATH + realFilePath):
-                    return True  # 广播拦截
+        for program in self.__dispatch.allPrograms:
+            if self.__runProgram(program, realFilePath, funcID):
+                return True  # 广播拦截
         return False
 
-    def __executeFunc(self, funcName: str, *args):
-        if hasattr(self, funcName):
-            callback_func = getattr(self, funcName)
+    def __executeFunc(self, funcName: str, *args, callbackFunc=None):
+        if callbackFunc is not None or hasattr(self, funcName):
+            callback_func = callbackFunc if callbackFunc is not None else getattr(self, funcName)
             if callable(callback_func):
+                # 参数中最后一个（战役处理器为最后两个）路径是输出文件，其余是输入文件
+                inputs, outputs = (args[:-1], args[-1:]) if len(args) <= 3 else (args[:3], args[3:])
                 # try:
-                callback_func(*args)
+                with profiler.job(funcName, 'handler', args[0], inputs, outputs):
+                    callback_func(*args)
                 return True
             # except:
             #     return False
@@ -340,16 +662,27 @@ class ParatranzProject:
         return targetPath[:-len(fileExt)] + targetExtName
 
     @staticmethod
-    def __scanSpecialPath(toScanFolder: str) -> List[str]:
+    def __scanSpecialPath(toScanFolder: str, jobFilter: JobFilter, filterFiles: bool = False) -> List[str]:
+        """
+        扫描目录下的所有文件，返回以'/'开头的相对路径列表。
+
+        :param toScanFolder: 要扫描的目录。
+        :param jobFilter: 任务过滤器，不可能包含被选中文件的子目录不会被扫描。
+        :param filterFiles: 是否同时按照过滤器筛选文件。中间文件与目标文件的扩展名与原文不同，因此只对原文目录筛选文件。
+        """
         scanResult: List[str] = []
 
         def ScanDir(dirPath: str):
             if isdir(dirPath):
+                if not jobFilter.mayContain(dirPath.replace(toScanFolder, '').replace(sep, '/')):
+                    return  # 提前剪枝
                 for fileUnit in scandir(dirPath):
                     if isinstance(fileUnit, DirEntry):
                         ScanDir(fileUnit.path)
             elif isfile(dirPath):
-                scanResult.append(dirPath.replace(toScanFolder, '').replace(sep, '/'))
+                relativePath = dirPath.replace(toScanFolder, '').replace(sep, '/')
+                if not filterFiles or jobFilter.matchPath(relativePath):
+                    scanResult.append(relativePath)
 
         ScanDir(toScanFolder)
         return scanResult
@@ -361,14 +694,13 @@ class ParatranzProject:
     @staticmethod
     def __makeDirs(toMakeDIR: str):
         """预先建立目录结构"""
-        from os import makedirs
         from os.path import isdir
 
         if not toMakeDIR.endswith(sep):
             toMakeDIR = toMakeDIR.rpartition(sep)[0] + sep
         if isdir(toMakeDIR):
             return
-        makedirs(toMakeDIR)
+        outputWriter.makeDirs(toMakeDIR)
 
 
 class QuotedSpecialData(NamedTuple):
@@ -400,6 +732,9 @@ class SubParatranz(ParatranzProject):
                 fromOriginal = fromOriginal.__name__
             if callable(toLocalization):
                 toLocalization = toLocalization.__name__
+            keyPaths = kwargs.get('KeyPaths')
+            if keyPaths is not None and not isinstance(keyPaths, KeyPathSpec):
+                keyPaths = KeyPathSpec(keyPaths, kwargs.get('Loader', 'json5'))
             # if 'Register' not in kwargs or kwargs.get('Register') not in RegisterEnum:
             #     return False
             if (kwargs.get('Register') == RegisterEnum.path and not isinstance(kwargs.get('Path'), list)) or \
@@ -410,11 +745,13 @@ class SubParatranz(ParatranzProject):
                 return False
             if not (isinstance(fromOriginal, str) and isinstance(toLocalization, str)):
                 return False
-            if not (callable(getattr(self, fromOriginal)) and callable(getattr(self, toLocalization))):
+            if keyPaths is None and not (callable(getattr(self, fromOriginal)) and callable(getattr(self, toLocalization))):
                 return False
             # 开始动真格的
             thisConfig = {'Register': kwargs.get('Register'), 'FromOriginal': fromOriginal,
                           'ToLocalization': toLocalization}
+            if keyPaths is not None:
+                thisConfig['KeyPaths'] = keyPaths
             if kwargs.get('Register') == RegisterEnum.path:
                 thisConfig['Path'] = kwargs.get('Path')
             elif kwargs.get('Register') == RegisterEnum.folder:
@@ -468,7 +805,8 @@ class SubParatranz(ParatranzProject):
         # 星舰传奇mod - 目前只处理一个显示
         self.ImportOneConfig(Register=RegisterEnum.path,
                              Path=['/data/config/starship_legends/factionConfigurations.json'],
-                             FromOriginal=self.inFactionConfigurations, ToLocalization=self.outFactionConfigurations)
+                             FromOriginal='inFactionConfigurations', ToLocalization='outFactionConfigurations',
+                             KeyPaths=[KeyPath('*.descriptionOverride')])
         # 原版 - 舰船具体配置文件（231229：经向猫猫询问得知，该部分无需翻译）
         # self.ImportOneConfig(Register=folder_ext, Folder_Ext=[('/data/hulls/', 'ship')],
         #                      FromOriginal=self.inShipFile, ToLocalization=self.outShipFile)
@@ -487,10 +825,12 @@ class SubParatranz(ParatranzProject):
                              FromOriginal=self.inModInfo, ToLocalization=self.outModInfo)
         # 原版 - 行星类型（planets.json）的数据
         self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/config/planets.json'],
-                             FromOriginal=self.inPlanets, ToLocalization=self.outPlanets)
+                             FromOriginal='inPlanets', ToLocalization='outPlanets',
+                             KeyPaths=[KeyPath('*.name', context='行星类型（{0}）的名称')])
         # 原版 - 局部战斗中的可占领战术点（比如通讯中继站/传感干扰器）数据
         self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/config/battle_objectives.json'],
-                             FromOriginal=self.inBattleObjectives, ToLocalization=self.outBattleObjectives)
+                             FromOriginal='inBattleObjectives', ToLocalization='outBattleObjectives',
+                             KeyPaths=[KeyPath('*.name', context='[本行原始数据]\n{raw}')])
         # 原版 - settings.json中的数据
         self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/config/settings.json'],
                              FromOriginal=self.inSettings, ToLocalization=self.outSettings)
@@ -501,18 +841,31 @@ class SubParatranz(ParatranzProject):
         self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/config/sotf/sotf_officerConvos.json'],
                              FromOriginal=self.inSoTFOfficerConvos, ToLocalization=self.outSoTFOfficerConvos)
         # 原版 - 联络人的分类属性 / 信息面板分类页签 的相关数据
-        self.ImportOneConfig(Register=RegisterEnum.path,
-                             Path=['/data/config/contact_tag_data.json', '/data/config/tag_data.json'],
-                             FromOriginal=self.inTagData, ToLocalization=self.outTagData)
+        self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/config/contact_tag_data.json'],
+                             FromOriginal='inTagData', ToLocalization='outTagData',
+                             KeyPaths=[KeyPath('*.name', context='联络人的Tag的名称（比如 海盗/军方 那些）\n\n'
+                                                                 '[本行原始数据]\n{rawEntry}')])
+        self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/config/tag_data.json'],
+                             FromOriginal='inTagData', ToLocalization='outTagData',
+                             KeyPaths=[KeyPath('*.name', context='信息面板分类页签的名称（比如 新消息）\n\n'
+                                                                 '[本行原始数据]\n{rawEntry}')])
         # 星际领主mod - 领主的部分描述数据
         self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/lords/lords.json'],
-                             FromOriginal=self.inLords, ToLocalization=self.outLords)
+                             FromOriginal='inLords', ToLocalization='outLords', Loader='json',
+                             KeyPaths=[KeyPath('*.lore', context='对这名领主的描述\n\n[本行原始数据]\n{raw}'),
+                                       KeyPath('*.fleetName', context='领主的舰队的名称\n\n[本行原始数据]\n{raw}')])
         # 势力争霸mod - 地面战争中各种能力、地形、军团的名称/影响文本
         self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/config/exerelin/groundBattleDefs.json'],
-                             FromOriginal=self.inGroundBattleDefs, ToLocalization=self.outGroundBattleDefs)
+                             FromOriginal='inGroundBattleDefs', ToLocalization='outGroundBattleDefs',
+                             KeyPaths=[KeyPath('conditions.*.desc', key='condition#{0}#desc',
+                                               context='ID为[{0}]的地貌特征对地面战争的影响\n[本行原始数据]\n{raw}'),
+                                       KeyPath('abilities.*.name', context='地面战争中可使用的能力的名称\n[本行原始数据]\n{raw}'),
+                                       KeyPath('unitTypes.*.name', context='地面战争的军队的名称\n[本行原始数据]\n{raw}')])
         # 势力争霸mod - 雇佣兵的名称及描述数据
         self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/config/exerelin/mercConfig.json'],
-                             FromOriginal=self.inMercenaryConfig, ToLocalization=self.outMercenaryConfig)
+                             FromOriginal='inMercenaryConfig', ToLocalization='outMercenaryConfig',
+                             KeyPaths=[KeyPath('companies.*.name', context='雇佣兵的名称\n[本行原始数据]\n{raw}'),
+                                       KeyPath('companies.*.desc', context='雇佣兵的描述\n[本行原始数据]\n{raw}')])
         # 星际领主mod - 通用对话数据和其它
         self.ImportOneConfig(Register=RegisterEnum.path, Path=['/data/lords/dialog/dialog.json'],
                              FromOriginal=self.inLordsDialog, ToLocalization=self.outLordsDialog)
@@ -520,33 +873,33 @@ class SubParatranz(ParatranzProject):
     # data/missions/*
     def inMissions(self, *args):
         result = []
-        with open(args[0], encoding='UTF-8') as tFile:
-            tContent: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tContent: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
             for unit in ('title', 'difficulty'):
                 if unit in tContent:
                     result.append(self.__buildDict('mission#' + unit, tContent[unit]))
-        with open(args[1], encoding='UTF-8') as tFile:
+        with openSource(args[1]) as tFile:
             result.append(self.__buildDict('mission#text', tFile.read()))
         self.__writeParatranzJSON(result, args[2])
 
     def outMissions(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tContent: dict = json5.loads(self.filterJSON5(tFile.read()))
-        for unit in self.__readParatranzJSON(args[2]):
+        with openSource(args[0]) as tFile:
+            tContent: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
+        for unit in self.__readParatranzJSON(args[2], True):
             if unit.isTranslated:
                 if unit.key == 'mission#text':
-                    with open(args[4], 'w', encoding='UTF-8') as tFile:
+                    with outputWriter.open(args[4], encoding='UTF-8') as tFile:
                         tFile.write(self.__getTranslation(unit))
                 else:
                     realID = unit.key.split('#')[1]
                     if realID in tContent:
                         tContent[realID] = self.__getTranslation(unit)
-        with open(args[3], 'w', encoding='UTF-8') as tFile:
-            json5.dump(tContent, tFile, ensure_ascii=False, indent=4, quote_keys=True)
+        with outputWriter.open(args[3], encoding='UTF-8') as tFile:
+            dumpJSON5(tContent, tFile)
 
     # data/strings/strings.json
     def inStringsJSON(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             tFileContent = self.filterJSON5(tFile.read())
         # 读取JSON
         commentCode = {}
@@ -555,7 +908,7 @@ class SubParatranz(ParatranzProject):
             if '\"' in line and searchHint.search(line) is not None:
                 commentCode[line.split('\"')[1]] = line[searchHint.search(line).end():].strip()
         # 解析注释完成
-        originalJSON5: Dict[str, Dict[str, str]] = json5.loads(tFileContent)
+        originalJSON5: Dict[str, Dict[str, str]] = self.loadJSON5(tFileContent)
         result = []
         for firstKey in originalJSON5.keys():
             for secondKey in originalJSON5.get(firstKey).keys():
@@ -567,7 +920,15 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outStringsJSON(self, *args):
-        tTranslation = self.__readParatranzJSON(args[1])
+        with openSource(args[0]) as tFile:
+            splicer = self.__openSplicer(tFile.read())
+        if splicer is not None:  # 未翻译的词条保留原文中的写法
+            for unit in self.__readParatranzJSON(args[1], True):
+                if len(self.__getTranslation(unit)) > 0:
+                    splicer.replace(unit.key.split('#', 1), self.__getTranslation(unit))
+            outputWriter.writeText(args[2], splicer.result())
+            return
+        tTranslation = self.__readParatranzJSON(args[1])  # 未翻译的词条需要以原文写入
         # 读取内容
         result = {}
         for unit in tTranslation:
@@ -579,13 +940,13 @@ class SubParatranz(ParatranzProject):
             else:
                 result.get(keyID[0])[keyID[1]] = unit.original  # 不至于出现什么missing_string
         # 处理完成
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump(result, tFile, ensure_ascii=False, indent=4, quote_keys=True)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(result, tFile)
 
     # data/world/factions/*.faction
     def inFactions(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tFileContent: dict = json5.loads(
+        with openSource(args[0]) as tFile:
+            tFileContent: dict = self.loadJSON5(
                 self.__quoteSpecialDataForIn(re.compile('^"?tags"?: *\\['), self.filterJSON5(tFile.read())))
         # 预定义关键字解析
         result = []
@@ -622,13 +983,24 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outFactions(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            preContent, toReplaceData = self.__quoteSpecialDataForOut(re.compile('^"?tags"?: *\\['),
-                                                                      self.filterJSON5(tFile.read()))
-            tOriginal: dict = json5.loads(preContent)
-        # 读取原文文件内容
-        tTranslation = self.__readParatranzJSON(args[1])
+        with openSource(args[0]) as tFile:
+            fileContent = tFile.read()
+        tTranslation = self.__readParatranzJSON(args[1], True)
         # 读取译文文件内容
+        splicer = self.__openSplicer(fileContent)
+        if splicer is not None:  # tags 等不带引号的数据与注释都原样保留，无需预处理
+            for unit in tTranslation:
+                if not unit.isTranslated:
+                    continue
+                translation = self.__getTranslation(unit)
+                keyPath = (unit.key[5:],) if unit.key.startswith('root#') else unit.key.split('#')
+                splicer.replace(keyPath, translation if len(translation) > 0 else unit.original)
+            outputWriter.writeText(args[2], splicer.result())
+            return
+        preContent, toReplaceData = self.__quoteSpecialDataForOut(re.compile('^"?tags"?: *\\['),
+                                                                  self.filterJSON5(fileContent))
+        tOriginal: dict = self.loadJSON5(preContent)
+        # 读取原文文件内容
         for unit in tTranslation:
             if not unit.isTranslated:
                 continue
@@ -657,13 +1029,13 @@ class SubParatranz(ParatranzProject):
                     else:
                         break
                     countID += 1
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            tFile.write(toReplaceData.endTask(json.dumps(tOriginal, ensure_ascii=False, indent=4)))
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            tFile.write(toReplaceData.endTask(dumpsJSON5(tOriginal, trailingCommas=False)))
 
     # data/strings/tips.json
     def inTips(self, *args):
-        tFile = open(args[0], encoding='UTF-8')
-        tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
+        tFile = openSource(args[0])
+        tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         tFile.close()
         # 读取原文文件内容
         result = []
@@ -677,7 +1049,7 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outTips(self, *args):
-        tTranslation = self.__readParatranzJSON(args[1])
+        tTranslation = self.__readParatranzJSON(args[1], True)
         result = {'tips': []}
         for unit in tTranslation:
             if unit.isTranslated:
@@ -686,14 +1058,13 @@ class SubParatranz(ParatranzProject):
                 else:
                     result['tips'].append(
                         {'freq': float(unit.key.split('$')[1]), 'tip': self.__getTranslation(unit)})
-        tFile = open(args[2], 'w', encoding='UTF-8')
-        json5.dump(result, tFile, ensure_ascii=False, indent=4, quote_keys=True)
-        tFile.close()
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(result, tFile)
 
     # data/config/chatter/characters/*.json
     def inChatter(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tContent: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tContent: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         tVar: Dict[str, List[Dict[str, str]]] = tContent.pop('lines')
         result = []
         personName = tContent.get('name')
@@ -706,9 +1077,9 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outChatter(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
-        tTranslation = self.__readParatranzJSON(args[1])
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
+        tTranslation = self.__readParatranzJSON(args[1], True)
         result = {}
         for unit in tTranslation:
             if unit.isTranslated:
@@ -718,13 +1089,13 @@ class SubParatranz(ParatranzProject):
                 else:
                     result[firstKey].append({'text': self.__getTranslation(unit)})
         tOriginal.update({'lines': result})
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump(tOriginal, tFile, ensure_ascii=False, indent=4, quote_keys=True)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tOriginal, tFile)
 
     # data/config/exerelin/customStarts.json
     def inCustomStart(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tContent: List[dict] = json5.loads(self.filterJSON5(tFile.read()))['starts']
+        with openSource(args[0]) as tFile:
+            tContent: List[dict] = self.loadJSON5(self.filterJSON5(tFile.read()))['starts']
         result = []
         for unit in tContent:
             unitID = unit.get('id')
@@ -735,22 +1106,22 @@ class SubParatranz(ParatranzProject):
 
     def outCustomStart(self, *args):
         tOriginal = {}
-        with open(args[0], encoding='UTF-8') as tFile:
-            tContent: List[dict] = json5.loads(self.filterJSON5(tFile.read()))['starts']
+        with openSource(args[0]) as tFile:
+            tContent: List[dict] = self.loadJSON5(self.filterJSON5(tFile.read()))['starts']
             for unit in tContent:
                 tOriginal[unit.get('id')] = unit
-        for unit in self.__readParatranzJSON(args[1]):
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 unitID, unitKey = unit.key.split('#')
                 if unitID in tOriginal:
                     tOriginal[unitID][unitKey] = self.__getTranslation(unit)
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump({'starts': list(tOriginal.values())}, tFile, ensure_ascii=False, indent=4, quote_keys=True)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5({'starts': list(tOriginal.values())}, tFile)
 
     # data/config/exerelin/allianceNames.json
     def inAllianceNames(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: Dict[str, Dict[str, Dict[str, List[str]]]] = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: Dict[str, Dict[str, Dict[str, List[str]]]] = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         for firstKey in tOriginal.keys():
             for secondKey in tOriginal[firstKey].keys():
@@ -764,7 +1135,7 @@ class SubParatranz(ParatranzProject):
 
     def outAllianceNames(self, *args):
         tResult = {}
-        for unit in self.__readParatranzJSON(args[1]):
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 firstKey, t1 = unit.key.split('#')
                 secondKey, thirdKey = t1.split('$')
@@ -778,14 +1149,14 @@ class SubParatranz(ParatranzProject):
                     tResult[firstKey][secondKey][thirdKey] = [self.__getTranslation(unit)]
                 else:
                     tResult[firstKey][secondKey][thirdKey].append(self.__getTranslation(unit))
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump(tResult, tFile, ensure_ascii=False, indent=4, quote_keys=True)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tResult, tFile)
 
     # data/config/exerelin/diplomacyConfig.json
     def inDiplomacyConfig(self, *args):
         # 只处理event区块
-        with open(args[0], encoding="UTF-8") as tFile:
-            tOriginal: List[dict] = json5.loads(self.filterJSON5(tFile.read()))['events']
+        with openSource(args[0]) as tFile:
+            tOriginal: List[dict] = self.loadJSON5(self.filterJSON5(tFile.read()))['events']
         result = []
         for eventUnit in tOriginal:
             stageID = eventUnit.get('stage')
@@ -798,23 +1169,23 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outDiplomacyConfig(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         tEvent: List[dict] = tOriginal['events']
-        for unit in self.__readParatranzJSON(args[1]):
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 stageID, unitKey = unit.key.split('#')[1].split('$')
                 for stageUnit in tEvent:
                     if stageUnit.get('stage') == stageID:
                         stageUnit[unitKey] = self.__getTranslation(unit)
                         break
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump(tOriginal, tFile, ensure_ascii=False, indent=4, quote_keys=True)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tOriginal, tFile)
 
     # data/world/factions/default_ranks.json
     def inDefaultRanks(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: Dict[str, Dict[str, Dict[str, str]]] = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: Dict[str, Dict[str, Dict[str, str]]] = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         for firstKey in tOriginal.keys():
             for secondKey in tOriginal[firstKey].keys():
@@ -825,23 +1196,23 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outDefaultRanks(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: Dict[str, Dict[str, Dict[str, str]]] = json5.loads(self.filterJSON5(tFile.read()))
-        for unit in self.__readParatranzJSON(args[1]):
+        with openSource(args[0]) as tFile:
+            tOriginal: Dict[str, Dict[str, Dict[str, str]]] = self.loadJSON5(self.filterJSON5(tFile.read()))
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 firstKey, tVar = unit.key.split('#')
                 secondKey, thirdKey = tVar.split('$')
                 if firstKey in tOriginal.keys() and secondKey in tOriginal[firstKey].keys() and thirdKey in \
                         tOriginal[firstKey][secondKey]:
                     tOriginal[firstKey][secondKey][thirdKey] = self.__getTranslation(unit)
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump(tOriginal, tFile, ensure_ascii=False, indent=4, quote_keys=True)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tOriginal, tFile)
 
     # data/config/modFiles/magicBounty_data.json
     def inMagicBountyData(self, *args):
         """这部分处理的是MagicLib的自带HVB部分。"""
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: Dict[str, dict] = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: Dict[str, dict] = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         # 240819：增补了对高价值赏金（HVB）中部分Key的注解
         hintDict = {'job_name': '赏金名称', 'job_description': '赏金的说明文本',
@@ -877,8 +1248,8 @@ class SubParatranz(ParatranzProject):
                     'vengeanceLevelNames': '势力争霸mod中派出的复仇舰队名称',
                     'vengeanceFleetNames': '势力争霸mod中派出的复仇舰队名称',
                     'vengeanceFleetNamesSingle': '势力争霸mod中派出的复仇舰队名称'}
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         for translateKey in toTranslateKeys:
             if translateKey in tOriginal:
@@ -894,9 +1265,9 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outExerelinFactionConfig(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
-        for unit in self.__readParatranzJSON(args[1]):
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 if unit.key in tOriginal:
                     tOriginal[unit.key] = self.__getTranslation(unit)
@@ -904,28 +1275,13 @@ class SubParatranz(ParatranzProject):
                     first, second = unit.key.split('$')
                     if first in tOriginal:
                         tOriginal[first][int(second)] = self.__getTranslation(unit)
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump(tOriginal, tFile, ensure_ascii=False, indent=4, quote_keys=True)
-
-    # data/config/starship_legends/factionConfigurations.json
-    def inFactionConfigurations(self, *args):
-        # 一看就是星舰传奇的玩意
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: Dict[str, dict] = json5.loads(self.filterJSON5(tFile.read()))
-        result = []
-        for firstKey in tOriginal:
-            if 'descriptionOverride' in tOriginal[firstKey].keys():
-                result.append(
-                    self.__buildDict(f'{firstKey}#descriptionOverride', tOriginal[firstKey]['descriptionOverride']))
-        self.__writeParatranzJSON(result, args[1])
-
-    def outFactionConfigurations(self, *args):
-        self.__commonTranslateFunc_v2(*args)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tOriginal, tFile)
 
     # data/hulls/*.ship
     def inShipFile(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         if 'hullName' in tOriginal:
             result.append(self.__buildDict(f'root#hullName', tOriginal['hullName'],
@@ -937,8 +1293,8 @@ class SubParatranz(ParatranzProject):
 
     # data/hulls/skins/*.skin
     def inHullSkinFile(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.__quoteSpecialDataForIn(re.compile('^"?(hints|removeHints|addHints|type)"?:'),
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.__quoteSpecialDataForIn(re.compile('^"?(hints|removeHints|addHints|type)"?:'),
                                                                        self.filterJSON5(tFile.read())))
         result = []
         for keyStr in ('hullName', 'descriptionPrefix', 'tech', 'hullDesignation'):
@@ -948,23 +1304,23 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outHullSkinFile(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             preContent, toReplaceData = self.__quoteSpecialDataForOut(re.compile('^"?(hints|removeHints|addHints|type)"?:'),
                                                                       self.filterJSON5(tFile.read()))
-            tOriginal = json5.loads(preContent)
-        for unit in self.__readParatranzJSON(args[1]):
+            tOriginal = self.loadJSON5(preContent)
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 keyStr = unit.key.split('#')[1]
                 if keyStr in tOriginal:
                     tOriginal[keyStr] = self.__getTranslation(unit)
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            tFile.write(toReplaceData.endTask(json.dumps(tOriginal, ensure_ascii=False, indent=4)))
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            tFile.write(toReplaceData.endTask(dumpsJSON5(tOriginal, trailingCommas=False)))
 
     # data/strings/combat_death_causes.csv 和 data/strings/hamster_death_causes.csv
     # 处理宠物系统的死因描述
     def inDeathCauses(self, *args):
         result = []
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             for line in list(csv.DictReader(tFile)):
                 contextText = None
                 if 'combat' in args[0]:
@@ -976,18 +1332,18 @@ class SubParatranz(ParatranzProject):
 
     def outDeathCauses(self, *args):
         result = []
-        for unit in self.__readParatranzJSON(args[1]):
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 result.append({'id': self.__getTranslation(unit)})
-        with open(args[2], 'w', newline='', encoding='UTF-8') as tFile:
+        with outputWriter.open(args[2], newline='', encoding='UTF-8') as tFile:
             tVar = csv.DictWriter(tFile, ['id'])
             tVar.writeheader()
             tVar.writerows(result)
 
     # data/config/custom_entities.json
     def inCustomEntity(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(
                 self.__quoteSpecialDataForIn(re.compile('^"layers":'), self.filterJSON5(tFile.read())))
         result = []
         for firstKey in tOriginal:
@@ -1005,24 +1361,24 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outCustomEntity(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             preContent, toReplaceData = self.__quoteSpecialDataForOut(re.compile('^"layers"'),
                                                                       self.filterJSON5(tFile.read()))
-            tOriginal: dict = json5.loads(preContent)
-        for unit in self.__readParatranzJSON(args[1]):
+            tOriginal: dict = self.loadJSON5(preContent)
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 firstKey, secondKey = unit.key.split('#')
                 if firstKey in tOriginal:
                     tOriginal[firstKey][secondKey] = self.__getTranslation(unit)
-        preResult = toReplaceData.endTask(json.dumps(tOriginal, ensure_ascii=False, indent=4))
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
+        preResult = toReplaceData.endTask(dumpsJSON5(tOriginal, trailingCommas=False))
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
             tFile.write(preResult)
 
     # data/config/LunaSettings.csv
     # 本来这个文件应该交给汉化组写的脚本处理，但是由于某些原因……
     def inLunaSettings(self, *args):
         result = []
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             tVar = list(csv.DictReader(tFile))
             tVar1 = self.__extractDuplicateKeyText(tVar, 'fieldID')  # 预提取重复的ID信息数据
             for tabUnit in self.__extractDuplicateKeyText(tVar, 'tab').keys():
@@ -1061,9 +1417,9 @@ class SubParatranz(ParatranzProject):
 
     def outLunaSettings(self, *args):
         # 读取内容
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             result = list(csv.DictReader(tFile))
-        tVar_data = self.__readParatranzJSON(args[1])
+        tVar_data = self.__readParatranzJSON(args[1], True)
         for unit in tVar_data:  # 批量替换标签数据
             if 'tabValue$' in unit.key and unit.isTranslated:
                 for line in result:
@@ -1086,15 +1442,15 @@ class SubParatranz(ParatranzProject):
                         if unit.isTranslated and len(self.__getTranslation(unit)) > 0:
                             line[csvValueKeyID] = self.__getTranslation(unit)
                             break
-        with open(args[2], 'w', newline='', encoding='UTF-8') as tFile:
+        with outputWriter.open(args[2], newline='', encoding='UTF-8') as tFile:
             tVar = csv.DictWriter(tFile, list(result[0].keys()))
             tVar.writeheader()
             tVar.writerows(result)
 
     # mod_info.json
     def inModInfo(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         hintBox = {'name': '本Mod的名称', 'description': '本Mod的描述'}
         for unitKey in hintBox:
@@ -1104,28 +1460,14 @@ class SubParatranz(ParatranzProject):
     def outModInfo(self, *args):
         self.__commonTranslateFunc_v1(*args)
 
-    # data/config/planets.json
-    def inPlanets(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
-        result = []
-        for planetID in tOriginal:
-            if 'name' in tOriginal[planetID]:
-                result.append(
-                    self.__buildDict(f'{planetID}#name', tOriginal[planetID]['name'], f'行星类型（{planetID}）的名称'))
-        self.__writeParatranzJSON(result, args[1])
-
-    def outPlanets(self, *args):
-        self.__commonTranslateFunc_v2(*args)
-
     # data/config/settings.json
     # 240731: 仅处理 舰船设计分类 的颜色渲染效果，并尽可能使用较小影响的替换方式
     def inSettings(self, *args):
         from os.path import sep as os_sep, isfile, join as path_join
         from csv import DictReader
 
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         allDesignType = set()
         if 'designTypeColors' in tOriginal:
@@ -1150,36 +1492,22 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outSettings(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             tOriginal = tFile.read()
-        for unit in self.__readParatranzJSON(args[1]):
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 tOriginal = tOriginal.replace(f'"{unit.original}"', f'"{self.__getTranslation(unit)}"', 1)
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
             tFile.write(tOriginal)
 
-    # data/config/battle_objectives.json
-    def inBattleObjectives(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
-        result = []
-        for firstKey in tOriginal:
-            if 'name' in tOriginal[firstKey]:
-                result.append(self.__buildDict(f'{firstKey}#name', tOriginal[firstKey]['name'],
-                                               f'[本行原始数据]\n{pprint.pformat(tOriginal[firstKey], sort_dicts=False)}'))
-        self.__writeParatranzJSON(result, args[1])
-
-    def outBattleObjectives(self, *args):
-        self.__commonTranslateFunc_v2(*args)
-
     # data/characters/skills/*.skill
     def inSkill(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             t0 = tFile.read()
             for t2 in re.findall('"?scope\\d?"? *: *CUSTOM', t0):
                 t3 = t2.split(':')[0].strip()
                 t0 = t0.replace(t2, t3 + ':"CUSTOM"')
-            tOriginal: dict = hjson.loads(self.filterJSON5(t0))
+            tOriginal: dict = self.loadHJSON(self.filterJSON5(t0))
         # 以上操作是为了过滤某些又不好好写文件的SB Modder
         result = []
         for unitKey in tOriginal.keys():
@@ -1195,26 +1523,26 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outSkill(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
+        with openSource(args[0]) as tFile:
             t0 = tFile.read()
             for t2 in re.findall('"?scope\\d?"? *: *CUSTOM', t0):
                 t3 = t2.split(':').strip()
                 t0 = t0.replace(t2, t3 + ':"CUSTOM"')
-            tOriginal: dict = json5.loads(self.filterJSON5(t0))
-        for unit in self.__readParatranzJSON(args[1]):
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(t0))
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 if unit.key.startswith('root#'):
                     tOriginal[unit.key.split('#')[1]] = unit.translation
                 elif unit.key.startswith('effectGroups#'):
                     groupID, keyName = unit.key.split('#')[1].split('$')
                     tOriginal['effectGroups'][int(groupID)][keyName] = unit.translation
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json.dump(tOriginal, tFile, ensure_ascii=False, indent=4)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tOriginal, tFile, trailingCommas=False)
 
     # data/config/sotf/sotf_officerConvos.json
     def inSoTFOfficerConvos(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         for unitKey in tOriginal:
             descText = pprint.pformat({unitKey: tOriginal[unitKey]}, sort_dicts=False)
@@ -1226,107 +1554,19 @@ class SubParatranz(ParatranzProject):
         self.__writeParatranzJSON(result, args[1])
 
     def outSoTFOfficerConvos(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
-        for unit in self.__readParatranzJSON(args[1]):
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 key, numID = unit.key.split('#')
                 tOriginal[key]['lines'][int(numID)][1] = unit.translation
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump(tOriginal, tFile, indent=4, ensure_ascii=False)
-
-    # data/config/contact_tag_data.json 和 data/config/tag_data.json
-    def inTagData(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
-        result = []
-        if args[0].endswith('contact_tag_data.json'):
-            contextTextPrefix = '联络人的Tag的名称（比如 海盗/军方 那些）'
-        else:
-            contextTextPrefix = '信息面板分类页签的名称（比如 新消息）'
-        for unitKey in tOriginal:
-            descText = pprint.pformat({unitKey: tOriginal[unitKey]}, sort_dicts=False)
-            if 'name' in tOriginal[unitKey]:
-                result.append(self.__buildDict(f'{unitKey}#name', tOriginal[unitKey]['name'],
-                                               f'{contextTextPrefix}\n\n[本行原始数据]\n{descText}'))
-        self.__writeParatranzJSON(result, args[1])
-
-    def outTagData(self, *args):
-        self.__commonTranslateFunc_v2(*args)
-
-    # data/lords/lords.json
-    def inLords(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json.load(tFile)
-        result = []
-        hintDict = {
-            'lore': '对这名领主的描述',
-            'fleetName': '领主的舰队的名称'
-        }
-        for lordName in tOriginal:
-            lordData = tOriginal[lordName]
-            descText = pprint.pformat(lordData, sort_dicts=False)
-            for realKey in hintDict:
-                if realKey in lordData:
-                    result.append(self.__buildDict(f'{lordName}#{realKey}', lordData[realKey],
-                                                   f'{hintDict[realKey]}\n\n[本行原始数据]\n{descText}'))
-        self.__writeParatranzJSON(result, args[1])
-
-    def outLords(self, *args):
-        self.__commonTranslateFunc_v2(*args)
-
-    # data/config/exerelin/groundBattleDefs.json
-    def inGroundBattleDefs(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
-        result = []
-        if 'conditions' in tOriginal:
-            for conditionID in tOriginal['conditions']:
-                tData: dict = tOriginal['conditions'][conditionID]
-                result.append(self.__buildDict(
-                    f'condition#{conditionID}#desc', tData['desc'],
-                    f'ID为[{conditionID}]的地貌特征对地面战争的影响\n[本行原始数据]\n{pprint.pformat(tData, sort_dicts=False)}'))
-        if 'abilities' in tOriginal:
-            for abilitiesID in tOriginal['abilities']:
-                tData: dict = tOriginal['abilities'][abilitiesID]
-                result.append(self.__buildDict(
-                    f'abilities#{abilitiesID}#name', tData['name'],
-                    f'地面战争中可使用的能力的名称\n[本行原始数据]\n{pprint.pformat(tData, sort_dicts=False)}'))
-        if 'unitTypes' in tOriginal:
-            for unitTypesID in tOriginal['unitTypes']:
-                tData: dict = tOriginal['unitTypes'][unitTypesID]
-                result.append(self.__buildDict(
-                    f'unitTypes#{unitTypesID}#name', tData['name'],
-                    f'地面战争的军队的名称\n[本行原始数据]\n{pprint.pformat(tData, sort_dicts=False)}'))
-        self.__writeParatranzJSON(result, args[1])
-
-    def outGroundBattleDefs(self, *args):
-        self.__commonTranslateFunc_vAny(3, *args)
-
-    # data/config/exerelin/mercConfig.json
-    def inMercenaryConfig(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
-        result = []
-        if 'companies' in tOriginal:
-            for firstID in tOriginal['companies']:
-                lineData: dict = tOriginal['companies'][firstID]
-                descText = pprint.pformat(lineData, sort_dicts=False)
-                if 'name' in lineData:
-                    result.append(self.__buildDict(f'companies#{firstID}#name', lineData['name'],
-                                                   f'雇佣兵的名称\n[本行原始数据]\n{descText}'))
-                if 'desc' in lineData:
-                    result.append(self.__buildDict(f'companies#{firstID}#desc', lineData['desc'],
-                                                   f'雇佣兵的描述\n[本行原始数据]\n{descText}'))
-        self.__writeParatranzJSON(result, args[1])
-
-    def outMercenaryConfig(self, *args):
-        self.__commonTranslateFunc_vAny(3, *args)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tOriginal, tFile, quoteKeys=False)
 
     # data/lords/dialog/dialog.json
     def inLordsDialog(self, *args):
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: dict = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            tOriginal: dict = self.loadJSON5(self.filterJSON5(tFile.read()))
         result = []
         for key1, dict1 in tOriginal.items():
             if key1 == 'template' or 'lines' not in dict1:
@@ -1376,21 +1616,44 @@ class SubParatranz(ParatranzProject):
             tVar.append(line)
         return '\n'.join(tVar)
 
+    @staticmethod
+    def loadJSON5(fileContent: str):
+        """使用 json5 解析已经过 `filterJSON5` 处理的文本。启用共享解析缓存时，相同的文本只解析一次。"""
+        with profiler.phase('parse', 'json5'):
+            return parseCache.load('json5', fileContent, json5.loads)
+
+    @staticmethod
+    def loadHJSON(fileContent: str):
+        """使用 hjson 解析文本，用于那些连 json5 都无法处理的文件。"""
+        with profiler.phase('parse', 'hjson'):
+            return parseCache.load('hjson', fileContent, hjson.loads)
+
+    @staticmethod
+    def loadJSON(fileContent: str):
+        """使用标准库解析严格的 JSON 文本。"""
+        with profiler.phase('parse', 'json'):
+            return parseCache.load('json', fileContent, json.loads)
+
     @staticmethod
     def __buildDict(keyID: str, original: str, context: str = None):
         return ParatranzDataUnit(keyID, original, context)
 
-    @staticmethod
-    def __writeParatranzJSON(content: List[ParatranzDataUnit], filePath: str):
+    def __writeParatranzJSON(self, content: List[ParatranzDataUnit], filePath: str):
         if len(content) == 0:
             return
-        with open(filePath, 'w', encoding='UTF-8') as tFile:
-            json.dump([x.asDict() for x in content], tFile, ensure_ascii=False, indent=4)
+        self.Stages.apply(filePath, content)
+        profiler.addUnits(len(content))
+        self.UnitIO.write(filePath, content)
 
-    @staticmethod
-    def __readParatranzJSON(filePath: str) -> List[ParatranzDataUnit]:
-        with open(filePath, encoding='UTF-8') as tFile:
-            return [ParatranzDataUnit(**dataDict) for dataDict in json.load(tFile)]
+    def __readParatranzJSON(self, filePath: str, translatedOnly: bool = False) -> List[ParatranzDataUnit]:
+        """
+        读取中间文件的词条。
+
+        :param translatedOnly: 只读取已翻译的词条。只关心译文的写回处理器应当指定此参数，以免读入大量无用的词条。
+        """
+        result = self.UnitIO.read(filePath, translatedOnly)
+        profiler.addUnits(len(result))
+        return result
 
     @staticmethod
     def __getTranslation(toGet: ParatranzDataUnit):
@@ -1400,6 +1663,48 @@ class SubParatranz(ParatranzProject):
     def __simpleMD5(toHashText: str):
         return md5(toHashText.encode('UTF-8')).hexdigest()
 
+    def ExtractKeyPaths(self, keyPathSpec: KeyPathSpec, *args):
+        with openSource(args[0]) as tFile:
+            tOriginal = self.__loadKeyPathDocument(keyPathSpec, tFile.read())
+        result = [self.__buildDict(x.key, x.value, x.context) for x in keyPathSpec.extract(tOriginal)]
+        self.__writeParatranzJSON(result, args[1])
+
+    def WritebackKeyPaths(self, keyPathSpec: KeyPathSpec, *args):
+        with openSource(args[0]) as tFile:
+            fileContent = tFile.read()
+        tOriginal = self.__loadKeyPathDocument(keyPathSpec, fileContent)
+        keyIndex = keyPathSpec.locate(tOriginal)
+        splicer = self.__openSplicer(fileContent, keyPathSpec.loader)
+        for unit in self.__readParatranzJSON(args[1], True):
+            if unit.key in keyIndex:
+                if splicer is not None:
+                    splicer.replace(keyIndex[unit.key], self.__getTranslation(unit))
+                else:
+                    KeyPathSpec.setValue(tOriginal, keyIndex[unit.key], self.__getTranslation(unit))
+        if splicer is not None:
+            outputWriter.writeText(args[2], splicer.result())
+            return
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tOriginal, tFile)
+
+    def __openSplicer(self, fileContent: str, loader: str = 'json5') -> StringSplicer | None:
+        """
+        扫描原文中字符串值的位置，用于把译文直接拼接进原文，原文的注释与格式都得以保留。原文无法识别时返回 None，此时改用解析后重新输出。
+
+        :param loader: 原文的解析方式，'json5' 时键按 `filterJSON5` 的方式处理数字后缀 f，与解析结果中的键保持一致。
+        """
+        with profiler.phase('parse', 'spans'):
+            return StringSplicer.parse(fileContent, self.__normalizeKey if loader == 'json5' else None)
+
+    @staticmethod
+    def __normalizeKey(key: str) -> str:
+        return re.sub('(\\d)f', '\\1', key) if 'f' in key else key
+
+    def __loadKeyPathDocument(self, keyPathSpec: KeyPathSpec, fileContent: str):
+        if keyPathSpec.loader == 'json':
+            return self.loadJSON(fileContent)
+        return self.loadJSON5(self.filterJSON5(fileContent))
+
     def __commonTranslateFunc_v1(self, *args):
         """提供一些只有一层json的翻译函数。"""
         self.__commonTranslateFunc_vAny(1, *args)
@@ -1416,8 +1721,17 @@ class SubParatranz(ParatranzProject):
         """
         if layerNum < 1:
             return
-        with open(args[0], encoding='UTF-8') as tFile:
-            tOriginal: Dict[str, dict] = json5.loads(self.filterJSON5(tFile.read()))
+        with openSource(args[0]) as tFile:
+            fileContent = tFile.read()
+        splicer = self.__openSplicer(fileContent)
+        if splicer is not None:
+            for unit in self.__readParatranzJSON(args[1], True):
+                if unit.isTranslated:
+                    keyPath = unit.key.split('#', max(1, layerNum - 1)) if layerNum > 1 else [unit.key.split('#', 1)[1]]
+                    splicer.replace(keyPath, self.__getTranslation(unit))
+            outputWriter.writeText(args[2], splicer.result())
+            return
+        tOriginal: Dict[str, dict] = self.loadJSON5(self.filterJSON5(fileContent))
 
         # 递归检查层级，适用于多种复合情况
         def checkExistAndReplace(layerData: list, layerIndex: int, translationStr: str, originalData: dict):
@@ -1435,14 +1749,14 @@ class SubParatranz(ParatranzProject):
                 else: # 层层递归
                     checkExistAndReplace(layerData, layerIndex + 1, translationStr, originalData[layerData[layerIndex]])
 
-        for unit in self.__readParatranzJSON(args[1]):
+        for unit in self.__readParatranzJSON(args[1], True):
             if unit.isTranslated:
                 # 修复一层JSON识别不出来的问题（这是由于特有写法导致的）
                 cacheLayerData = unit.key.split('#', max(1, layerNum - 1)) if layerNum > 1 else [unit.key.split('#', 1)[1]]
                 checkExistAndReplace(cacheLayerData, 0, self.__getTranslation(unit),
                                      tOriginal)
-        with open(args[2], 'w', encoding='UTF-8') as tFile:
-            json5.dump(tOriginal, tFile, ensure_ascii=False, indent=4, quote_keys=True)
+        with outputWriter.open(args[2], encoding='UTF-8') as tFile:
+            dumpJSON5(tOriginal, tFile)
 
 
     @staticmethod
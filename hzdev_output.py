@@ -0,0 +1,203 @@
+import io
+import os
+import stat
+import threading
+from contextlib import contextmanager
+from hashlib import md5
+from typing import Iterator, List, Tuple
+
+
+def _newFileMode() -> int:
+    """新建文件的权限，与直接使用 open 时相同（0o666 去掉 umask）。"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+NEW_FILE_MODE = _newFileMode()
+
+
+class OutputWriter:
+    """
+    所有输出文件（汉化文件与中间文件）的统一写入入口。
+
+    写入前先比较文件大小，大小相同时再比较内容摘要，内容没有变化的文件不会被重写，修改时间也保持不变；
+    内容有变化时先写入同目录下的临时文件，再以 `os.replace` 原子地替换目标文件，中途出错不会留下写了一半的文件。
+
+    可以在多个线程之间共享，`written` 与 `skipped` 统计自上次 `reset` 以来写入与跳过的文件数量。
+    在 `capture` 的上下文中，当前线程的写入只会暂存在内存中，由调用方之后再统一写入（见 `hzdev_pipeline`）；
+    在 `redirect` 的上下文中，所有线程写入归档目录之下的文件都会转而写入归档（见 `hzdev_archive`）。
+    """
+    __chunkSize = 1 << 20
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__archive = None
+        self.written = 0
+        self.skipped = 0
+
+    def reset(self):
+        with self.__lock:
+            self.written = 0
+            self.skipped = 0
+
+    def report(self):
+        print(f'输出文件：写入 {self.written} 个，内容未变而跳过 {self.skipped} 个。')
+
+    @contextmanager
+    def capture(self) -> Iterator[List[Tuple[str, bytes]]]:
+        """
+        暂存当前线程在上下文中的所有写入，返回 (文件路径, 文件内容) 的列表，不写入任何文件，也不计入统计。
+        之后可以把列表中的内容交给 `writeBytes` 实际写入。
+        """
+        previous = getattr(self.__local, 'captured', None)
+        captured = self.__local.captured = []
+        try:
+            yield captured
+        finally:
+            self.__local.captured = previous
+
+    @contextmanager
+    def redirect(self, archive):
+        """
+        在上下文中把写入归档目录之下的文件转而交给归档（比如 `ZipArchiveWriter`），不在磁盘上建立这些文件与目录。
+        归档需要提供 `covers(filePath)` 与 `add(filePath, content)`，并可以在多个线程之间共享。
+        """
+        previous, self.__archive = self.__archive, archive
+        try:
+            yield archive
+        finally:
+            self.__archive = previous
+
+    def makeDirs(self, dirPath: str):
+        """建立输出文件所在的目录；目录位于正在写入的归档之中时不做任何事。"""
+        archive = self.__archive
+        if archive is not None and archive.covers(dirPath):
+            return
+        os.makedirs(dirPath, exist_ok=True)  # 并发执行任务时，目录可能已被其它任务建立
+
+    @contextmanager
+    def open(self, filePath: str, mode: str = 'w', encoding: str = 'UTF-8', newline: str = None,
+             errors: str = 'strict') -> Iterator[io.StringIO | io.BytesIO]:
+        """
+        以与内置 `open` 相同的参数“打开”输出文件，返回一个内存缓冲区，退出上下文时才比较并写入文件。
+        上下文中抛出异常时不会写入任何内容。
+
+        :param filePath: 目标文件路径，所在目录需要事先建立。
+        :param mode: 'w'（文本）或 'wb'（二进制）。
+        :param encoding: 文本模式下的编码。
+        :param newline: 文本模式下的换行符处理方式，与内置 `open` 的含义相同。
+        :param errors: 文本模式下编码错误的处理方式。
+        """
+        if mode not in ('w', 'wb'):
+            raise RuntimeError(f'输出文件只支持 w 与 wb 模式，而不是 {mode}')
+        buffer = io.BytesIO() if mode == 'wb' else io.StringIO(newline='\n')
+        yield buffer
+        if mode == 'wb':
+            self.writeBytes(filePath, buffer.getvalue())
+        else:
+            self.writeText(filePath, buffer.getvalue(), encoding, newline, errors)
+
+    def writeText(self, filePath: str, content: str, encoding: str = 'UTF-8', newline: str = None,
+                  errors: str = 'strict') -> bool:
+        """
+        写入文本文件，换行符的转换与内置 `open` 相同（newline 为 None 时 '\\n' 转换为 `os.linesep`）。
+
+        :return: 是否实际写入了文件。
+        """
+        if newline is None:
+            newline = os.linesep
+        if newline not in ('', '\n'):
+            content = content.replace('\n', newline)
+        return self.writeBytes(filePath, content.encode(encoding, errors))
+
+    def writeBytes(self, filePath: str, content: bytes) -> bool:
+        """
+        写入二进制文件。
+
+        :return: 是否实际写入了文件。
+        """
+        captured = getattr(self.__local, 'captured', None)
+        if captured is not None:
+            captured.append((filePath, content))
+            return True
+        archive = self.__archive
+        if archive is not None and archive.covers(filePath):
+            isWritten = archive.add(filePath, content)
+            self.__count(isWritten)
+            return isWritten
+        if self.__isSame(filePath, len(content), lambda: md5(content).digest()):
+            self.__count(False)
+            return False
+        self.__replace(filePath, lambda tFile: tFile.write(content))
+        self.__count(True)
+        return True
+
+    def copyFile(self, sourcePath: str, targetPath: str) -> bool:
+        """
+        复制文件，目标文件的内容已经与源文件相同时不做任何事。
+
+        :return: 是否实际写入了文件。
+        """
+        archive = self.__archive
+        if getattr(self.__local, 'captured', None) is not None or (archive is not None and archive.covers(targetPath)):
+            with open(sourcePath, 'rb') as sourceFile:
+                return self.writeBytes(targetPath, sourceFile.read())
+        if self.__isSame(targetPath, os.path.getsize(sourcePath), lambda: self.__fileDigest(sourcePath)):
+            self.__count(False)
+            return False
+
+        def copyContent(tFile):
+            with open(sourcePath, 'rb') as sourceFile:
+                while chunk := sourceFile.read(self.__chunkSize):
+                    tFile.write(chunk)
+
+        self.__replace(targetPath, copyContent)
+        self.__count(True)
+        return True
+
+    def __count(self, isWritten: bool):
+        with self.__lock:
+            if isWritten:
+                self.written += 1
+            else:
+                self.skipped += 1
+
+    def __isSame(self, filePath: str, size: int, digestFunc) -> bool:
+        try:
+            if os.path.getsize(filePath) != size:
+                return False
+            return self.__fileDigest(filePath) == digestFunc()
+        except OSError:
+            return False
+
+    def __fileDigest(self, filePath: str) -> bytes:
+        result = md5()
+        with open(filePath, 'rb') as tFile:
+            while chunk := tFile.read(self.__chunkSize):
+                result.update(chunk)
+        return result.digest()
+
+    @staticmethod
+    def __replace(filePath: str, writeFunc):
+        """写入同目录下的临时文件，然后原子地替换目标文件，并保留目标文件原有的权限。"""
+        import tempfile
+
+        dirPath, fileName = os.path.split(os.path.abspath(filePath))
+        fileMode = stat.S_IMODE(os.stat(filePath).st_mode) if os.path.isfile(filePath) else NEW_FILE_MODE
+        fd, tempPath = tempfile.mkstemp(prefix=f'.{fileName}.', suffix='.tmp', dir=dirPath)
+        try:
+            with os.fdopen(fd, 'wb') as tFile:
+                writeFunc(tFile)
+            os.chmod(tempPath, fileMode)
+            os.replace(tempPath, filePath)
+        except BaseException:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            raise
+
+
+outputWriter = OutputWriter()
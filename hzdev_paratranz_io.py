@@ -0,0 +1,182 @@
+import json
+import os
+import re
+from hashlib import md5
+from typing import List, Dict
+
+from dataModel import ParatranzDataUnit, JobFilter
+from hzdev_output import outputWriter
+from hzdev_pipeline import readSource
+from hzdev_profiler import profiler
+
+# 分片文件名：<原文件名去掉 .json>.shardNN.json
+SHARD_NAME_PATTERN = re.compile(r'^(.+)\.shard(\d+)\.json$')
+MAX_SHARD_COUNT = 256
+
+
+def shardKey(key: str) -> str:
+    """决定词条所在分片的键：CSV 词条（行ID$列名）按行分配，同一行的各列总在同一个分片中。"""
+    return key.rpartition('$')[0] or key
+
+
+def shardIndex(key: str, shardCount: int) -> int:
+    """词条所在的分片序号，只取决于键与分片数量。"""
+    return int.from_bytes(md5(shardKey(key).encode('UTF-8', 'surrogatepass')).digest()[:4], 'big') % shardCount
+
+
+class ParatranzFileIO:
+    """
+    中间文件的默认读写方式：每个中间文件是 Paratranz 可以直接上传的 JSON 文件。
+
+    所有提取器与写回处理器都通过这组方法读写中间文件，因此可以替换为其它存储方式（比如 `SQLiteUnitStore`），
+    替代实现需要提供相同的 `write` / `read` / `exists` / `remove` / `listFiles` 方法。文件路径始终是中间文件的绝对路径。
+
+    设置了词条数量或文件大小的上限时，超过上限的中间文件会被拆分为 `xxx.shard00.json`、`xxx.shard01.json` 等分片。
+    分片数量总是2的幂，词条按键的摘要分配（CSV 词条按行ID），因此只要分片数量不变，修改、增删词条都不会使其它词条换到别的分片；
+    分片数量翻倍时，每个分片的词条也只会拆分到两个分片中。读取时自动合并全部分片，`listFiles` 只列出合并后的文件名。
+    """
+
+    def __init__(self, paratranzPath: str, maxUnits: int = 0, maxBytes: int = 0):
+        """
+        :param paratranzPath: 中间文件目录。
+        :param maxUnits: 单个中间文件的词条数量上限，为0时不限制。
+        :param maxBytes: 单个中间文件的大小上限（字节），为0时不限制。
+        """
+        self.paratranzPath = paratranzPath
+        self.maxUnits = maxUnits
+        self.maxBytes = maxBytes
+
+    @property
+    def sharding(self) -> bool:
+        return self.maxUnits > 0 or self.maxBytes > 0
+
+    def write(self, filePath: str, units: List[ParatranzDataUnit], errors: str = 'strict'):
+        """
+        写入一个中间文件的全部词条，所在目录需要事先建立。
+
+        :param filePath: 中间文件的绝对路径。
+        :param units: 词条列表。
+        :param errors: 编码错误的处理方式。
+        """
+        with profiler.phase('serialize', 'json'):
+            tContent = json.dumps([x.asDict() for x in units], ensure_ascii=False, indent=4)
+            shards = self.__split(units, tContent, errors) if self.sharding else None
+        with profiler.phase('write'):
+            if shards is None:
+                hadShards = not os.path.isfile(filePath) and len(self.__shardPaths(filePath)) > 0
+                outputWriter.writeText(filePath, tContent, errors=errors)
+                if hadShards:
+                    self.__removeShards(filePath, set())
+                return
+            shardPaths = set()
+            for shardID, shardContent in shards.items():
+                shardPaths.add(self.shardPath(filePath, shardID))
+                outputWriter.writeText(self.shardPath(filePath, shardID), shardContent, errors=errors)
+            self.__removeShards(filePath, shardPaths)
+            if os.path.isfile(filePath):
+                os.remove(filePath)
+
+    def read(self, filePath: str, translatedOnly: bool = False) -> List[ParatranzDataUnit]:
+        """
+        读取一个中间文件的词条，保持文件中的顺序；文件被拆分时依次读取全部分片。
+
+        :param filePath: 中间文件的绝对路径。
+        :param translatedOnly: 只返回已翻译的词条。
+        """
+        filePaths = [filePath] if os.path.isfile(filePath) else self.__shardPaths(filePath)
+        result = []
+        with profiler.phase('parse', 'json'):
+            for tPath in filePaths:
+                result += [ParatranzDataUnit(**dataDict) for dataDict in json.loads(readSource(tPath))]
+        if translatedOnly:
+            result = [x for x in result if x.isTranslated]
+        return result
+
+    def exists(self, filePath: str) -> bool:
+        """中间文件（或其分片）是否存在。"""
+        return os.path.isfile(filePath) or len(self.__shardPaths(filePath)) > 0
+
+    def remove(self, filePath: str) -> bool:
+        """
+        删除中间文件及其全部分片，用于原文文件已被删除或移走的情况。
+
+        :return: 是否确实删除了文件。
+        """
+        existed = self.exists(filePath)
+        if os.path.isfile(filePath):
+            os.remove(filePath)
+        self.__removeShards(filePath, set())
+        return existed
+
+    def listFiles(self, jobFilter: JobFilter = None) -> List[str]:
+        """
+        列出所有中间文件，返回以'/'开头、相对于中间文件目录的路径；分片只以合并后的文件名列出一次。
+
+        :param jobFilter: 任务过滤器，不可能包含被选中文件的子目录不会被扫描。
+        """
+        result = {}
+        for dirPath, dirNames, fileNames in os.walk(self.paratranzPath):
+            relativeFolder = dirPath[len(self.paratranzPath):].replace(os.sep, '/')
+            if jobFilter is not None:
+                dirNames[:] = [x for x in dirNames if jobFilter.mayContain(f'{relativeFolder}/{x}')]
+            for fileName in fileNames:
+                matchResult = SHARD_NAME_PATTERN.match(fileName)
+                if matchResult is not None:
+                    fileName = matchResult.group(1) + '.json'
+                result[f'{relativeFolder}/{fileName}'] = None
+        return list(result)
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def shardPath(filePath: str, shardID: int) -> str:
+        """中间文件第 shardID 个分片的路径。"""
+        return f'{filePath.removesuffix(".json")}.shard{shardID:02d}.json'
+
+    def __split(self, units: List[ParatranzDataUnit], tContent: str, errors: str) -> Dict[int, str] | None:
+        """
+        计算分片并序列化各个分片，不需要拆分时返回 None。
+
+        分片数量从满足上限的最小的2的幂开始，键的分布不均匀导致某个分片仍然超过上限时继续翻倍，最多 `MAX_SHARD_COUNT` 个。
+        """
+        contentSize = len(tContent.encode('UTF-8', errors)) if self.maxBytes > 0 else 0
+        shardCount = 1
+        while (self.maxUnits > 0 and shardCount * self.maxUnits < len(units)) or \
+                (self.maxBytes > 0 and shardCount * self.maxBytes < contentSize):
+            shardCount *= 2
+        if shardCount == 1:
+            return None
+        while True:
+            groups: Dict[int, List[ParatranzDataUnit]] = {}
+            for unit in units:
+                groups.setdefault(shardIndex(unit.key, shardCount), []).append(unit)
+            shards = {shardID: json.dumps([x.asDict() for x in groups[shardID]], ensure_ascii=False, indent=4)
+                      for shardID in sorted(groups)}
+            if shardCount >= MAX_SHARD_COUNT or all(
+                    (self.maxUnits <= 0 or len(groups[x]) <= self.maxUnits) and
+                    (self.maxBytes <= 0 or len(shards[x].encode('UTF-8', errors)) <= self.maxBytes) for x in groups):
+                return shards
+            shardCount *= 2
+
+    @staticmethod
+    def __shardPaths(filePath: str) -> List[str]:
+        """已存在的分片，按分片序号排列。"""
+        dirPath, fileName = os.path.split(filePath)
+        baseName = fileName.removesuffix('.json')
+        try:
+            fileNames = os.listdir(dirPath)
+        except OSError:
+            return []
+        result = []
+        for tName in fileNames:
+            matchResult = SHARD_NAME_PATTERN.match(tName)
+            if matchResult is not None and matchResult.group(1) == baseName:
+                result.append((int(matchResult.group(2)), os.path.join(dirPath, tName)))
+        return [x[1] for x in sorted(result)]
+
+    def __removeShards(self, filePath: str, keepPaths: set):
+        """删除不再使用的分片（分片数量变化或不再拆分时）。"""
+        for tPath in self.__shardPaths(filePath):
+            if tPath not in keepPaths:
+                os.remove(tPath)
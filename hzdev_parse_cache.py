@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from hashlib import md5
+from typing import Any, Callable, Tuple
+
+
+class ParseCache:
+    """
+    以文本内容的摘要为键的解析结果缓存，可以在多个线程、多个项目之间共享。
+
+    命中时返回缓存对象的深拷贝，因此调用方可以放心地修改解析结果。缓存按最近最少使用的顺序淘汰，
+    条目数上限为0（默认）时不做任何缓存。
+    """
+
+    def __init__(self, maxEntries: int = 0):
+        self.__maxEntries = maxEntries
+        self.__entries: OrderedDict[Tuple[str, bytes], Any] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.__maxEntries > 0
+
+    def enable(self, maxEntries: int = 512):
+        """
+        启用缓存。
+
+        :param maxEntries: 最多缓存的解析结果数量。
+        """
+        with self.__lock:
+            self.__maxEntries = maxEntries
+            self.__trim()
+
+    def disable(self):
+        self.enable(0)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def load(self, backend: str, fileContent: str, parseFunc: Callable[[str], Any],
+             copyFunc: Callable[[Any], Any] = deepcopy) -> Any:
+        """
+        解析文本，内容相同的文本只会被同一个后端解析一次。
+
+        :param backend: 解析后端的名称，作为缓存键的一部分。
+        :param fileContent: 要解析的文本。
+        :param parseFunc: 解析函数。
+        :param copyFunc: 复制解析结果的函数，默认为深拷贝；结构已知时可以提供更快的复制方式。
+        """
+        if self.__maxEntries <= 0:
+            return parseFunc(fileContent)
+        cacheKey = (backend, md5(fileContent.encode('UTF-8', 'surrogatepass')).digest())
+        with self.__lock:
+            cached = self.__entries.get(cacheKey, self)
+            if cached is not self:
+                self.__entries.move_to_end(cacheKey)
+                self.hits += 1
+        if cached is not self:
+            return copyFunc(cached)
+        result = parseFunc(fileContent)
+        with self.__lock:
+            self.misses += 1
+            self.__entries[cacheKey] = copyFunc(result)
+            self.__trim()
+        return result
+
+    def __trim(self):
+        while len(self.__entries) > max(self.__maxEntries, 0):
+            self.__entries.popitem(last=False)
+
+
+parseCache = ParseCache()
@@ -0,0 +1,162 @@
+import io
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from dataModel import ProjectJob
+from hzdev_output import outputWriter
+
+_local = threading.local()  # 处理阶段中当前任务预读的输入文件
+
+
+def readSource(filePath: str) -> bytes:
+    """读取输入文件的全部字节。在流水线的处理阶段中，优先返回读取阶段已经预读的内容。"""
+    sources = getattr(_local, 'sources', None)
+    if sources is not None and filePath in sources:
+        return sources[filePath]
+    with open(filePath, 'rb') as tFile:
+        return tFile.read()
+
+
+def openSource(filePath: str, encoding: str = 'UTF-8', errors: str = 'strict') -> io.TextIOBase:
+    """
+    以文本方式打开输入文件，换行符的处理与内置 `open` 相同。
+    在流水线的处理阶段中，已预读的文件直接从内存中读取，其它情况下等同于内置 `open`。
+    """
+    sources = getattr(_local, 'sources', None)
+    if sources is not None and filePath in sources:
+        return io.TextIOWrapper(io.BytesIO(sources[filePath]), encoding=encoding, errors=errors)
+    return open(filePath, encoding=encoding, errors=errors)
+
+
+def _readInputs(filePaths: Iterable[str]) -> Dict[str, bytes]:
+    result = {}
+    for filePath in filePaths:
+        if os.path.isfile(filePath):
+            with open(filePath, 'rb') as tFile:
+                result[filePath] = tFile.read()
+    return result
+
+
+@contextmanager
+def sharedSources(filePaths: Iterable[str]) -> Iterator[None]:
+    """
+    在上下文中一次性读取输入文件，当前线程中的 `readSource` / `openSource` 直接使用读取的内容，
+    供需要多次读取同一批文件的任务使用（比如多语言写回）。已处于流水线的处理阶段时输入文件已经预读，不会重复读取。
+    """
+    if getattr(_local, 'sources', None) is not None:
+        yield
+        return
+    _local.sources = _readInputs(filePaths)
+    try:
+        yield
+    finally:
+        _local.sources = None
+
+
+def _runJob(job: ProjectJob, sources: Dict[str, bytes]) -> Tuple[bool, List[Tuple[str, bytes]]]:
+    _local.sources = sources
+    try:
+        with outputWriter.capture() as outputs:
+            handled = job.func()
+    finally:
+        _local.sources = None
+    return bool(handled), outputs
+
+
+def _flushOutputs(outputs: List[Tuple[str, bytes]]):
+    for filePath, content in outputs:
+        outputWriter.writeBytes(filePath, content)
+
+
+class StagedPipeline:
+    """
+    把任务拆分为读取、处理、写入三个阶段并发执行的流水线，适合磁盘（特别是网络存储）较慢的工作区。
+
+    读取阶段在 I/O 线程中预读每个任务声明的输入文件（`ProjectJob.inputs`）；处理阶段在处理线程中执行任务本身，
+    任务通过 `openSource` / `readSource` 读取预读的内容，所有输出文件经 `outputWriter.capture` 暂存在内存中；
+    写入阶段再在 I/O 线程中把暂存的输出交给 `outputWriter` 写入。阶段之间以有界队列连接，
+    同时驻留在内存中的任务数量不超过两个队列的容量与处理线程数之和。
+
+    没有声明输入文件的任务（比如装配与战役）照常自行读取文件。任务的执行顺序不确定，但任务之间本来就没有依赖。
+    处理阶段使用线程池而不是进程池：处理器是项目实例的方法，共享着分派表、提取阶段与中间文件的读写方式。
+    """
+
+    def __init__(self, prefetch: int = 8, workers: int = None, readers: int = 4, writers: int = 4):
+        """
+        :param prefetch: 每个队列的容量，即最多预读（或等待写入）的任务数量。
+        :param workers: 处理线程数，不指定则使用 CPU 核心数。
+        :param readers: 同时读取文件的任务数量。
+        :param writers: 同时写入文件的任务数量。
+        """
+        if prefetch < 1 or readers < 1 or writers < 1 or (workers is not None and workers < 1):
+            raise RuntimeError('流水线的队列容量与各阶段的并发数必须大于0')
+        self.prefetch = prefetch
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.readers = readers
+        self.writers = writers
+
+    def run(self, jobs: Iterable[ProjectJob]) -> int:
+        """
+        执行全部任务，返回实际处理了文件的任务数量。
+
+        某个任务失败时其它任务照常完成，全部结束后再抛出第一个失败任务的异常。
+        """
+        import asyncio
+
+        return asyncio.run(self.__run(list(jobs)))
+
+    async def __run(self, jobs: List[ProjectJob]) -> int:
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        loop = asyncio.get_running_loop()
+        readQueue = asyncio.Queue(self.prefetch)
+        writeQueue = asyncio.Queue(self.prefetch)
+        jobIterator = iter(jobs)
+        errors: List[BaseException] = []
+        handledCount = 0
+
+        with ThreadPoolExecutor(self.readers + self.writers, 'pipeline-io') as ioPool, \
+                ThreadPoolExecutor(self.workers, 'pipeline-cpu') as cpuPool:
+            async def readStage():
+                for job in jobIterator:
+                    try:
+                        sources = await loop.run_in_executor(ioPool, _readInputs, job.inputs)
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    await readQueue.put((job, sources))
+
+            async def processStage():
+                nonlocal handledCount
+                while (item := await readQueue.get()) is not None:
+                    try:
+                        handled, outputs = await loop.run_in_executor(cpuPool, _runJob, *item)
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    handledCount += handled
+                    if len(outputs) > 0:
+                        await writeQueue.put(outputs)
+
+            async def writeStage():
+                while (outputs := await writeQueue.get()) is not None:
+                    try:
+                        await loop.run_in_executor(ioPool, _flushOutputs, outputs)
+                    except Exception as e:
+                        errors.append(e)
+
+            writeTasks = [asyncio.create_task(writeStage()) for _ in range(self.writers)]
+            processTasks = [asyncio.create_task(processStage()) for _ in range(self.workers)]
+            await asyncio.gather(*(readStage() for _ in range(self.readers)))
+            for _ in processTasks:
+                await readQueue.put(None)
+            await asyncio.gather(*processTasks)
+            for _ in writeTasks:
+                await writeQueue.put(None)
+            await asyncio.gather(*writeTasks)
+        if len(errors) > 0:
+            raise errors[0]
+        return handledCount
@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from os.path import isfile, getsize
+from typing import List, Dict, Iterable
+
+from hzdev_lazy import LazyModule
+
+# 只有启用内存统计时才需要 tracemalloc
+tracemalloc = LazyModule('tracemalloc')
+
+# 设置该环境变量即可启用统计，其值为报告文件的路径（值为 1 时使用默认路径）
+PROFILE_ENV_NAME = 'HZDEV_PROFILE'
+DEFAULT_REPORT_PATH = 'profile_report.json'
+
+
+class JobRecord:
+    """一次任务（一个处理器调用、一个 CSV 配置或一个特殊处理流程）的统计数据。"""
+    __slots__ = ('name', 'category', 'target', 'wallTime', 'phases', 'bytesRead', 'bytesWritten', 'units',
+                 'backends', 'memoryPeak', '_outputs', '_startTime')
+
+    def __init__(self, name: str, category: str, target: str):
+        self.name = name  # 处理器名称或配置名称
+        self.category = category  # 任务类别：handler / csv / pass
+        self.target = target  # 任务处理的文件
+        self.wallTime = 0.0
+        self.phases: Dict[str, float] = {}  # 各阶段（read / parse / serialize / write）的耗时
+        self.bytesRead = 0
+        self.bytesWritten = 0
+        self.units = 0  # 产出（或读入）的词条数量
+        self.backends: List[str] = []  # 使用过的解析后端
+        self.memoryPeak = 0  # tracemalloc 统计的内存峰值，未启用内存统计时为0
+        self._outputs: Iterable[str] = ()
+        self._startTime = 0.0
+
+    def asDict(self):
+        return dict(name=self.name, category=self.category, target=self.target, wallTime=self.wallTime,
+                    phases=self.phases, bytesRead=self.bytesRead, bytesWritten=self.bytesWritten, units=self.units,
+                    backends=self.backends, memoryPeak=self.memoryPeak)
+
+
+class Profiler:
+    """
+    按任务统计耗时、读写字节数、词条数量、解析后端与内存峰值的性能统计器。
+
+    未启用时，`job` 与 `phase` 只返回一个共享的空上下文，其它方法直接返回，几乎没有额外开销。
+    """
+    __nullContext = nullcontext()
+
+    def __init__(self):
+        self.__enabled = False
+        self.__traceMemory = False
+        self.__reportPath = DEFAULT_REPORT_PATH
+        self.__records: List[JobRecord] = []
+        self.__local = threading.local()  # 每个线程各自的任务栈，并发执行任务时互不干扰
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    @property
+    def records(self) -> List[JobRecord]:
+        return self.__records
+
+    @property
+    def __stack(self) -> List[JobRecord]:
+        stack = getattr(self.__local, 'stack', None)
+        if stack is None:
+            stack = self.__local.stack = []
+        return stack
+
+    def enable(self, reportPath: str = DEFAULT_REPORT_PATH, traceMemory: bool = True):
+        """
+        启用统计。
+
+        :param reportPath: 报告文件的输出路径。
+        :param traceMemory: 是否使用 tracemalloc 统计内存峰值（会明显拖慢运行速度）。
+        """
+        self.__enabled = True
+        self.__reportPath = reportPath
+        self.__traceMemory = traceMemory
+        if traceMemory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.__enabled = False
+        if self.__traceMemory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.__traceMemory = False
+
+    def reset(self):
+        self.__records = []
+        self.__local = threading.local()
+
+    def job(self, name: str, category: str, target: str = '', inputs: Iterable[str] = (),
+            outputs: Iterable[str] = ()):
+        """
+        统计一次任务，以 with 语句使用。
+
+        :param name: 处理器名称或配置名称。
+        :param category: 任务类别。
+        :param target: 任务处理的文件。
+        :param inputs: 任务读取的文件，用于统计读入字节数。
+        :param outputs: 任务写入的文件，用于统计写出字节数。
+        """
+        if not self.__enabled:
+            return self.__nullContext
+        return self.__job(name, category, target, inputs, outputs)
+
+    @contextmanager
+    def __job(self, name: str, category: str, target: str, inputs: Iterable[str], outputs: Iterable[str]):
+        record = JobRecord(name, category, target)
+        record.bytesRead = sum(getsize(x) for x in inputs if isinstance(x, str) and isfile(x))
+        record._outputs = outputs
+        if self.__traceMemory:
+            if self.__stack:  # 嵌套任务会重置峰值，先把外层任务当前的峰值记下来
+                self.__stack[-1].memoryPeak = max(self.__stack[-1].memoryPeak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self.__stack.append(record)
+        record._startTime = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wallTime = time.perf_counter() - record._startTime
+            self.__stack.pop()
+            record.bytesWritten = sum(getsize(x) for x in record._outputs if isinstance(x, str) and isfile(x))
+            if self.__traceMemory:
+                record.memoryPeak = max(record.memoryPeak, tracemalloc.get_traced_memory()[1])
+                if self.__stack:
+                    self.__stack[-1].memoryPeak = max(self.__stack[-1].memoryPeak, record.memoryPeak)
+            self.__records.append(record)
+
+    def phase(self, phaseName: str, backend: str = None):
+        """
+        统计当前任务中的一个阶段，以 with 语句使用。
+
+        :param phaseName: 阶段名称（read / parse / serialize / write）。
+        :param backend: 该阶段使用的解析后端，比如 json5 / hjson / json / csv。
+        """
+        if not self.__enabled or not self.__stack:
+            return self.__nullContext
+        if backend is not None and backend not in self.__stack[-1].backends:
+            self.__stack[-1].backends.append(backend)
+        return self.__phase(self.__stack[-1], phaseName)
+
+    @staticmethod
+    @contextmanager
+    def __phase(record: JobRecord, phaseName: str):
+        startTime = time.perf_counter()
+        try:
+            yield
+        finally:
+            record.phases[phaseName] = record.phases.get(phaseName, 0.0) + time.perf_counter() - startTime
+
+    def addUnits(self, number: int):
+        """为当前任务累加词条数量。"""
+        if not self.__enabled or not self.__stack:
+            return
+        self.__stack[-1].units += number
+
+    def summary(self) -> List[dict]:
+        """按任务名称汇总统计数据，按总耗时降序排列。"""
+        result: Dict[str, dict] = {}
+        for record in self.__records:
+            unit = result.setdefault(record.name, dict(name=record.name, category=record.category, calls=0,
+                                                       wallTime=0.0, phases={}, bytesRead=0, bytesWritten=0,
+                                                       units=0, backends=[], memoryPeak=0))
+            unit['calls'] += 1
+            unit['wallTime'] += record.wallTime
+            for phaseName, phaseTime in record.phases.items():
+                unit['phases'][phaseName] = unit['phases'].get(phaseName, 0.0) + phaseTime
+            unit['bytesRead'] += record.bytesRead
+            unit['bytesWritten'] += record.bytesWritten
+            unit['units'] += record.units
+            unit['backends'] += [x for x in record.backends if x not in unit['backends']]
+            unit['memoryPeak'] = max(unit['memoryPeak'], record.memoryPeak)
+        return sorted(result.values(), key=lambda x: x['wallTime'], reverse=True)
+
+    def report(self, topNumber: int = 15):
+        """
+        打印耗时最多的任务表格，并把完整的统计数据写入报告文件，之后清空已有的统计数据。未启用统计时不做任何事。
+
+        :param topNumber: 表格中显示的行数。
+        """
+        if not self.__enabled or len(self.__records) == 0:
+            return
+        summary = self.summary()
+        print(f'{"任务":<36}{"类别":<9}{"次数":>6}{"耗时(s)":>10}{"读入(KB)":>11}{"写出(KB)":>11}{"词条":>8}'
+              f'{"内存峰值(KB)":>14}  解析后端')
+        for unit in summary[:topNumber]:
+            print(f'{unit["name"][:35]:<36}{unit["category"]:<9}{unit["calls"]:>6}{unit["wallTime"]:>10.3f}'
+                  f'{unit["bytesRead"] / 1024:>11.1f}{unit["bytesWritten"] / 1024:>11.1f}{unit["units"]:>8}'
+                  f'{unit["memoryPeak"] / 1024:>14.1f}  {",".join(unit["backends"])}')
+        with open(self.__reportPath, 'w', encoding='UTF-8') as tFile:
+            json.dump({'summary': summary, 'jobs': [x.asDict() for x in self.__records]}, tFile, ensure_ascii=False,
+                      indent=4)
+        print(f'性能统计报告已写入 {self.__reportPath}。')
+        self.reset()
+
+
+profiler = Profiler()
+if os.environ.get(PROFILE_ENV_NAME):
+    profiler.enable(DEFAULT_REPORT_PATH if os.environ[PROFILE_ENV_NAME] == '1' else os.environ[PROFILE_ENV_NAME])
@@ -0,0 +1,298 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from hashlib import md5
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from dataModel import ParatranzDataUnit
+from hzdev_stages import ExtractionStages
+
+SCHEMA_SQL = '''
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    stamp TEXT,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    file INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    stage INTEGER NOT NULL,
+    original TEXT,
+    translation TEXT
+);
+CREATE INDEX IF NOT EXISTS units_file ON units (file);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term INTEGER NOT NULL,
+    unit INTEGER NOT NULL,
+    fields INTEGER NOT NULL,
+    PRIMARY KEY (term, unit)
+) WITHOUT ROWID;
+'''
+
+# 词条中被索引的字段，postings.fields 是二者的位掩码
+FIELD_ORIGINAL = 1
+FIELD_TRANSLATION = 2
+FIELD_MASKS = {'original': FIELD_ORIGINAL, 'translation': FIELD_TRANSLATION, 'all': FIELD_ORIGINAL | FIELD_TRANSLATION}
+
+# 中日韩文字没有空格分词，连续的一段文字按相邻两字（bigram）切分；其它文字按单词切分，不区分大小写
+_CJK_RANGES = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+_TOKEN_PATTERN = re.compile(f'([{_CJK_RANGES}]+)|([^\\W{_CJK_RANGES}]+)')
+
+
+def tokenize(text: str | None) -> List[str]:
+    """把文本切分为索引词：单词（小写）与中日韩文字的相邻两字，只有一个字的中文片段保留为单字。"""
+    result = []
+    if not text:
+        return result
+    for cjkRun, word in _TOKEN_PATTERN.findall(text.casefold()):
+        if word:
+            result.append(word)
+        elif len(cjkRun) == 1:
+            result.append(cjkRun)
+        else:
+            result += [cjkRun[x:x + 2] for x in range(len(cjkRun) - 1)]
+    return result
+
+
+def _normalizePhrase(text: str) -> str:
+    return ' '.join(text.casefold().split())
+
+
+class SearchHit(NamedTuple):
+    """一条检索结果。file 是中间文件相对于中间文件目录的路径。"""
+    file: str
+    key: str
+    stage: int
+    original: str | None
+    translation: str | None
+
+
+class SearchIndex:
+    """
+    全部中间词条的全文检索索引（倒排索引），存储在一个 SQLite 数据库中。
+
+    原文与译文切分为索引词（见 `tokenize`）后，每个 (索引词, 词条) 只占一行不带 rowid 的记录，并以位掩码记录出现在哪个字段中。
+    查询时先由各索引词的倒排列表求交集，再在候选词条中确认整个短语确实出现，因此几百个中间文件中的查询也只需几毫秒。
+
+    索引按中间文件整体更新：文件的修改时间与大小未变时不读取文件，词条内容的摘要未变时不重建索引，
+    因此每次提取或查询之前都可以低成本地调用 `update`。
+    """
+
+    def __init__(self, indexPath: str, paratranzPath: str):
+        """
+        :param indexPath: 索引数据库的路径，不存在时自动创建。
+        :param paratranzPath: 中间文件目录，用于换算中间文件的相对路径。
+        """
+        self.indexPath = indexPath
+        self.paratranzPath = paratranzPath
+        os.makedirs(os.path.dirname(os.path.abspath(indexPath)), exist_ok=True)
+        self.__connection = sqlite3.connect(indexPath)
+        self.__connection.execute('PRAGMA journal_mode = WAL')
+        self.__connection.execute('PRAGMA synchronous = NORMAL')
+        self.__connection.executescript(SCHEMA_SQL)
+        self.__termIDs: Dict[str, int] | None = None
+        self.__pendingLock = threading.Lock()
+        self.__pendingFiles: Set[str] = set()
+
+    def __len__(self):
+        return self.__connection.execute('SELECT COUNT(*) FROM units').fetchone()[0]
+
+    def __relativePath(self, filePath: str) -> str:
+        filePath = os.path.abspath(filePath)
+        paratranzPath = os.path.abspath(self.paratranzPath)
+        if filePath.startswith(paratranzPath + os.sep):
+            filePath = filePath[len(paratranzPath):]
+        return filePath.replace(os.sep, '/')
+
+    def __absolutePath(self, relativePath: str) -> str:
+        return self.paratranzPath + relativePath.replace('/', os.sep)
+
+    @staticmethod
+    def __stamp(filePath: str) -> str | None:
+        """JSON 中间文件的修改时间与大小；文件被拆分为分片或使用 SQLite 词条库时没有，此时总是比较词条摘要。"""
+        try:
+            stat = os.stat(filePath)
+        except OSError:
+            return None
+        return f'{stat.st_mtime_ns}:{stat.st_size}'
+
+    @staticmethod
+    def __digest(units: List[ParatranzDataUnit]) -> str:
+        return md5(json.dumps([(x.key, x.original, x.translation, x.stage) for x in units],
+                              ensure_ascii=False).encode('UTF-8', 'surrogatepass')).hexdigest()
+
+    def install(self, stages: ExtractionStages):
+        """注册为提取阶段的处理器，记录本次提取写入的中间文件，提取结束后由 `updatePending` 更新索引。"""
+        stages.register(self)
+
+    def __call__(self, filePath: str, units: List[ParatranzDataUnit]):
+        with self.__pendingLock:
+            self.__pendingFiles.add(self.__relativePath(filePath))
+
+    def updatePending(self, unitIO) -> int:
+        """更新本次提取写入过的中间文件的索引（词条以写入后的中间文件为准），返回重建了索引的文件数量。"""
+        with self.__pendingLock:
+            relativePaths, self.__pendingFiles = sorted(self.__pendingFiles), set()
+        return self.update(unitIO, relativePaths)
+
+    def update(self, unitIO, relativePaths: Iterable[str] = None) -> int:
+        """
+        按中间文件的当前内容增量更新索引。
+
+        :param unitIO: 中间文件的读写方式（`ParatranzFileIO` 或 `SQLiteUnitStore`）。
+        :param relativePaths: 只更新这些中间文件（以'/'开头的相对路径）；不指定时更新全部文件，并移除已不存在的文件。
+        :return: 重建了索引的文件数量。
+        """
+        if relativePaths is None:
+            relativePaths = [x for x in unitIO.listFiles() if x.endswith('.json')]
+            for relativePath in set(self.__indexedFiles()) - set(relativePaths):
+                self.__removeFile(relativePath)
+        updatedCount = 0
+        for relativePath in relativePaths:
+            filePath = self.__absolutePath(relativePath)
+            stamp = self.__stamp(filePath)
+            row = self.__connection.execute('SELECT id, stamp, digest FROM files WHERE path = ?',
+                                            (relativePath,)).fetchone()
+            if row is not None and stamp is not None and row[1] == stamp:
+                continue
+            if not unitIO.exists(filePath):
+                if row is not None:
+                    self.__removeFile(relativePath)
+                continue
+            units = unitIO.read(filePath)
+            digest = self.__digest(units)
+            if row is not None and row[2] == digest:
+                with self.__connection:
+                    self.__connection.execute('UPDATE files SET stamp = ? WHERE id = ?', (stamp, row[0]))
+                continue
+            self.__indexFile(relativePath, stamp, digest, units)
+            updatedCount += 1
+        return updatedCount
+
+    def __indexedFiles(self) -> List[str]:
+        return [x[0] for x in self.__connection.execute('SELECT path FROM files')]
+
+    def __loadTermIDs(self) -> Dict[str, int]:
+        if self.__termIDs is None:
+            self.__termIDs = dict(self.__connection.execute('SELECT term, id FROM terms'))
+        return self.__termIDs
+
+    @staticmethod
+    def __unitTerms(original: str | None, translation: str | None) -> Dict[str, int]:
+        """词条的索引词及其所在字段的位掩码。"""
+        result = dict.fromkeys(tokenize(original), FIELD_ORIGINAL)
+        for term in tokenize(translation):
+            result[term] = result.get(term, 0) | FIELD_TRANSLATION
+        return result
+
+    def __deleteFileRows(self, fileID: int):
+        """删除一个文件的词条及其倒排记录。倒排记录由词条保存的文本重新切分得到，因此不需要按词条建立的二级索引。"""
+        termIDs = self.__loadTermIDs()
+        rows = self.__connection.execute('SELECT id, original, translation FROM units WHERE file = ?',
+                                         (fileID,)).fetchall()
+        self.__connection.executemany('DELETE FROM postings WHERE term = ? AND unit = ?',
+                                      [(termIDs[term], unitID) for unitID, original, translation in rows
+                                       for term in self.__unitTerms(original, translation) if term in termIDs])
+        self.__connection.execute('DELETE FROM units WHERE file = ?', (fileID,))
+
+    def __removeFile(self, relativePath: str):
+        row = self.__connection.execute('SELECT id FROM files WHERE path = ?', (relativePath,)).fetchone()
+        if row is None:
+            return
+        with self.__connection:
+            self.__deleteFileRows(row[0])
+            self.__connection.execute('DELETE FROM files WHERE id = ?', (row[0],))
+
+    def __indexFile(self, relativePath: str, stamp: str | None, digest: str, units: List[ParatranzDataUnit]):
+        termIDs = self.__loadTermIDs()
+        with self.__connection:
+            row = self.__connection.execute('SELECT id FROM files WHERE path = ?', (relativePath,)).fetchone()
+            if row is None:
+                fileID = self.__connection.execute('INSERT INTO files (path, stamp, digest) VALUES (?, ?, ?)',
+                                                   (relativePath, stamp, digest)).lastrowid
+            else:
+                fileID = row[0]
+                self.__deleteFileRows(fileID)
+                self.__connection.execute('UPDATE files SET stamp = ?, digest = ? WHERE id = ?',
+                                          (stamp, digest, fileID))
+            postings = []
+            for unit in units:
+                original = unit.original if isinstance(unit.original, str) else None
+                translation = unit.translation or None
+                unitID = self.__connection.execute(
+                    'INSERT INTO units (file, key, stage, original, translation) VALUES (?, ?, ?, ?, ?)',
+                    (fileID, unit.key, unit.stage, original, translation)).lastrowid
+                for term, fields in self.__unitTerms(original, translation).items():
+                    termID = termIDs.get(term)
+                    if termID is None:
+                        termID = termIDs[term] = self.__connection.execute('INSERT INTO terms (term) VALUES (?)',
+                                                                           (term,)).lastrowid
+                    postings.append((termID, unitID, fields))
+            self.__connection.executemany('INSERT INTO postings (term, unit, fields) VALUES (?, ?, ?)', postings)
+
+    def __matchTermIDs(self, term: str) -> List[int]:
+        """查询词对应的索引词。单个中文字符还要匹配包含它的所有相邻两字。"""
+        if len(term) == 1 and _TOKEN_PATTERN.fullmatch(term).group(1):
+            sql = ('SELECT id FROM terms WHERE term = ? '
+                   'OR (length(term) = 2 AND (substr(term, 1, 1) = ? OR substr(term, 2, 1) = ?))')
+            return [x[0] for x in self.__connection.execute(sql, (term, term, term))]
+        row = self.__connection.execute('SELECT id FROM terms WHERE term = ?', (term,)).fetchone()
+        return [row[0]] if row is not None else []
+
+    def search(self, query: str, field: str = 'all', stages: Iterable[int] = (), limit: int = 50,
+               phrase: bool = True) -> List[SearchHit]:
+        """
+        查找包含查询文本的词条，按中间文件与文件中的顺序排列。
+
+        :param query: 查询文本。
+        :param field: 在哪个字段中查找：'original'、'translation' 或 'all'。
+        :param stages: 只返回这些状态的词条，不指定时不限制。
+        :param limit: 最多返回的数量，为0时不限制。
+        :param phrase: 是否要求查询文本作为整体出现（不区分大小写，连续的空白视为一个空格）；为 False 时只要求各个词都出现。
+        """
+        fieldMask = FIELD_MASKS[field]
+        terms = list(dict.fromkeys(tokenize(query)))
+        if len(terms) == 0:
+            return []
+        subQueries, parameters = [], []
+        for term in terms:
+            termIDs = self.__matchTermIDs(term)
+            if len(termIDs) == 0:
+                return []
+            subQueries.append(f'SELECT unit FROM postings WHERE term IN ({",".join("?" * len(termIDs))}) '
+                              f'AND fields & ?')
+            parameters += termIDs + [fieldMask]
+        sql = ('SELECT files.path, units.key, units.stage, units.original, units.translation FROM units '
+               'JOIN files ON files.id = units.file WHERE units.id IN (' + ' INTERSECT '.join(subQueries) + ')')
+        stages = tuple(stages)
+        if len(stages) > 0:
+            sql += f' AND units.stage IN ({",".join("?" * len(stages))})'
+            parameters += stages
+        sql += ' ORDER BY files.path, units.id'
+        queryPhrase = _normalizePhrase(query)
+        result = []
+        for hit in map(SearchHit._make, self.__connection.execute(sql, parameters)):
+            if phrase and not any(text and queryPhrase in _normalizePhrase(text) for text, mask in
+                                  ((hit.original, FIELD_ORIGINAL), (hit.translation, FIELD_TRANSLATION))
+                                  if fieldMask & mask):
+                continue
+            result.append(hit)
+            if 0 < limit <= len(result):
+                break
+        return result
+
+    def stats(self) -> Tuple[int, int, int]:
+        """(文件数量, 词条数量, 索引词数量)"""
+        return tuple(self.__connection.execute('SELECT COUNT(*) FROM ' + x).fetchone()[0]
+                     for x in ('files', 'units', 'terms'))
+
+    def close(self):
+        self.__connection.close()
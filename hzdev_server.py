@@ -0,0 +1,333 @@
+import json
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import sep
+from os.path import isfile
+from typing import Dict, Iterable, List, Tuple
+
+from dataModel import JobFilter, ProjectJob
+from hzdev_parse_cache import parseCache
+from hzdev_profiler import profiler
+
+ACTIONS = ('extract', 'writeback')
+
+
+class ServerJob:
+    """
+    服务模式中的一次提取或写回请求，由若干个 `ProjectJob` 组成，这些任务与其它请求的任务共享同一个线程池。
+
+    状态依次为 queued（等待线程）→ running → finished / failed（有任务失败）。
+    """
+
+    def __init__(self, jobID: int, action: str, paths: Tuple[str, ...], taskCount: int):
+        self.jobID = jobID
+        self.action = action
+        self.paths = paths
+        self.taskCount = taskCount
+        self.doneCount = 0
+        self.handledCount = 0
+        self.failures: List[Tuple[str, str]] = []  # (任务名称, 错误信息)
+        self.createdTime = time.time()
+        self.startTime: float | None = None
+        self.endTime: float | None = None
+        self.finished = threading.Event()
+        self.__lock = threading.Lock()
+        if taskCount == 0:
+            self.endTime = self.createdTime
+            self.finished.set()
+
+    @property
+    def state(self) -> str:
+        if self.finished.is_set():
+            return 'failed' if len(self.failures) > 0 else 'finished'
+        return 'running' if self.startTime is not None else 'queued'
+
+    def taskStarted(self):
+        with self.__lock:
+            if self.startTime is None:
+                self.startTime = time.time()
+
+    def taskDone(self, taskName: str, handled: bool, errorText: str = None) -> bool:
+        """记录一个任务的结果，返回这是否是本请求的最后一个任务；是时由调用方在收尾后设置 `finished`。"""
+        with self.__lock:
+            self.doneCount += 1
+            self.handledCount += handled
+            if errorText is not None:
+                self.failures.append((taskName, errorText))
+            if self.doneCount < self.taskCount:
+                return False
+            self.endTime = time.time()
+        return True
+
+    def asDict(self) -> dict:
+        with self.__lock:
+            return dict(id=self.jobID, action=self.action, paths=list(self.paths), state=self.state,
+                        tasks=self.taskCount, done=self.doneCount, handled=self.handledCount,
+                        failures=[dict(task=x[0], error=x[1]) for x in self.failures],
+                        created=self.createdTime, started=self.startTime, ended=self.endTime,
+                        elapsed=round(self.endTime - (self.startTime or self.createdTime), 3)
+                        if self.endTime is not None else None)
+
+
+class ProjectServer:
+    """
+    长时间运行的项目服务：处理器实例、已编译的分派表、目录扫描结果与解析缓存在多次请求之间保持有效，
+    省去每次运行命令时的解释器启动、模块导入、目录扫描与冷缓存的开销。
+
+    每个请求只选出范围内的任务（见 `submit`），所有请求的任务提交到同一个线程池，因此多个请求可以同时执行。
+    提取完成后会丢弃中间文件列表，以便写回时能找到新产生的中间文件；原文有增删时由 `invalidate` 重新扫描。
+    术语表只在启动与 `invalidate` 时加载，不会在任务执行期间被替换。
+    """
+
+    def __init__(self, project, maxWorkers: int = None, parseCacheEntries: int = 512, maxHistory: int = 100):
+        """
+        :param project: `ParatranzProject` 实例。
+        :param maxWorkers: 共享线程池的大小，不指定则由 ThreadPoolExecutor 决定。
+        :param parseCacheEntries: 解析缓存的条目上限，为0时不缓存。
+        :param maxHistory: 最多保留的已完成请求数量，更早的请求不再能查询状态。
+        """
+        self.project = project
+        self.maxWorkers = maxWorkers or min(32, (os.cpu_count() or 1) + 4)  # 与 ThreadPoolExecutor 的默认值相同
+        self.parseCacheEntries = parseCacheEntries
+        self.maxHistory = maxHistory
+        self.startedTime = time.time()
+        self.__pool = ThreadPoolExecutor(self.maxWorkers, thread_name_prefix='hzdev_server')
+        self.__buildLock = threading.Lock()  # 构建任务会读写项目的目录扫描缓存与提取阶段处理器，需要串行
+        self.__jobsLock = threading.Lock()
+        self.__jobs: OrderedDict[int, ServerJob] = OrderedDict()
+        self.__nextJobID = 1
+        if parseCacheEntries > 0:
+            parseCache.enable(parseCacheEntries)
+        self.project.ReloadGlossary()
+
+    def __selectTasks(self, isWriteback: bool, scopeFilter: JobFilter | None) -> List[ProjectJob]:
+        tasks = self.project.BuildJobs(isWriteback, loadGlossary=False)
+        if scopeFilter is None:
+            return tasks
+        originalPath = self.project.Paths.originalPath
+        result = []
+        for task in tasks:
+            if len(task.inputs) == 0:  # 战役与装配：汇总处理整个目录
+                selected = scopeFilter.mayContain(f'data/{task.name}')
+            else:
+                selected = scopeFilter.matchPath(task.inputs[0][len(originalPath):].replace(sep, '/'))
+            if selected:
+                result.append(task)
+        return result
+
+    def __hasUnscannedFiles(self, paths: Iterable[str], tasks: List[ProjectJob]) -> bool:
+        """请求中明确指定、确实存在，却没有对应任务的原文文件：多半是启动后新增的文件，需要重新扫描原文目录。"""
+        originalPath = self.project.Paths.originalPath
+        coveredPaths = {x.inputs[0][len(originalPath):].replace(sep, '/').lstrip('/') for x in tasks
+                        if len(x.inputs) > 0}
+        for path in paths:
+            path = path.replace('\\', '/').strip('/')
+            if any(x in path for x in '*?[') or path.startswith(('data/missions/', 'data/variants/')):
+                continue
+            if path not in coveredPaths and isfile(originalPath + sep + path.replace('/', sep)):
+                return True
+        return False
+
+    def submit(self, action: str, paths: Iterable[str] = ()) -> ServerJob:
+        """
+        提交一次提取或写回请求，立即返回，任务在共享线程池中执行。
+
+        :param action: 'extract' 或 'writeback'。
+        :param paths: 处理范围：相对于原文目录的文件、目录或通配符模式（与 `JobFilter` 的 include 相同），为空时处理全部内容。
+        :raise RuntimeError: action 不是支持的操作时抛出。
+        """
+        if action not in ACTIONS:
+            raise RuntimeError(f'不支持的操作：{action}')
+        paths = tuple(paths)
+        isWriteback = action == 'writeback'
+        scopeFilter = JobFilter(paths) if len(paths) > 0 else None
+        with self.__buildLock:
+            tasks = self.__selectTasks(isWriteback, scopeFilter)
+            if scopeFilter is not None and self.__hasUnscannedFiles(paths, tasks):
+                self.project.InvalidateCaches()
+                tasks = self.__selectTasks(isWriteback, scopeFilter)
+        with self.__jobsLock:
+            job = ServerJob(self.__nextJobID, action, paths, len(tasks))
+            self.__nextJobID += 1
+            self.__jobs[job.jobID] = job
+            self.__trimHistory()
+        for task in tasks:
+            self.__pool.submit(self.__runTask, job, task)
+        return job
+
+    def __runTask(self, job: ServerJob, task: ProjectJob):
+        job.taskStarted()
+        handled, errorText = False, None
+        try:
+            handled = bool(task.func())
+        except Exception:
+            errorText = traceback.format_exc()
+        if not job.taskDone(task.name, handled, errorText):
+            return
+        if job.action == 'extract':
+            with self.__buildLock:
+                self.project.InvalidateCaches(originals=False)
+        job.finished.set()
+
+    def __trimHistory(self):
+        finishedIDs = [x.jobID for x in self.__jobs.values() if x.finished.is_set()]
+        for jobID in finishedIDs[:max(len(finishedIDs) - self.maxHistory, 0)]:
+            del self.__jobs[jobID]
+
+    def job(self, jobID: int) -> ServerJob | None:
+        with self.__jobsLock:
+            return self.__jobs.get(jobID)
+
+    def jobs(self) -> List[ServerJob]:
+        with self.__jobsLock:
+            return list(self.__jobs.values())
+
+    def invalidate(self) -> dict:
+        """丢弃目录扫描结果与解析缓存并重新加载术语表。已编译的分派表只取决于处理器配置，保持不变。"""
+        with self.__buildLock:
+            self.project.InvalidateCaches()
+            self.project.ReloadGlossary()
+        hits, misses = parseCache.hits, parseCache.misses
+        parseCache.clear()
+        return dict(parseCacheHits=hits, parseCacheMisses=misses)
+
+    def status(self) -> dict:
+        jobStates: Dict[str, int] = {}
+        for job in self.jobs():
+            jobStates[job.state] = jobStates.get(job.state, 0) + 1
+        paths = self.project.Paths
+        return dict(originalPath=paths.originalPath, translationPath=paths.translationPath,
+                    paratranzPath=paths.paratranzPath, uptime=round(time.time() - self.startedTime, 3),
+                    workers=self.maxWorkers, jobs=jobStates,
+                    parseCache=dict(enabled=parseCache.enabled, hits=parseCache.hits, misses=parseCache.misses))
+
+    def close(self):
+        """等待已提交的任务完成并关闭线程池。"""
+        self.__pool.shutdown(wait=True)
+        if self.parseCacheEntries > 0:
+            parseCache.disable()
+            parseCache.clear()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP 接口，请求与响应的正文均为 JSON：
+        GET  /status               服务状态（目录、线程池、解析缓存、各状态的请求数量）
+        GET  /jobs                 所有保留的请求
+        GET  /jobs/<id>            某个请求的状态
+        POST /extract              提取，正文 {"paths": [...], "wait": false}，paths 为空或省略时处理全部内容
+        POST /writeback            写回，正文同上；wait 为 true 时等到全部任务完成后才返回
+        POST /invalidate           丢弃目录扫描结果与解析缓存，重新加载术语表
+        POST /shutdown             等待已提交的任务完成后退出
+    """
+    server: '_ProjectHTTPServer'
+
+    def __sendJSON(self, statusCode: int, content):
+        body = json.dumps(content, ensure_ascii=False, indent=4).encode('UTF-8')
+        self.send_response(statusCode)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def __readJSON(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length == 0:
+            return {}
+        content = json.loads(self.rfile.read(length).decode('UTF-8'))
+        if not isinstance(content, dict):
+            raise ValueError('请求正文应当是一个 JSON 对象。')
+        return content
+
+    def do_GET(self):
+        projectServer = self.server.projectServer
+        route = self.path.rstrip('/').split('?')[0]
+        if route == '/status':
+            self.__sendJSON(200, projectServer.status())
+        elif route == '/jobs':
+            self.__sendJSON(200, [x.asDict() for x in projectServer.jobs()])
+        elif route.startswith('/jobs/') and route[6:].isdigit():
+            job = projectServer.job(int(route[6:]))
+            if job is None:
+                self.__sendJSON(404, dict(error=f'未找到请求 {route[6:]}'))
+            else:
+                self.__sendJSON(200, job.asDict())
+        else:
+            self.__sendJSON(404, dict(error=f'未知的路径：{self.path}'))
+
+    def do_POST(self):
+        projectServer = self.server.projectServer
+        route = self.path.rstrip('/').split('?')[0]
+        try:
+            content = self.__readJSON()
+        except ValueError as e:
+            self.__sendJSON(400, dict(error=f'无法解析请求正文：{e}'))
+            return
+        if route in ('/extract', '/writeback'):
+            paths = content.get('paths') or []
+            if isinstance(paths, str):
+                paths = [paths]
+            if not all(isinstance(x, str) for x in paths):
+                self.__sendJSON(400, dict(error='paths 应当是字符串列表。'))
+                return
+            try:
+                job = projectServer.submit(route[1:], paths)
+            except Exception:
+                self.__sendJSON(500, dict(error=traceback.format_exc()))
+                return
+            if content.get('wait'):
+                job.finished.wait()
+                self.__sendJSON(200 if job.state == 'finished' else 500, job.asDict())
+            else:
+                self.__sendJSON(202, job.asDict())
+        elif route == '/invalidate':
+            self.__sendJSON(200, projectServer.invalidate())
+        elif route == '/shutdown':
+            self.__sendJSON(200, dict(state='shutting down'))
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self.__sendJSON(404, dict(error=f'未知的路径：{self.path}'))
+
+    def log_message(self, format: str, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _ProjectHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], projectServer: ProjectServer, verbose: bool):
+        super().__init__(address, _RequestHandler)
+        self.projectServer = projectServer
+        self.verbose = verbose
+
+
+def serveProject(projectServer: ProjectServer, host: str = '127.0.0.1', port: int = 8765, verbose: bool = False,
+                 readyCallback=None):
+    """
+    启动 HTTP 接口并一直运行，直到收到 /shutdown 请求或被中断。退出前等待已提交的任务完成，启用了性能统计时输出整个运行期间的报告。
+
+    :param projectServer: 项目服务。
+    :param host: 监听地址，默认只接受本机的连接。
+    :param port: 监听端口，为0时由系统分配。
+    :param verbose: 是否输出每个 HTTP 请求的日志。
+    :param readyCallback: 开始监听后调用，参数为实际的 (地址, 端口)。
+    """
+    httpServer = _ProjectHTTPServer((host, port), projectServer, verbose)
+    address = httpServer.server_address[:2]
+    print(f'项目服务已在 http://{address[0]}:{address[1]} 上运行，按 Ctrl+C 退出。')
+    if readyCallback is not None:
+        readyCallback(address)
+    try:
+        httpServer.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpServer.server_close()
+        projectServer.close()
+        profiler.report()
@@ -0,0 +1,67 @@
+import threading
+from typing import Callable, List, Tuple
+
+from dataModel import ParatranzDataUnit
+
+# 提取阶段的附加处理器签名：func(中间文件路径, 词条列表)，处理器可以就地修改词条。
+StageFunc = Callable[[str, List[ParatranzDataUnit]], None]
+
+
+class ExtractionStages:
+    """
+    提取阶段的附加处理器注册表。
+
+    各个提取器（`SubParatranz`、`csvSubParatranz`、装配处理器）在写入中间文件之前，都会把本次生成的词条交给这里注册的处理器，
+    以便统一地为词条追加上下文或预填译文。处理器按照注册顺序依次执行。
+
+    每个项目实例持有自己的注册表，因此同一进程中处理多个 mod 时，各自的术语表等处理器互不影响。
+
+    处理器列表是不可变的元组，修改时在锁内构造新元组并一次性替换，`apply` 只遍历调用时的快照，
+    因此常驻服务在任务执行期间重新加载术语表，也不会使正在执行的任务跳过或重复执行某个处理器。
+    """
+
+    def __init__(self):
+        self.__stages: Tuple[StageFunc, ...] = ()
+        self.__lock = threading.Lock()
+
+    def register(self, stageFunc: StageFunc):
+        """注册一个处理器，重复注册会被忽略。"""
+        with self.__lock:
+            if stageFunc not in self.__stages:
+                self.__stages = self.__stages + (stageFunc,)
+
+    def unregister(self, stageFunc: StageFunc):
+        """移除一个已注册的处理器。"""
+        with self.__lock:
+            self.__stages = tuple(x for x in self.__stages if x is not stageFunc)
+
+    def replace(self, oldStage: StageFunc | None, newStage: StageFunc | None):
+        """
+        以一次替换把 **oldStage** 换成 **newStage**，保持其执行顺序；**oldStage** 未注册时把 **newStage** 追加到末尾。
+
+        :param oldStage: 要移除的处理器，为 None 时只注册 **newStage**。
+        :param newStage: 要注册的处理器，为 None 时只移除 **oldStage**。
+        """
+        with self.__lock:
+            stages = list(self.__stages)
+            if oldStage is not None and oldStage in stages:
+                position = stages.index(oldStage)
+                stages[position:position + 1] = [newStage] if newStage is not None else []
+            elif newStage is not None and newStage not in stages:
+                stages.append(newStage)
+            self.__stages = tuple(stages)
+
+    def clear(self):
+        """移除所有处理器。"""
+        with self.__lock:
+            self.__stages = ()
+
+    def apply(self, filePath: str, units: List[ParatranzDataUnit]):
+        """
+        对即将写入中间文件的词条依次执行所有处理器。
+
+        :param filePath: 中间文件的绝对路径。
+        :param units: 即将写入的词条列表。
+        """
+        for stageFunc in self.__stages:
+            stageFunc(filePath, units)
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+from typing import Dict, List, Tuple
+
+from dataModel import ParatranzDataUnit
+from hzdev_stages import ExtractionStages
+
+# 预填译文使用的词条状态：2 表示“有疑问”，不会被当作已翻译的词条写回，需要译者确认
+PREFILL_STAGE = 2
+
+
+class TranslationMemory:
+    """
+    以原文为键的翻译记忆库。
+
+    从已有的 Paratranz 中间文件（本项目、其它 mod 项目或原版游戏的导出数据）中收集已翻译词条，
+    提取时为原文完全相同的新词条预填译文，并可以报告同一原文存在多种译法的情况。
+
+    记忆库使用字典存储，查询为常数时间；只出现过一种译法的原文只保存一个 (译文, 次数) 元组，
+    存在多种译法时才额外保存各译法的计数，因此可以容纳数百万条原文。
+    """
+
+    def __init__(self, prefillStage: int = PREFILL_STAGE):
+        """
+        :param prefillStage: 预填译文后词条的状态，应当是一个不会被写回的状态。
+        """
+        self.__entries: Dict[str, Tuple[str, int]] = {}  # 原文 -> (最常用的译文, 次数)
+        self.__variants: Dict[str, Dict[str, int]] = {}  # 存在多种译法的原文 -> {译文: 次数}
+        self.__loadedSources = set()
+        self.prefillStage = prefillStage
+        self.filledCount = 0  # 已预填的词条数量
+        self.__countLock = threading.Lock()  # 提取任务在线程池中并发执行，计数需要加锁
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def add(self, original: str, translation: str):
+        """添加一条译文。"""
+        entry = self.__entries.get(original)
+        if entry is None:
+            self.__entries[original] = (translation, 1)
+            return
+        if original not in self.__variants:
+            if entry[0] == translation:
+                self.__entries[original] = (translation, entry[1] + 1)
+                return
+            self.__variants[original] = {entry[0]: entry[1]}
+        counts = self.__variants[original]
+        counts[translation] = counts.get(translation, 0) + 1
+        if counts[translation] > self.__entries[original][1]:
+            self.__entries[original] = (translation, counts[translation])
+
+    def addUnits(self, units: List[dict]):
+        """添加 Paratranz 中间文件中的已翻译词条。"""
+        for unit in units:
+            if not isinstance(unit, dict) or unit.get('stage') not in (1, 3, 5):
+                continue
+            original, translation = unit.get('original'), unit.get('translation')
+            if isinstance(original, str) and isinstance(translation, str) and original != '' and translation != '':
+                self.add(original, translation)
+
+    def addSource(self, sourcePath: str) -> bool:
+        """
+        添加一个中间文件或一个中间文件目录（递归读取其中所有的 json 文件），同一个来源只会加载一次。
+
+        :param sourcePath: 中间文件或目录的路径。
+        :return: 是否实际加载了该来源。
+        """
+        sourcePath = os.path.abspath(sourcePath)
+        if sourcePath in self.__loadedSources:
+            return False
+        if os.path.isdir(sourcePath):
+            filePaths = [os.path.join(dirPath, fileName) for dirPath, _, fileNames in os.walk(sourcePath)
+                         for fileName in fileNames if fileName.endswith('.json')]
+        elif os.path.isfile(sourcePath):
+            filePaths = [sourcePath]
+        else:
+            return False
+        self.__loadedSources.add(sourcePath)
+        for filePath in filePaths:
+            try:
+                with open(filePath, encoding='UTF-8') as tFile:
+                    tContent = json.load(tFile)
+            except (OSError, ValueError):
+                print(f'翻译记忆库：无法读取 {filePath}，已跳过。')
+                continue
+            if isinstance(tContent, list):
+                self.addUnits(tContent)
+        return True
+
+    def lookup(self, original: str) -> str | None:
+        """返回原文最常用的译文，没有记录时返回 None。"""
+        entry = self.__entries.get(original)
+        return entry[0] if entry is not None else None
+
+    def conflicts(self) -> List[dict]:
+        """返回存在多种译法的原文，按出现次数降序排列。"""
+        result = []
+        for original, counts in self.__variants.items():
+            translations = sorted(counts.items(), key=lambda x: x[1], reverse=True)
+            result.append(dict(original=original, total=sum(counts.values()),
+                               translations=[dict(translation=x[0], count=x[1]) for x in translations]))
+        return sorted(result, key=lambda x: x['total'], reverse=True)
+
+    def writeReport(self, reportPath: str):
+        """把存在多种译法的原文写入报告文件。"""
+        conflicts = self.conflicts()
+        with open(reportPath, 'w', encoding='UTF-8') as tFile:
+            json.dump({'entries': len(self.__entries), 'filled': self.filledCount, 'conflicts': conflicts}, tFile,
+                      ensure_ascii=False, indent=4)
+        print(f'翻译记忆库：{len(self.__entries)} 条原文，{len(conflicts)} 条存在多种译法，'
+              f'已预填 {self.filledCount} 条词条，报告已写入 {reportPath}。')
+
+    def install(self, stages: ExtractionStages):
+        """注册为提取阶段的处理器。"""
+        stages.register(self)
+
+    def __call__(self, filePath: str, units: List[ParatranzDataUnit]):
+        filledCount = 0
+        for unit in units:
+            if unit.stage != 0 or unit.translation or not isinstance(unit.original, str):
+                continue
+            entry = self.__entries.get(unit.original)
+            if entry is None:
+                continue
+            unit.translation = entry[0]
+            unit.stage = self.prefillStage
+            filledCount += 1
+            counts = self.__variants.get(unit.original)
+            if counts is not None:
+                variantText = '\n'.join(f'{translation}（{count} 次）' for translation, count in
+                                        sorted(counts.items(), key=lambda x: x[1], reverse=True))
+                unit.context = f'{unit.context}\n\n[翻译记忆]\n{variantText}' if unit.context else \
+                    f'[翻译记忆]\n{variantText}'
+        with self.__countLock:
+            self.filledCount += filledCount
@@ -0,0 +1,220 @@
+import os
+import sqlite3
+import threading
+from hashlib import md5
+from typing import List, Dict, Tuple, Iterable
+
+from dataModel import ParatranzDataUnit, JobFilter
+from hzdev_paratranz_io import ParatranzFileIO
+from hzdev_profiler import profiler
+
+SCHEMA_SQL = '''
+CREATE TABLE IF NOT EXISTS units (
+    file TEXT NOT NULL,
+    key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    original TEXT,
+    originalHash INTEGER,
+    translation TEXT NOT NULL DEFAULT '',
+    stage INTEGER NOT NULL DEFAULT 0,
+    context TEXT,
+    PRIMARY KEY (file, key)
+);
+CREATE INDEX IF NOT EXISTS units_key ON units (key);
+CREATE INDEX IF NOT EXISTS units_original ON units (originalHash);
+CREATE INDEX IF NOT EXISTS units_translated ON units (file, stage);
+'''
+
+# 提取时写入词条：原文不变且库中已有译文时保留原有的译文与状态，否则使用新词条的数据
+UPSERT_SQL = '''
+INSERT INTO units (file, key, position, original, originalHash, translation, stage, context)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (file, key) DO UPDATE SET
+    position = excluded.position,
+    context = excluded.context,
+    translation = CASE WHEN units.original IS excluded.original AND units.translation != ''
+        THEN units.translation ELSE excluded.translation END,
+    stage = CASE WHEN units.original IS excluded.original AND units.translation != ''
+        THEN units.stage ELSE excluded.stage END,
+    original = excluded.original,
+    originalHash = excluded.originalHash
+'''
+
+TRANSLATED_STAGES = (1, 3, 5)
+
+
+def originalHash(original: str | None) -> int | None:
+    """原文的64位摘要，用于按原文建立索引。"""
+    if original is None:
+        return None
+    return int.from_bytes(md5(original.encode('UTF-8', 'surrogatepass')).digest()[:8], 'big', signed=True)
+
+
+class SQLiteUnitStore:
+    """
+    以 SQLite 数据库存储全部中间词条，可以替代逐个 JSON 文件的中间文件。
+
+    每个词条是一行 (file, key, position, original, translation, stage, context)，其中 file 是中间文件相对于中间文件目录的路径。
+    提取时按文件整体更新（原文未变的词条保留已有译文，不再存在的词条被删除），写回时只查询该文件已翻译的词条。
+    需要上传到 Paratranz 时，使用 `exportJSON` 生成与原来完全相同格式的 JSON 文件；
+    从 Paratranz 下载译文后，使用 `importJSON` 导入。
+
+    数据库连接可以在多个线程之间共享，所有操作由同一把锁串行化。
+    """
+
+    def __init__(self, databasePath: str, paratranzPath: str):
+        """
+        :param databasePath: 数据库文件路径，不存在时自动创建。
+        :param paratranzPath: 中间文件目录，用于把中间文件的绝对路径换算为库中的相对路径，以及导入导出 JSON 文件。
+        """
+        self.databasePath = databasePath
+        self.paratranzPath = paratranzPath
+        os.makedirs(os.path.dirname(os.path.abspath(databasePath)), exist_ok=True)
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(databasePath, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode = WAL')
+        self.__connection.execute('PRAGMA synchronous = NORMAL')
+        self.__connection.executescript(SCHEMA_SQL)
+
+    def __relativePath(self, filePath: str) -> str:
+        filePath = os.path.abspath(filePath)
+        paratranzPath = os.path.abspath(self.paratranzPath)
+        if filePath.startswith(paratranzPath + os.sep):
+            filePath = filePath[len(paratranzPath):]
+        return filePath.replace(os.sep, '/')
+
+    @staticmethod
+    def __cleanText(text: str | None) -> str | None:
+        """SQLite 只接受合法的 UTF-8 文本，CSV 中无法解码的字符会被去掉（与写入 JSON 文件时的处理相同）。"""
+        if text is None:
+            return None
+        try:
+            text.encode('UTF-8')
+            return text
+        except UnicodeEncodeError:
+            return text.encode('UTF-8', 'ignore').decode('UTF-8')
+
+    def write(self, filePath: str, units: List[ParatranzDataUnit], errors: str = 'strict'):
+        """
+        提取时写入一个中间文件的全部词条。
+
+        :param filePath: 中间文件的绝对路径。
+        :param units: 词条列表。
+        :param errors: 仅为与 `ParatranzFileIO` 保持一致，SQLite 总是去掉无法编码的字符。
+        """
+        relativePath = self.__relativePath(filePath)
+        rows = []
+        for position, unit in enumerate(units):
+            original = self.__cleanText(unit.original)
+            rows.append((relativePath, self.__cleanText(unit.key), position, original, originalHash(original),
+                         self.__cleanText(unit.translation) or '', unit.stage, self.__cleanText(unit.context)))
+        with profiler.phase('write', 'sqlite'):
+            with self.__lock, self.__connection:
+                existingKeys = {x[0] for x in self.__connection.execute('SELECT key FROM units WHERE file = ?',
+                                                                        (relativePath,))}
+                staleKeys = existingKeys - {x[1] for x in rows}
+                self.__connection.executemany('DELETE FROM units WHERE file = ? AND key = ?',
+                                              [(relativePath, x) for x in staleKeys])
+                self.__connection.executemany(UPSERT_SQL, rows)
+
+    def read(self, filePath: str, translatedOnly: bool = False) -> List[ParatranzDataUnit]:
+        """
+        读取一个中间文件的词条，保持提取时的顺序。
+
+        :param filePath: 中间文件的绝对路径。
+        :param translatedOnly: 只返回已翻译的词条。
+        """
+        sql = 'SELECT key, original, translation, stage, context FROM units WHERE file = ?'
+        if translatedOnly:
+            sql += f' AND stage IN {TRANSLATED_STAGES}'
+        with profiler.phase('read', 'sqlite'):
+            with self.__lock:
+                rows = self.__connection.execute(sql + ' ORDER BY position', (self.__relativePath(filePath),)).fetchall()
+        return [ParatranzDataUnit(key, original, context, translation=translation, stage=stage)
+                for key, original, translation, stage, context in rows]
+
+    def exists(self, filePath: str) -> bool:
+        """库中是否存在该中间文件的词条。"""
+        with self.__lock:
+            return self.__connection.execute('SELECT 1 FROM units WHERE file = ? LIMIT 1',
+                                             (self.__relativePath(filePath),)).fetchone() is not None
+
+    def remove(self, filePath: str) -> bool:
+        """删除该中间文件的全部词条，返回是否确实删除了词条。"""
+        with self.__lock, self.__connection:
+            return self.__connection.execute('DELETE FROM units WHERE file = ?',
+                                             (self.__relativePath(filePath),)).rowcount > 0
+
+    def listFiles(self, jobFilter: JobFilter = None) -> List[str]:
+        """列出库中所有的中间文件，返回以'/'开头、相对于中间文件目录的路径。"""
+        with self.__lock:
+            result = [x[0] for x in self.__connection.execute('SELECT DISTINCT file FROM units ORDER BY file')]
+        if jobFilter is not None:
+            result = [x for x in result if jobFilter.mayContain(x.rpartition('/')[0])]
+        return result
+
+    def findKey(self, key: str) -> List[Tuple[str, ParatranzDataUnit]]:
+        """按键值查找词条，返回 (中间文件相对路径, 词条) 列表。"""
+        with self.__lock:
+            rows = self.__connection.execute('SELECT file, key, original, translation, stage, context FROM units '
+                                             'WHERE key = ?', (key,)).fetchall()
+        return [(file, ParatranzDataUnit(key, original, context, translation=translation, stage=stage))
+                for file, key, original, translation, stage, context in rows]
+
+    def findOriginal(self, original: str) -> List[Tuple[str, ParatranzDataUnit]]:
+        """按原文查找词条，返回 (中间文件相对路径, 词条) 列表。"""
+        with self.__lock:
+            rows = self.__connection.execute('SELECT file, key, original, translation, stage, context FROM units '
+                                             'WHERE originalHash = ? AND original = ?',
+                                             (originalHash(original), original)).fetchall()
+        return [(file, ParatranzDataUnit(key, original, context, translation=translation, stage=stage))
+                for file, key, original, translation, stage, context in rows]
+
+    def countByStage(self) -> Dict[int, int]:
+        """统计各个状态的词条数量。"""
+        with self.__lock:
+            return dict(self.__connection.execute('SELECT stage, COUNT(*) FROM units GROUP BY stage').fetchall())
+
+    def importJSON(self, paratranzPath: str = None) -> int:
+        """
+        导入 JSON 中间文件（比如从 Paratranz 下载的译文），库中同名文件的词条会被整体替换，分片文件会被合并为一个文件。
+
+        :param paratranzPath: JSON 中间文件目录，不指定则使用本库对应的中间文件目录。
+        :return: 导入的文件数量。
+        """
+        fileIO = ParatranzFileIO(paratranzPath or self.paratranzPath)
+        relativePaths = [x for x in fileIO.listFiles() if x.endswith('.json')]
+        for relativePath in relativePaths:
+            units = fileIO.read(fileIO.paratranzPath + relativePath.replace('/', os.sep))
+            with self.__lock, self.__connection:
+                self.__connection.execute('DELETE FROM units WHERE file = ?', (relativePath,))
+                self.__connection.executemany(
+                    'INSERT INTO units (file, key, position, original, originalHash, translation, stage, context) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(relativePath, x.key, position, x.original, originalHash(x.original), x.translation or '',
+                      x.stage, x.context) for position, x in enumerate(units)])
+        return len(relativePaths)
+
+    def exportJSON(self, paratranzPath: str = None, files: Iterable[str] = None, maxUnits: int = 0,
+                   maxBytes: int = 0) -> int:
+        """
+        把库中的词条导出为可以上传到 Paratranz 的 JSON 中间文件。
+
+        :param paratranzPath: 导出目录，不指定则使用本库对应的中间文件目录。
+        :param files: 只导出指定的文件（相对路径），不指定则导出全部文件。
+        :param maxUnits: 单个文件的词条数量上限，超过时拆分为分片（见 `ParatranzFileIO`），为0时不限制。
+        :param maxBytes: 单个文件的大小上限（字节），为0时不限制。
+        :return: 导出的文件数量。
+        """
+        fileIO = ParatranzFileIO(paratranzPath or self.paratranzPath, maxUnits, maxBytes)
+        files = self.listFiles() if files is None else list(files)
+        for relativePath in files:
+            units = self.read(self.paratranzPath + relativePath.replace('/', os.sep))
+            targetPath = fileIO.paratranzPath + relativePath.replace('/', os.sep)
+            os.makedirs(os.path.dirname(targetPath), exist_ok=True)
+            fileIO.write(targetPath, units)
+        return len(files)
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
@@ -0,0 +1,158 @@
+import json
+import os
+import re
+from collections import Counter
+from typing import List, NamedTuple, Tuple
+
+from dataModel import JobFilter, ParatranzDataUnit
+from hzdev_output import outputWriter
+
+# 游戏运行时会解析的占位符与标记：$变量（$playerName、$faction.name）、格式化占位符（%s、%1$d、%.1f、%%）、
+# 换行（CSV 中的 ^n，以及换行符或译文中等价的 \n 转义）、高亮花括号，以及选项分隔符 ||
+PLACEHOLDER_PATTERN = re.compile(r'\$[A-Za-z_]\w*(?:\.\w+)*'
+                                 r'|%(?:\d+\$)?[-#+0,(]*\d*(?:\.\d+)?[A-Za-z%]'
+                                 r'|\^n|\\n|\n|[{}]|\|\|', re.ASCII)
+CATEGORY_BY_PREFIX = {'$': 'variable', '%': 'format', '^': 'escape', '\\': 'escape', '{': 'highlight',
+                      '}': 'highlight', '|': 'separator'}
+NEWLINE_TOKEN = '\\n'  # 写回时译文中的 \n 会被替换为换行符，因此两者视为同一个占位符
+
+
+class PlaceholderIssue(NamedTuple):
+    """一条译文中的占位符问题。"""
+    filePath: str  # 中间文件的相对路径（以'/'开头）
+    key: str
+    category: str  # variable / format / escape / highlight / separator
+    missing: Tuple[str, ...]  # 原文中有而译文中缺少的占位符
+    extra: Tuple[str, ...]  # 译文中多出的占位符
+    message: str = ''
+
+
+class ValidationReport(NamedTuple):
+    """一次校验的结果。"""
+    fileCount: int
+    unitCount: int  # 参与校验的已翻译词条数量
+    issues: List[PlaceholderIssue]
+
+    def asDict(self) -> dict:
+        categories = Counter(x.category for x in self.issues)
+        return {'summary': {'files': self.fileCount, 'units': self.unitCount, 'issues': len(self.issues),
+                            'categories': dict(sorted(categories.items()))},
+                'issues': [x._asdict() for x in self.issues]}
+
+    def writeJSON(self, reportPath: str):
+        """把结果写入 JSON 报告文件。"""
+        outputWriter.writeText(reportPath, json.dumps(self.asDict(), ensure_ascii=False, indent=4))
+
+    def printSummary(self, limit: int = 20):
+        print(f'占位符校验：{self.fileCount} 个文件，{self.unitCount} 条译文，发现 {len(self.issues)} 个问题。')
+        for issue in self.issues[:limit]:
+            detail = issue.message or f'缺少 {list(issue.missing)}，多出 {list(issue.extra)}'
+            print(f'  {issue.filePath} {issue.key} [{issue.category}] {detail}')
+        if len(self.issues) > limit:
+            print(f'  …… 其余 {len(self.issues) - limit} 个问题见报告文件。')
+
+
+def _isBalanced(tokens: List[str]) -> bool:
+    depth = 0
+    for token in tokens:
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+def checkTranslation(original: str, translation: str) -> List[Tuple[str, Tuple[str, ...], Tuple[str, ...], str]]:
+    """
+    比较原文与译文中的占位符多重集，返回 (类别, 缺少的占位符, 多出的占位符, 说明) 的列表，没有问题时返回空列表。
+
+    占位符的顺序可以改变（译文语序不同），数量与写法必须一致；此外，原文的花括号成对出现时，译文的花括号也必须成对。
+    """
+    originalTokens = PLACEHOLDER_PATTERN.findall(original)
+    translationTokens = PLACEHOLDER_PATTERN.findall(translation)
+    if originalTokens == translationTokens:
+        return []
+    originalTokens = [NEWLINE_TOKEN if x == '\n' else x for x in originalTokens]
+    translationTokens = [NEWLINE_TOKEN if x == '\n' else x for x in translationTokens]
+    result = []
+    if sorted(originalTokens) != sorted(translationTokens):
+        missing, extra = Counter(originalTokens), Counter(translationTokens)
+        missing, extra = missing - extra, extra - missing
+        categories = {}
+        for token in missing.elements():
+            categories.setdefault(CATEGORY_BY_PREFIX[token[0]], ([], []))[0].append(token)
+        for token in extra.elements():
+            categories.setdefault(CATEGORY_BY_PREFIX[token[0]], ([], []))[1].append(token)
+        for category, (missingTokens, extraTokens) in categories.items():
+            result.append((category, tuple(missingTokens), tuple(extraTokens), ''))
+    if '{' in translationTokens and _isBalanced(originalTokens) and not _isBalanced(translationTokens) and \
+            not any(x[0] == 'highlight' for x in result):
+        result.append(('highlight', (), (), '花括号没有成对出现'))
+    return result
+
+
+def _checkChunk(chunk: List[Tuple[str, str, str, str]]) -> List[PlaceholderIssue]:
+    """校验一组 (文件, 键, 原文, 译文)，供进程池调用。"""
+    result = []
+    for filePath, key, original, translation in chunk:
+        for category, missing, extra, message in checkTranslation(original, translation):
+            result.append(PlaceholderIssue(filePath, key, category, missing, extra, message))
+    return result
+
+
+class PlaceholderValidator:
+    """
+    译文占位符与标记的批量校验器。
+
+    所有模式只编译一次，每条译文只需各扫描一次原文与译文；词条数量较多时按块分配到进程池中并行校验，结果保持输入的顺序。
+    """
+
+    def __init__(self, workers: int = None, chunkSize: int = 20000):
+        """
+        :param workers: 进程池大小，不指定则使用 CPU 核心数；为1时不使用进程池。
+        :param chunkSize: 每块的词条数量，词条总数不超过两块时直接在当前进程中校验。
+        """
+        self.workers = workers
+        self.chunkSize = chunkSize
+
+    def validateItems(self, items: List[Tuple[str, str, str, str]]) -> List[PlaceholderIssue]:
+        """
+        校验一组 (文件, 键, 原文, 译文)。
+
+        :param items: 待校验的译文。
+        """
+        workers = self.workers if self.workers is not None else (os.cpu_count() or 1)
+        if workers == 1 or len(items) <= self.chunkSize * 2:
+            return _checkChunk(items)
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = [items[x:x + self.chunkSize] for x in range(0, len(items), self.chunkSize)]
+        result = []
+        with ProcessPoolExecutor(workers) as pool:
+            for issues in pool.map(_checkChunk, chunks):
+                result += issues
+        return result
+
+    def validateStore(self, unitIO, jobFilter: JobFilter = None) -> ValidationReport:
+        """
+        校验中间文件（或词条库）中的全部已翻译词条。
+
+        :param unitIO: 中间文件的读写方式（`ParatranzFileIO` 或 `SQLiteUnitStore`）。
+        :param jobFilter: 任务过滤器，只校验可能属于被选中文件的中间文件。
+        """
+        relativePaths = sorted(unitIO.listFiles(jobFilter))
+        items = []
+        for relativePath in relativePaths:
+            filePath = unitIO.paratranzPath + relativePath.replace('/', os.sep)
+            for unit in unitIO.read(filePath, True):
+                translation = _translationOf(unit)
+                if len(translation) > 0:
+                    items.append((relativePath, unit.key, unit.original, translation))
+        return ValidationReport(len(relativePaths), len(items), self.validateItems(items))
+
+
+def _translationOf(unit: ParatranzDataUnit) -> str:
+    return unit.translation if unit.translation is not None else ''
+
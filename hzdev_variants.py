@@ -0,0 +1,45 @@
+import json
+import re
+from typing import NamedTuple
+
+# 在读取文本之前，先以字节搜索过滤掉没有装配名称的文件
+DISPLAY_NAME_BYTES = b'displayName'
+# "displayName": "..."，键可以带引号或不带引号；只识别双引号括起的值，其它写法交给完整的解析流程
+DISPLAY_NAME_PATTERN = re.compile(r'''(?:"displayName"|'displayName'|(?<![\w$])displayName)'''
+                                  r'''\s*:\s*"((?:[^"\\\r\n]|\\.)*)"''')
+
+
+class DisplayNameSpan(NamedTuple):
+    """装配文件中 displayName 的值在文本中的位置，start 与 end 包含两侧的引号。"""
+    start: int
+    end: int
+    value: str
+
+
+def findDisplayName(fileContent: str) -> DisplayNameSpan | None:
+    """
+    不解析整个文件，直接定位 displayName 的值。
+
+    注释行中的匹配会被忽略；找不到、找到多个或者值无法解码时返回 None，此时应当改用完整的解析流程。
+
+    :param fileContent: 装配文件的文本。
+    """
+    result = None
+    for matchResult in DISPLAY_NAME_PATTERN.finditer(fileContent):
+        lineStart = fileContent.rfind('\n', 0, matchResult.start()) + 1
+        linePrefix = fileContent[lineStart:matchResult.start()]
+        if '#' in linePrefix or '//' in linePrefix:
+            continue
+        if result is not None:
+            return None
+        try:
+            value = json.loads(f'"{matchResult.group(1)}"')
+        except ValueError:
+            return None
+        result = DisplayNameSpan(matchResult.start(1) - 1, matchResult.end(1) + 1, value)
+    return result
+
+
+def spliceDisplayName(fileContent: str, span: DisplayNameSpan, translation: str) -> str:
+    """把译文写入 displayName 的位置，文件的其它部分保持原样。"""
+    return fileContent[:span.start] + json.dumps(translation, ensure_ascii=False) + fileContent[span.end:]
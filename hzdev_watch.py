@@ -0,0 +1,198 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from os import sep
+from typing import Dict, List, Set
+
+
+class PollingWatcher:
+    """通过定期比较文件的修改时间与大小来发现变化的文件，适用于任何平台。"""
+
+    def __init__(self, rootPath: str, interval: float = 1.0):
+        """
+        :param rootPath: 要监视的目录。
+        :param interval: 两次扫描之间的间隔（秒）。
+        """
+        self.__rootPath = rootPath
+        self.__interval = interval
+        self.__snapshot = self.__scan()
+
+    def __scan(self) -> Dict[str, tuple]:
+        result = {}
+        for dirPath, _, fileNames in os.walk(self.__rootPath):
+            for fileName in fileNames:
+                filePath = os.path.join(dirPath, fileName)
+                try:
+                    fileStat = os.stat(filePath)
+                except OSError:
+                    continue
+                result[filePath] = (fileStat.st_mtime_ns, fileStat.st_size)
+        return result
+
+    def read(self, timeout: float) -> Set[str]:
+        """等待至多 **timeout** 秒，返回发生变化（新增、修改或删除）的文件的绝对路径。"""
+        time.sleep(min(timeout, self.__interval))
+        newSnapshot = self.__scan()
+        result = {x for x in newSnapshot if self.__snapshot.get(x) != newSnapshot[x]}
+        result |= self.__snapshot.keys() - newSnapshot.keys()
+        self.__snapshot = newSnapshot
+        return result
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    基于 Linux inotify 的监视器，递归监视目录树，并自动监视新建的子目录。
+
+    inotify 对被删除或移走的目录只报告目录本身，因此监视器另外记录已知的文件，
+    目录被删除、移出或改名时把其中所有已知的文件报告为删除，并移除该目录树的监视。
+    """
+    __IN_MODIFY = 0x00000002
+    __IN_CLOSE_WRITE = 0x00000008
+    __IN_MOVED_FROM = 0x00000040
+    __IN_MOVED_TO = 0x00000080
+    __IN_CREATE = 0x00000100
+    __IN_DELETE = 0x00000200
+    __IN_DELETE_SELF = 0x00000400
+    __IN_MOVE_SELF = 0x00000800
+    __IN_ISDIR = 0x40000000
+    __IN_NONBLOCK = 0x00000800
+    __IN_CLOEXEC = 0x00080000
+    __eventHeader = struct.Struct('iIII')
+
+    def __init__(self, rootPath: str):
+        """
+        :param rootPath: 要监视的目录。
+        :raise OSError: 当前平台不支持 inotify 时抛出。
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify 仅在 Linux 上可用。')
+        self.__libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.__fd = self.__libc.inotify_init1(self.__IN_NONBLOCK | self.__IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 调用失败。')
+        self.__watchPaths: Dict[int, str] = {}
+        self.__knownFiles: Set[str] = set()
+        self.__addTree(rootPath)
+
+    def __addWatch(self, dirPath: str):
+        mask = self.__IN_CLOSE_WRITE | self.__IN_MOVED_FROM | self.__IN_MOVED_TO | self.__IN_CREATE | \
+               self.__IN_DELETE | self.__IN_MODIFY | self.__IN_DELETE_SELF | self.__IN_MOVE_SELF
+        watchID = self.__libc.inotify_add_watch(self.__fd, os.fsencode(dirPath), mask)
+        if watchID >= 0:
+            self.__watchPaths[watchID] = dirPath
+
+    def __addTree(self, dirPath: str) -> Set[str]:
+        """监视目录及其所有子目录，返回其中已有的文件。"""
+        result = set()
+        for subDirPath, _, subFileNames in os.walk(dirPath):
+            self.__addWatch(subDirPath)
+            result.update(os.path.join(subDirPath, x) for x in subFileNames)
+        self.__knownFiles |= result
+        return result
+
+    def __removeTree(self, dirPath: str) -> Set[str]:
+        """移除已不在原处的目录树的监视，返回其中已知的文件。"""
+        prefix = dirPath + sep
+        for watchID in [x for x, tPath in self.__watchPaths.items() if tPath == dirPath or tPath.startswith(prefix)]:
+            del self.__watchPaths[watchID]
+            self.__libc.inotify_rm_watch(self.__fd, watchID)
+        result = {x for x in self.__knownFiles if x.startswith(prefix)}
+        self.__knownFiles -= result
+        return result
+
+    def read(self, timeout: float) -> Set[str]:
+        """等待至多 **timeout** 秒，返回发生变化（新增、修改或删除）的文件的绝对路径。"""
+        result = set()
+        if not select.select([self.__fd], [], [], timeout)[0]:
+            return result
+        try:
+            buffer = os.read(self.__fd, 65536)
+        except BlockingIOError:
+            return result
+        offset = 0
+        while offset < len(buffer):
+            watchID, mask, _, nameLength = self.__eventHeader.unpack_from(buffer, offset)
+            offset += self.__eventHeader.size
+            fileName = os.fsdecode(buffer[offset:offset + nameLength].rstrip(b'\0'))
+            offset += nameLength
+            dirPath = self.__watchPaths.get(watchID)
+            if dirPath is None:  # 已移除监视的目录（包括随后的 IN_IGNORED 事件）
+                continue
+            if mask & (self.__IN_DELETE_SELF | self.__IN_MOVE_SELF):  # 被监视的目录本身被删除或移走
+                result |= self.__removeTree(dirPath)
+                continue
+            if fileName == '':
+                continue
+            filePath = os.path.join(dirPath, fileName)
+            if mask & self.__IN_ISDIR:
+                if mask & (self.__IN_CREATE | self.__IN_MOVED_TO):  # 新目录：补上监视并把其中已有的文件视为新增
+                    result |= self.__addTree(filePath)
+                elif mask & (self.__IN_DELETE | self.__IN_MOVED_FROM):  # 目录被删除、移出或改名：其中的文件视为删除
+                    result |= self.__removeTree(filePath)
+                continue
+            if mask & (self.__IN_DELETE | self.__IN_MOVED_FROM):
+                self.__knownFiles.discard(filePath)
+            else:
+                self.__knownFiles.add(filePath)
+            result.add(filePath)
+        return result
+
+    def close(self):
+        os.close(self.__fd)
+
+
+def createWatcher(rootPath: str, forcePolling: bool = False, pollInterval: float = 1.0):
+    """创建监视器，优先使用 inotify，不可用时退回到轮询。"""
+    if not forcePolling:
+        try:
+            return InotifyWatcher(rootPath)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(rootPath, pollInterval)
+
+
+def watchOriginals(project, originalPath: str, debounce: float = 0.3, forcePolling: bool = False,
+                   pollInterval: float = 1.0, maxBatches: int = None):
+    """
+    监视原文目录，在文件变化后重新提取受影响的文件。
+
+    一连串的变化事件会被合并，直到 **debounce** 秒内没有新事件后才统一处理，因此一次保存多个文件只会触发一次提取。
+    处理器实例在整个监视期间保持不变，不会重复初始化。
+
+    :param project: `ParatranzProject` 实例，将调用其 `ExtractFiles` 方法。
+    :param originalPath: 原文目录。
+    :param debounce: 合并事件的静默时间（秒）。
+    :param forcePolling: 强制使用轮询方式。
+    :param pollInterval: 轮询间隔（秒）。
+    :param maxBatches: 处理指定批次后退出，不指定则一直运行到被中断。
+    """
+    watcher = createWatcher(originalPath, forcePolling, pollInterval)
+    print(f'正在监视 {originalPath}（{"轮询" if isinstance(watcher, PollingWatcher) else "inotify"}），按 Ctrl+C 退出。')
+    batchCount = 0
+    try:
+        while maxBatches is None or batchCount < maxBatches:
+            pending = watcher.read(1.0)
+            if len(pending) == 0:
+                continue
+            while True:  # 等待事件平息
+                newEvents = watcher.read(debounce)
+                if len(newEvents) == 0:
+                    break
+                pending |= newEvents
+            startTime = time.perf_counter()
+            relativePaths: List[str] = sorted(x.replace(originalPath, '', 1).replace(sep, '/') for x in pending
+                                              if x.startswith(originalPath))
+            project.ExtractFiles(relativePaths)
+            batchCount += 1
+            print(f'已处理 {len(relativePaths)} 个变化的文件，耗时 {time.perf_counter() - startTime:.3f} 秒。')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()